@@ -0,0 +1,174 @@
+"""This module compiles the Transmilenio route and station JSON 
+files into the binary format loaded by the repositories.
+
+Usage, from the backend directory:
+
+    python -m compile_data OUTPUT [--routes ROUTES_JSON] [--stations STATIONS_JSON]
+
+The JSON files default to PATH_ROUTES_DATA and PATH_STATIONS_DATA. Point
+both variables at OUTPUT to serve the compiled data.
+
+Author: Juan Esteban Bedoya <jebedoyal@udistrital.edu.co>
+
+This file is part of SmartCommute project.
+
+SmartCommute is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+SmartCommute is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
+"""
+
+import argparse
+import os
+import sys
+from typing import List, Optional
+from environment_variables import EnvironmentVariables # pylint: disable=import-error
+from repositories.compiled_data import write_compiled_data # pylint: disable=import-error
+from repositories.route import RouteDAO, RouteRepository # pylint: disable=import-error
+from repositories.station import StationRepository # pylint: disable=import-error
+from services.travel.data_preparer import DataPreparer # pylint: disable=import-error
+from services.travel.pair_table import PairTable # pylint: disable=import-error
+from services.travel.schedule import MINUTES_PER_DAY, WEEKDAYS, parse_minutes # pylint: disable=import-error
+from services.travel.snapshot_file import snapshot_bytes # pylint: disable=import-error
+from services.travel.timetable import DEFAULT_RUN_MINUTES # pylint: disable=import-error
+
+class CompileError(Exception):
+    """Raised when the JSON files cannot be compiled."""
+
+
+def schedule_warnings(routes: List[RouteDAO]) -> List[str]:
+    """
+    Lists the schedule entries the travel planner ignores because their
+    day or times cannot be parsed and the run times it ignores because they
+    do not match the stations.
+
+    Args:
+        routes (List[RouteDAO]): The validated routes.
+
+    Returns:
+        List[str]: One message per ignored entry.
+    """
+    warnings = []
+    for route in routes:
+        for position, entry in enumerate(route.schedule):
+            if entry.day.strip().lower() not in WEEKDAYS \
+                    or parse_minutes(entry.start_time) is None \
+                    or parse_minutes(entry.end_time) is None:
+                warnings.append(f"Route {route.id}: schedule entry {position} is ignored: "
+                                f"{entry.model_dump(exclude_none=True)}")
+        if route.run_times is not None and (
+                len(route.run_times) != len(route.stations) - 1
+                or any(not 0 <= minutes < MINUTES_PER_DAY for minutes in route.run_times)):
+            warnings.append(f"Route {route.id}: run times are ignored, {DEFAULT_RUN_MINUTES} "
+                            "minutes between stations are used.")
+    return warnings
+
+
+def compile_data(
+    routes_path: str, stations_path: str, output: str, pair_table_path: Optional[str] = None
+) -> List[str]:
+    """
+    Validates the JSON files and writes them, with the network compiled from
+    them, as a compiled data file. The precomputed journeys of every station
+    pair can be built at the same time, so the servers do not build them.
+
+    Args:
+        routes_path (str): Path to the routes JSON file.
+        stations_path (str): Path to the stations JSON file.
+        output (str): Path of the compiled file.
+        pair_table_path (Optional[str]): Where to write the pair table, with
+            the PAIR_TABLE_WINDOWS and PAIR_TABLE_MAX_STATIONS settings.
+
+    Returns:
+        List[str]: Warnings about data the travel planner ignores.
+
+    Raises:
+        CompileError: If a file cannot be read, its data is invalid or the
+            network is too large for a pair table.
+    """
+    route_repo = RouteRepository(routes_path)
+    station_repo = StationRepository(stations_path)
+    for repository in (route_repo, station_repo):
+        if repository.load_error is not None:
+            raise CompileError(f"Cannot load {repository.path_file}: {repository.load_error}")
+        if repository.compiled is not None:
+            raise CompileError(f"{repository.path_file} is already compiled.")
+        if not repository.data:
+            raise CompileError(f"No data found in {repository.path_file}")
+    try:
+        routes = route_repo.get_routes()
+        stations = station_repo.get_stations()
+    except (KeyError, TypeError, ValueError) as e:
+        raise CompileError(f"Invalid data: {e}") from e
+
+    data_preparer = DataPreparer(route_repo, station_repo)
+    snapshot = data_preparer.build_snapshot()
+    write_compiled_data(
+        output,
+        [route.model_dump() for route in routes],
+        [station.model_dump() for station in stations],
+        route_repo.digest,
+        station_repo.digest,
+        snapshot_bytes(snapshot, data_preparer.source_digest())
+    )
+    if pair_table_path:
+        env = EnvironmentVariables()
+        try:
+            PairTable.build(snapshot, pair_table_path, env.pair_table_windows,
+                            env.pair_table_max_stations)
+        except ValueError as e:
+            raise CompileError(str(e)) from e
+    return schedule_warnings(routes)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Runs the compiler from the command line.
+
+    Args:
+        argv (Optional[List[str]]): The arguments. Defaults to `sys.argv`.
+
+    Returns:
+        int: The exit status.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m compile_data",
+        description="Compile the route and station JSON files into a binary data file."
+    )
+    parser.add_argument("output", help="path of the compiled file")
+    env = EnvironmentVariables()
+    parser.add_argument("--routes", default=env.path_routes_data,
+                        help="routes JSON file (default: PATH_ROUTES_DATA)")
+    parser.add_argument("--stations", default=env.path_stations_data,
+                        help="stations JSON file (default: PATH_STATIONS_DATA)")
+    parser.add_argument("--pair-table", metavar="PATH",
+                        help="also write the precomputed journeys of every station pair")
+    args = parser.parse_args(argv)
+    if not args.routes or not args.stations:
+        parser.error("the routes and stations JSON files are required")
+
+    try:
+        warnings = compile_data(args.routes, args.stations, args.output, args.pair_table)
+    except CompileError as e:
+        print(f"Error compiling data: {e}", file=sys.stderr)
+        return 1
+    for warning in warnings:
+        print(f"Warning: {warning}", file=sys.stderr)
+    print(f"Compiled {args.routes} and {args.stations} into {args.output} "
+          f"({os.path.getsize(args.output)} bytes).")
+    if args.pair_table:
+        print(f"Wrote the pair table {args.pair_table} "
+              f"({os.path.getsize(args.pair_table)} bytes).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
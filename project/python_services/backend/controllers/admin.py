@@ -0,0 +1,98 @@
+"""This module is used to handle administrative API endpoints 
+of SmartCommute.
+
+Author: Juan Esteban Bedoya <jebedoyal@udistrital.edu.co>
+
+This file is part of SmartCommute project.
+
+SmartCommute is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+SmartCommute is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
+"""
+
+from typing import Dict, Any, Optional
+from fastapi import APIRouter, Depends, HTTPException
+from services.data_reloader import DataReloader, ReloadError # pylint: disable=import-error
+from services.travel_finder import TravelFinder # pylint: disable=import-error
+from services.routing_pool import RoutingPool # pylint: disable=import-error
+from controllers.dependencies import ( # pylint: disable=import-error
+    get_data_reloader, get_routing_pool, get_travel_finder, verify_admin_token
+)
+
+router = APIRouter(dependencies=[Depends(verify_admin_token)])
+
+@router.post("/admin/reload")
+def reload_data(reloader: DataReloader = Depends(get_data_reloader)) -> Dict[str, Any]:
+    """Reloads the route and station files and swaps the new data in.
+
+    Requests already running finish with the data they started with.
+
+    Args:
+        reloader (DataReloader): The data reloader of the process.
+
+    Returns:
+        Dict[str, Any]: The reload metrics after the reload.
+
+    Raises:
+        HTTPException: If another reload is running or the new data is invalid.
+    """
+    if reloader.is_running():
+        raise HTTPException(status_code=409, detail="A reload is already running.")
+    try:
+        return reloader.reload()
+    except ReloadError as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
+
+
+@router.get("/admin/reload")
+def reload_status(reloader: DataReloader = Depends(get_data_reloader)) -> Dict[str, Any]:
+    """Retrieves the outcome and timing of the reloads.
+
+    Args:
+        reloader (DataReloader): The data reloader of the process.
+
+    Returns:
+        Dict[str, Any]: The reload metrics.
+    """
+    return reloader.metrics.as_dict()
+
+
+@router.get("/admin/route_cache")
+def route_cache_status(finder: TravelFinder = Depends(get_travel_finder)) -> Dict[str, Any]:
+    """Retrieves the usage of the travel search result cache.
+
+    Args:
+        finder (TravelFinder): The travel finder of the process.
+
+    Returns:
+        Dict[str, Any]: The cache counters, or {"backend": None} when the
+            cache is disabled.
+    """
+    if finder.result_cache is None:
+        return {"backend": None}
+    return finder.result_cache.stats()
+
+
+@router.get("/admin/routing_pool")
+def routing_pool_status(pool: Optional[RoutingPool] = Depends(get_routing_pool)) -> Dict[str, Any]:
+    """Retrieves the load of the routing worker processes.
+
+    Args:
+        pool (Optional[RoutingPool]): The routing workers, if enabled.
+
+    Returns:
+        Dict[str, Any]: The pool counters, or {"workers": 0} when searches run
+            in the web process.
+    """
+    if pool is None:
+        return {"workers": 0}
+    return pool.stats()
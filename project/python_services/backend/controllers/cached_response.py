@@ -0,0 +1,100 @@
+"""This module is used to send pre-serialized Transmilenio data 
+with HTTP caching and compression.
+
+Author: Juan Esteban Bedoya <jebedoyal@udistrital.edu.co>
+
+This file is part of SmartCommute project.
+
+SmartCommute is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+SmartCommute is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
+"""
+
+from typing import Dict, Optional
+from fastapi import Request, Response
+from environment_variables import EnvironmentVariables # pylint: disable=import-error
+from repositories.serialized_payload import SerializedPayload # pylint: disable=import-error
+
+ENCODING_PREFERENCE = ("br", "gzip")
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Checks an If-None-Match header against the current entity tag.
+
+    Args:
+        if_none_match (Optional[str]): The header value sent by the client.
+        etag (str): The current entity tag.
+
+    Returns:
+        bool: True if the client already has the current version.
+    """
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
+
+
+def _choose_encoding(accept_encoding: Optional[str], available: Dict[str, bytes]) -> Optional[str]:
+    """
+    Picks the preferred compression the client accepts.
+
+    Args:
+        accept_encoding (Optional[str]): The Accept-Encoding header value.
+        available (Dict[str, bytes]): The compressed variants available.
+
+    Returns:
+        Optional[str]: The encoding to use, or None to send the body as is.
+    """
+    if not accept_encoding:
+        return None
+    accepted = set()
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = params.strip()
+        if quality.startswith("q="):
+            try:
+                if float(quality[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding.strip().lower())
+    for coding in ENCODING_PREFERENCE:
+        if coding in available and (coding in accepted or "*" in accepted):
+            return coding
+    return None
+
+
+def cached_json_response(request: Request, payload: SerializedPayload) -> Response:
+    """
+    Builds the response for a pre-serialized payload, answering 304 when the
+    client already has it and compressing it when the client allows.
+
+    Args:
+        request (Request): The incoming request.
+        payload (SerializedPayload): The data to send.
+
+    Returns:
+        Response: The response to send.
+    """
+    headers = {
+        "ETag": payload.etag,
+        "Cache-Control": f"public, max-age={EnvironmentVariables().listing_max_age}",
+        "Vary": "Accept-Encoding"
+    }
+    if _etag_matches(request.headers.get("if-none-match"), payload.etag):
+        return Response(status_code=304, headers=headers)
+
+    encoding = _choose_encoding(request.headers.get("accept-encoding"), payload.encoded)
+    if encoding is None:
+        return Response(payload.body, media_type="application/json", headers=headers)
+    headers["Content-Encoding"] = encoding
+    return Response(payload.encoded[encoding], media_type="application/json", headers=headers)
@@ -0,0 +1,138 @@
+"""This module defines the dependencies injected into the 
+Transmilenio API endpoints.
+
+Author: Juan Esteban Bedoya <jebedoyal@udistrital.edu.co>
+
+This file is part of SmartCommute project.
+
+SmartCommute is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+SmartCommute is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
+"""
+
+import hmac
+from functools import lru_cache
+from typing import Optional
+from fastapi import Depends, Header, HTTPException
+from environment_variables import EnvironmentVariables # pylint: disable=import-error
+from repositories.data_store import DataStore, get_data_store # pylint: disable=import-error
+from services.route import RouteServices # pylint: disable=import-error
+from services.station import StationServices # pylint: disable=import-error
+from services.travel_finder import TravelFinder # pylint: disable=import-error
+from services.data_reloader import DataReloader, StoreSnapshotHolder # pylint: disable=import-error
+from services.routing_pool import RoutingPool # pylint: disable=import-error
+from services.metrics import MetricsRegistry # pylint: disable=import-error
+
+def get_route_services(store: DataStore = Depends(get_data_store)) -> RouteServices:
+    """
+    Provides the route services backed by the shared data store.
+
+    Args:
+        store (DataStore): The process-wide data store.
+
+    Returns:
+        RouteServices: The route services.
+    """
+    return RouteServices(store)
+
+
+def get_station_services(store: DataStore = Depends(get_data_store)) -> StationServices:
+    """
+    Provides the station services backed by the shared data store.
+
+    Args:
+        store (DataStore): The process-wide data store.
+
+    Returns:
+        StationServices: The station services.
+    """
+    return StationServices(store)
+
+
+@lru_cache(maxsize=None)
+def get_travel_finder() -> TravelFinder:
+    """
+    Provides the travel finder of the process. It is created once because
+    it builds the network snapshot from the shared data store, and it keeps
+    recent search results when ROUTE_CACHE_SIZE is above 0. The snapshot is
+    attached to the data store, and the finder reads it from there.
+
+    Returns:
+        TravelFinder: The travel finder.
+    """
+    store = get_data_store()
+    finder = TravelFinder.from_environment(store.routes, store.stations)
+    store.snapshot = finder.snapshots.current()
+    finder.snapshots = StoreSnapshotHolder()
+    return finder
+
+
+@lru_cache(maxsize=None)
+def get_data_reloader() -> DataReloader:
+    """
+    Provides the data reloader of the process, exporting its reloads
+    through /metrics unless METRICS_ENABLED is 0.
+
+    Returns:
+        DataReloader: The data reloader.
+    """
+    return DataReloader(get_travel_finder(), get_metrics())
+
+
+@lru_cache(maxsize=None)
+def get_routing_pool() -> Optional[RoutingPool]:
+    """
+    Provides the worker processes that run travel searches, when
+    ROUTING_WORKERS is above 0.
+
+    Returns:
+        Optional[RoutingPool]: The routing pool, or None to search in the
+            web process.
+    """
+    env = EnvironmentVariables()
+    if env.routing_workers <= 0:
+        return None
+    return RoutingPool(env.routing_workers, env.routing_max_pending)
+
+
+@lru_cache(maxsize=None)
+def get_metrics() -> Optional[MetricsRegistry]:
+    """
+    Provides the metrics of the process, unless METRICS_ENABLED is 0.
+
+    Returns:
+        Optional[MetricsRegistry]: The metrics registry, or None when
+            instrumentation is disabled.
+    """
+    if not EnvironmentVariables().metrics_enabled:
+        return None
+    return MetricsRegistry()
+
+
+def verify_admin_token(x_admin_token: Optional[str] = Header(None)):
+    """
+    Rejects admin requests without the configured token. When ADMIN_TOKEN
+    is not set, every admin request is rejected.
+
+    Args:
+        x_admin_token (Optional[str]): The value of the X-Admin-Token header.
+
+    Raises:
+        HTTPException: If admin access is disabled or the token is missing
+            or wrong.
+    """
+    token = EnvironmentVariables().admin_token
+    if not token:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled.")
+    if x_admin_token is None or not hmac.compare_digest(
+            x_admin_token.encode("utf-8"), token.encode("utf-8")):
+        raise HTTPException(status_code=403, detail="Invalid admin token.")
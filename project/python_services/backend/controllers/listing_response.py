@@ -0,0 +1,95 @@
+"""This module is used to stream pages of Transmilenio stations and 
+routes as JSON.
+
+Author: Juan Esteban Bedoya <jebedoyal@udistrital.edu.co>
+
+This file is part of SmartCommute project.
+
+SmartCommute is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+SmartCommute is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
+"""
+
+import json
+from typing import Iterator, List, Optional
+from fastapi import HTTPException, Request
+from fastapi.responses import StreamingResponse
+from environment_variables import EnvironmentVariables # pylint: disable=import-error
+from repositories.record_listing import ListingPage # pylint: disable=import-error
+
+CHUNK_SIZE = 16 * 1024
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """
+    Splits the value of a `fields` query parameter.
+
+    Args:
+        fields (Optional[str]): Comma-separated field names, or None.
+
+    Returns:
+        Optional[List[str]]: The field names, or None for every field.
+
+    Raises:
+        HTTPException: If no field is named.
+    """
+    if fields is None:
+        return None
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    if not names:
+        raise HTTPException(status_code=400, detail="At least one field must be given.")
+    return names
+
+
+def _json_array(items: Iterator[dict]) -> Iterator[bytes]:
+    """
+    Serializes records as a JSON array in chunks of about CHUNK_SIZE bytes,
+    since every chunk sent from a thread costs a hop to the event loop.
+
+    Args:
+        items (Iterator[dict]): The records.
+
+    Yields:
+        bytes: The chunks of the array.
+    """
+    chunk = bytearray(b"[")
+    separator = b""
+    for item in items:
+        chunk += separator
+        chunk += json.dumps(item, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        separator = b","
+        if len(chunk) >= CHUNK_SIZE:
+            yield bytes(chunk)
+            chunk = bytearray()
+    chunk += b"]"
+    yield bytes(chunk)
+
+
+def listing_response(request: Request, page: ListingPage) -> StreamingResponse:
+    """
+    Streams a page of records as a JSON array. When there are more records,
+    the cursor of the next page is sent in the X-Next-Cursor header and the
+    URL of the next page in a Link header.
+
+    Args:
+        request (Request): The incoming request, whose URL the next page keeps.
+        page (ListingPage): The page to send.
+
+    Returns:
+        StreamingResponse: The response to send.
+    """
+    headers = {"Cache-Control": f"public, max-age={EnvironmentVariables().listing_max_age}"}
+    if page.next_cursor is not None:
+        next_url = request.url.include_query_params(cursor=page.next_cursor)
+        headers["X-Next-Cursor"] = page.next_cursor
+        headers["Link"] = f'<{next_url}>; rel="next"'
+    return StreamingResponse(_json_array(page.items), media_type="application/json",
+                             headers=headers)
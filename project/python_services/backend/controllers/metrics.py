@@ -0,0 +1,81 @@
+"""This module defines the endpoint exposing the metrics of the 
+SmartCommute API.
+
+Author: Juan Esteban Bedoya <jebedoyal@udistrital.edu.co>
+
+This file is part of SmartCommute project.
+
+SmartCommute is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+SmartCommute is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
+"""
+
+import time
+from typing import Awaitable, Callable, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import PlainTextResponse
+from services.metrics import MetricsRegistry # pylint: disable=import-error
+from controllers.dependencies import get_metrics # pylint: disable=import-error
+
+router = APIRouter()
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_all_metrics(metrics: Optional[MetricsRegistry] = Depends(get_metrics)) -> Response:
+    """Retrieves the metrics of the process in the Prometheus text format.
+
+    They hold the latency histograms of every endpoint and of each stage of
+    the travel searches, the candidates the searches examined, and the
+    outcome, duration and data version of the data reloads.
+
+    Args:
+        metrics (Optional[MetricsRegistry]): The metrics, if enabled.
+
+    Returns:
+        Response: The metrics exposition.
+
+    Raises:
+        HTTPException: If instrumentation is disabled.
+    """
+    if metrics is None:
+        raise HTTPException(status_code=404, detail="Metrics are disabled.")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+async def record_request_duration(
+    request: Request, call_next: Callable[[Request], Awaitable[Response]]
+) -> Response:
+    """
+    Middleware recording the latency of every request, labelled with the
+    path template of its endpoint so path parameters do not create new
+    series.
+
+    Args:
+        request (Request): The incoming request.
+        call_next (Callable[[Request], Awaitable[Response]]): The next handler.
+
+    Returns:
+        Response: The response of the endpoint.
+    """
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        metrics = get_metrics()
+        if metrics is not None:
+            route = request.scope.get("route")
+            metrics.request_duration.observe(
+                time.perf_counter() - start, request.method,
+                getattr(route, "path", "unmatched"), str(status)
+            )
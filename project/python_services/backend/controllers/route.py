@@ -19,34 +19,91 @@ You should have received a copy of the GNU General Public License
 along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
 """
 
-from typing import List
-from fastapi import APIRouter, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from starlette.concurrency import run_in_threadpool
 from services.route import RouteServices # pylint: disable=import-error
 from repositories.route import RouteDAO # pylint: disable=import-error
+from repositories.name_index import MATCH_MODES # pylint: disable=import-error
+from repositories.record_listing import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE # pylint: disable=import-error
+from controllers.dependencies import get_route_services # pylint: disable=import-error
+from controllers.cached_response import cached_json_response # pylint: disable=import-error
+from controllers.listing_response import ( # pylint: disable=import-error
+    listing_response, parse_fields
+)
 
 router = APIRouter()
 
-services = RouteServices()
-
-@router.get("/route/all")
-def get_all() -> List[RouteDAO]:
+@router.get("/route/all", response_model=List[RouteDAO])
+async def get_all( # pylint: disable=too-many-arguments,too-many-positional-arguments
+    request: Request,
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to return, e.g. 'id,name'"
+    ),
+    station: Optional[str] = Query(None, description="Only routes stopping at this station"),
+    day: Optional[str] = Query(None, description="Only routes scheduled on this weekday"),
+    cursor: Optional[str] = Query(None, description="The X-Next-Cursor of the previous page"),
+    limit: Optional[int] = Query(
+        None, ge=1, le=MAX_PAGE_SIZE,
+        description=f"Maximum number of routes per page (default {DEFAULT_PAGE_SIZE})"
+    ),
+    services: RouteServices = Depends(get_route_services)
+) -> Response:
     """Retrieves all Transmilenio routes.
 
+    Without parameters it runs on the event loop, since it only sends bytes
+    serialized when the data was loaded. Clients sending the last ETag in
+    If-None-Match get an empty 304 response, and clients accepting gzip or
+    brotli get the compressed body.
+
+    With any parameter, a page of routes is streamed instead, with only the
+    given fields. The X-Next-Cursor and Link headers point to the next page.
+
+    Args:
+        request (Request): The incoming request, read for caching headers.
+        fields (Optional[str]): Comma-separated fields to return.
+        station (Optional[str]): Only routes stopping at this station.
+        day (Optional[str]): Only routes whose schedule lists this weekday.
+        cursor (Optional[str]): The cursor of the previous page.
+        limit (Optional[int]): The maximum number of routes in the page.
+
     Returns:
-        List[RouteDAO]: A list of all available Transmilenio routes.
+        Response: A list of the Transmilenio routes.
+
+    Raises:
+        HTTPException: If a field, filter or cursor is not valid.
     """
-    return services.get_all()
+    if all(value is None for value in (fields, station, day, cursor, limit)):
+        return cached_json_response(request, services.get_all_serialized())
+    try:
+        page = await run_in_threadpool(services.get_page, parse_fields(fields), station, day,
+                                       cursor, limit or DEFAULT_PAGE_SIZE)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    return listing_response(request, page)
 
 
 @router.get("/route/by_name/{name}")
-def get_by_name(name: str) -> List[RouteDAO]:
+def get_by_name(
+    name: str,
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of results"),
+    match: str = Query(
+        "substring", pattern=f"^({'|'.join(MATCH_MODES)})$",
+        description="Matching mode: 'substring', 'prefix' or 'fuzzy'"
+    ),
+    services: RouteServices = Depends(get_route_services)
+) -> List[RouteDAO]:
     """Retrieves Transmilenio routes that match the given name.
 
     Args:
         name (str): The name of the route to search for.
+        limit (int): The maximum number of routes to return.
+        match (str): How the name is matched: "substring", "prefix" or
+            "fuzzy" (tolerates typos).
 
     Returns:
-        List[RouteDAO]: A list of routes matching the given name.
+        List[RouteDAO]: A list of routes matching the given name, best
+            matches first.
 
     Raises:
         HTTPException: If the name is empty.
@@ -54,4 +111,4 @@ def get_by_name(name: str) -> List[RouteDAO]:
     if not name:
         raise HTTPException(status_code=400,
                             detail="The name cannot be empty.")
-    return services.get_by_name(name)
+    return services.get_by_name(name, limit, match)
@@ -19,38 +19,278 @@ You should have received a copy of the GNU General Public License
 along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
 """
 
-from typing import Dict, Any
-from fastapi import APIRouter, HTTPException, Query
+import json
+import time
+from datetime import datetime
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.concurrency import iterate_in_threadpool, run_in_threadpool
+from fastapi.responses import StreamingResponse
 
-from services.travel_finder import TravelFinder  # pylint: disable=import-error
+from services.travel_finder import TravelFinder, TravelBatchDTO  # pylint: disable=import-error
+from services.routing_pool import RoutingPool, PoolSaturatedError  # pylint: disable=import-error
+from services.metrics import MetricsRegistry  # pylint: disable=import-error
+from services.travel.search_timings import SearchTimings  # pylint: disable=import-error
+from services.travel.raptor import MAX_TRANSFERS_LIMIT  # pylint: disable=import-error
+from services.travel.selection import DEFAULT_LIMIT, MAX_LIMIT  # pylint: disable=import-error
+from controllers.dependencies import get_travel_finder, get_routing_pool, get_metrics  # pylint: disable=import-error
 
 router = APIRouter()
 
-route_service = TravelFinder()
+# Pairs of a batch sent to a routing worker at a time.
+BATCH_CHUNK_PAIRS = 50
+
+def _local_time(departure: Optional[datetime]) -> Optional[datetime]:
+    """
+    Converts a departure time with a timezone to the server's local time.
+
+    Args:
+        departure (Optional[datetime]): The requested departure time.
+
+    Returns:
+        Optional[datetime]: The local departure time without a timezone.
+    """
+    if departure is not None and departure.tzinfo is not None:
+        return departure.astimezone().replace(tzinfo=None)
+    return departure
+
 
 @router.get("/route/find", response_model=Dict[str, Any])
-def find_route(
+# pylint: disable-next=too-many-arguments,too-many-positional-arguments,too-many-locals
+async def find_route(
+    response: Response,
     origin: str = Query(..., description="Name of the origin station"),
     destination: str = Query(..., description="Name of the destination station"),
     optimization: str = Query(
         "min_stations", 
-        description="Optimization criteria: 'min_stations' or 'min_transfers'"
-    )
+        description="Optimization criteria: 'min_stations', 'min_transfers', "
+                    "'multi_transfer' or 'min_time'"
+    ),
+    max_transfers: int = Query(
+        3, ge=0, le=MAX_TRANSFERS_LIMIT,
+        description="Maximum number of transfers for 'multi_transfer' and 'min_time'"
+    ),
+    departure: Optional[datetime] = Query(
+        None,
+        description="Departure date and time (ISO 8601); defaults to now"
+    ),
+    limit: int = Query(
+        DEFAULT_LIMIT, ge=1, le=MAX_LIMIT,
+        description="Number of routes returned by 'min_stations' and 'min_transfers'"
+    ),
+    route_service: TravelFinder = Depends(get_travel_finder),
+    pool: Optional[RoutingPool] = Depends(get_routing_pool),
+    metrics: Optional[MetricsRegistry] = Depends(get_metrics)
 ) -> Dict[str, Any]:
     """
     Endpoint to find routes between two Transmilenio stations.
 
+    The search runs in the routing worker processes when they are enabled,
+    otherwise in the threadpool, so the event loop is never blocked. Unless
+    METRICS_ENABLED is 0, the duration of each stage of the search is sent
+    in the Server-Timing header and recorded in /metrics.
+
     Args:
+        response (Response): The response, to set the Server-Timing header.
         origin (str): The origin station.
         destination (str): The destination station.
         optimization (str): The optimization criterion. Can be "min_stations"
-            (fewer stations visited) or "min_transfers" (fewer transfers).
+            (fewer stations visited), "min_transfers" (fewer transfers) or
+            "multi_transfer" (every best trade-off with up to `max_transfers`
+            transfers) or "min_time" (every best trade-off between transfers
+            and arrival time, following the departures of the routes).
+        max_transfers (int): The maximum number of transfers allowed by
+            "multi_transfer" and "min_time".
+        departure (Optional[datetime]): When the trip starts. Routes are
+            checked against their schedule at this moment, and "min_time"
+            waits for the departures after it; times with a timezone are
+            converted to the server's local time.
+        limit (int): The number of routes returned by "min_stations" and
+            "min_transfers".
+        route_service (TravelFinder): The shared travel finder.
+        pool (Optional[RoutingPool]): The routing workers, if enabled.
+        metrics (Optional[MetricsRegistry]): The metrics, if enabled.
 
     Returns:
         Dict[str, Any]: A dictionary with the found routes or an error message
             if no routes are found.
+
+    Raises:
+        HTTPException: 404 if no route is found, 503 if the routing workers
+            are saturated.
+    """
+    args = (origin, destination, optimization, max_transfers, _local_time(departure), limit)
+    timings = SearchTimings() if metrics is not None else None
+    start = time.perf_counter()
+    if pool is None:
+        result = await run_in_threadpool(route_service.find_routes, *args, timings=timings)
+    else:
+        try:
+            result = await pool.find_routes(*args, timings=timings)
+        except PoolSaturatedError as e:
+            raise HTTPException(status_code=503, detail="Too many searches, retry shortly.",
+                                headers={"Retry-After": "1"}) from e
+    headers = None
+    if timings is not None:
+        timings.record("total", time.perf_counter() - start)
+        if optimization not in route_service.strategies:
+            optimization = "min_stations"
+        metrics.observe_search(optimization, timings.stages, timings.counts)
+        headers = {"Server-Timing": timings.server_timing()}
+        response.headers.update(headers)
+    if "error" in result:
+        raise HTTPException(status_code=404, detail=result["error"], headers=headers)
+    return result
+
+
+@router.post("/route/find/batch")
+async def find_routes_batch(
+    batch: TravelBatchDTO,
+    route_service: TravelFinder = Depends(get_travel_finder),
+    pool: Optional[RoutingPool] = Depends(get_routing_pool),
+    metrics: Optional[MetricsRegistry] = Depends(get_metrics)
+) -> StreamingResponse:
+    """
+    Endpoint to find routes for many origin and destination pairs at once.
+
+    Every pair is searched at the same departure time. Results are streamed
+    as NDJSON, one line per pair in the order given, followed by a summary
+    line with the throughput. Like /route/find, the searches run in the
+    routing worker processes when they are enabled, otherwise in the
+    threadpool, and unless METRICS_ENABLED is 0 the stages of each search
+    are recorded in /metrics.
+
+    Without workers the whole batch is searched on the same data. With
+    workers it is sent to them in parts of `BATCH_CHUNK_PAIRS` pairs, so a
+    large batch does not hold one worker for its whole length; each part is
+    searched on the same data, and the parts after a data reload use the
+    new data. Only the first part counts against the bound on pending
+    searches: once a batch has started, it is not cut off midway.
+
+    Args:
+        batch (TravelBatchDTO): The pairs to search, with the shared
+            `max_transfers`, `departure` and `limit` parameters.
+        route_service (TravelFinder): The shared travel finder.
+        pool (Optional[RoutingPool]): The routing workers, if enabled.
+        metrics (Optional[MetricsRegistry]): The metrics, if enabled.
+
+    Returns:
+        StreamingResponse: Lines with the index, origin, destination,
+            optimization and result of each pair (the result holds an "error"
+            key when no route is found), then a line with the "summary".
+
+    Raises:
+        HTTPException: 422 if `max_transfers` is too large, 503 if the routing
+            workers are saturated.
+    """
+    if batch.max_transfers > MAX_TRANSFERS_LIMIT:
+        raise HTTPException(status_code=422,
+                            detail=f"max_transfers cannot exceed {MAX_TRANSFERS_LIMIT}.")
+    pairs = [(pair.origin, pair.destination, pair.optimization) for pair in batch.pairs]
+    args = (batch.max_transfers, _local_time(batch.departure) or datetime.now(), batch.limit,
+            metrics is not None)
+    start = time.perf_counter()
+    if pool is None:
+        results = iterate_in_threadpool(route_service.find_routes_batch(pairs, *args))
+    else:
+        try:
+            first = await pool.find_routes_batch(pairs[:BATCH_CHUNK_PAIRS], *args)
+        except PoolSaturatedError as e:
+            raise HTTPException(status_code=503, detail="Too many searches, retry shortly.",
+                                headers={"Retry-After": "1"}) from e
+        results = _pool_results(pool, pairs, args, first)
+
+    async def lines() -> AsyncIterator[bytes]:
+        index = 0
+        async for result, timings in results:
+            origin, destination, optimization = pairs[index]
+            if timings is not None:
+                metrics.observe_search(
+                    optimization if optimization in route_service.strategies
+                    else "min_stations",
+                    timings.stages, timings.counts
+                )
+            yield json.dumps({
+                "index": index, "origin": origin, "destination": destination,
+                "optimization": optimization, "result": result
+            }, ensure_ascii=False).encode("utf-8") + b"\n"
+            index += 1
+        elapsed = time.perf_counter() - start
+        yield json.dumps({"summary": {
+            "pairs": len(pairs),
+            "seconds": round(elapsed, 6),
+            "pairs_per_second": round(len(pairs) / elapsed, 1) if elapsed else None
+        }}).encode("utf-8") + b"\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+async def _pool_results(
+    pool: RoutingPool,
+    pairs: List[Tuple[str, str, str]],
+    args: tuple,
+    first: List[Tuple[dict, Optional[SearchTimings]]]
+) -> AsyncIterator[Tuple[dict, Optional[SearchTimings]]]:
+    """
+    Yields the results of a batch searched by the routing workers, one part
+    at a time.
+
+    Args:
+        pool (RoutingPool): The routing workers.
+        pairs (List[Tuple[str, str, str]]): Every pair of the batch.
+        args (tuple): The maximum transfers, departure, limit and whether the
+            searches are timed.
+        first (List[Tuple[dict, Optional[SearchTimings]]]): The results of the
+            first part, already admitted and searched.
+
+    Yields:
+        Tuple[dict, Optional[SearchTimings]]: The result of each pair and, if
+            timed, the timings of its search.
+    """
+    for item in first:
+        yield item
+    for offset in range(BATCH_CHUNK_PAIRS, len(pairs), BATCH_CHUNK_PAIRS):
+        chunk = pairs[offset:offset + BATCH_CHUNK_PAIRS]
+        for item in await pool.find_routes_batch(chunk, *args, admit=False):
+            yield item
+
+
+@router.get("/route/reachable", response_model=Dict[str, Any])
+def find_reachable(
+    origin: str = Query(..., description="Name of the origin station"),
+    max_stations: Optional[int] = Query(
+        None, ge=1, description="Maximum number of stations traveled; no limit by default"
+    ),
+    max_transfers: int = Query(
+        1, ge=0, le=MAX_TRANSFERS_LIMIT, description="Maximum number of transfers"
+    ),
+    departure: Optional[datetime] = Query(
+        None,
+        description="Departure date and time (ISO 8601); defaults to now"
+    ),
+    route_service: TravelFinder = Depends(get_travel_finder)
+) -> Dict[str, Any]:
+    """
+    Endpoint to find every station reachable from an origin, for coverage maps.
+
+    Args:
+        origin (str): The origin station.
+        max_stations (Optional[int]): The maximum number of stations traveled.
+        max_transfers (int): The maximum number of transfers.
+        departure (Optional[datetime]): When the trip starts. Routes are
+            checked against their schedule at this moment.
+        route_service (TravelFinder): The shared travel finder.
+
+    Returns:
+        Dict[str, Any]: The reachable stations, closest first, each with the
+            fewest stations traveled and the transfers it takes, and the
+            options that take fewer transfers but more stations.
+
+    Raises:
+        HTTPException: If the origin station does not exist.
     """
-    result = route_service.find_routes(origin, destination, optimization)
+    result = route_service.find_reachable(origin, max_stations, max_transfers,
+                                          _local_time(departure))
     if "error" in result:
         raise HTTPException(status_code=404, detail=result["error"])
     return result
@@ -28,15 +28,57 @@ load_dotenv(DOTENV_PATH)
 #pylint: disable=too-few-public-methods
 class EnvironmentVariables:
     """
-    Manages environment variables for data file paths.
+    Manages environment variables for data file paths and data reloading.
     """
 
     def __init__(self):
         """Initializes environment variables for data storage paths.
 
         Attributes:
-            path_routes_data (str | None): Path to the routes data file.
-            path_stations_data (str | None): Path to the stations data file.
+            path_routes_data (str | None): Path to the routes data file, either
+                JSON or compiled by `compile_data`.
+            path_stations_data (str | None): Path to the stations data file,
+                either JSON or compiled by `compile_data`.
+            reload_watch_interval (float): Seconds between checks of the data
+                files for changes; 0 disables the watcher.
+            admin_token (str | None): Token required by the admin endpoints;
+                when unset they reject every request.
+            listing_max_age (int): Seconds clients may reuse the full route
+                and station listings before revalidating them.
+            route_cache_size (int): Number of travel search results kept in
+                memory; 0 disables the cache.
+            route_cache_ttl (float): Seconds a cached travel search result is
+                reused; 0 keeps it until it is evicted or the data is reloaded.
+            pair_table_path (str | None): File holding the precomputed journeys
+                of every station pair; when unset nothing is precomputed.
+            pair_table_windows (int): Number of schedule windows precomputed.
+            pair_table_max_stations (int): Listed stations above which the
+                precomputed journeys are not built.
+            snapshot_path (str | None): File through which the worker processes
+                share the compiled network; when unset each builds its own.
+            routing_workers (int): Worker processes running travel searches; 0
+                runs them in the web process.
+            routing_max_pending (int): Searches that may run or wait in the
+                workers before new ones get a 503; 0 means 4 per worker.
+            metrics_enabled (bool): Whether travel searches are timed by stage,
+                reported in Server-Timing headers and /metrics; 0 disables it.
+            stream_min_bytes (int): Size from which JSON data files are read
+                one record at a time into compact arrays instead of being
+                parsed whole; 0 always parses them whole.
         """
         self.path_routes_data = os.getenv("PATH_ROUTES_DATA")
         self.path_stations_data = os.getenv("PATH_STATIONS_DATA")
+        self.reload_watch_interval = float(os.getenv("RELOAD_WATCH_INTERVAL", "0"))
+        self.admin_token = os.getenv("ADMIN_TOKEN")
+        self.listing_max_age = int(os.getenv("LISTING_MAX_AGE", "300"))
+        self.route_cache_size = int(os.getenv("ROUTE_CACHE_SIZE", "1024"))
+        self.route_cache_ttl = float(os.getenv("ROUTE_CACHE_TTL", "300"))
+        self.pair_table_path = os.getenv("PAIR_TABLE_PATH")
+        self.pair_table_windows = int(os.getenv("PAIR_TABLE_WINDOWS", "8"))
+        self.pair_table_max_stations = int(os.getenv("PAIR_TABLE_MAX_STATIONS", "200"))
+        self.snapshot_path = os.getenv("SNAPSHOT_PATH")
+        self.routing_workers = int(os.getenv("ROUTING_WORKERS", "0"))
+        self.routing_max_pending = int(os.getenv("ROUTING_MAX_PENDING", "0")) \
+            or 4 * self.routing_workers
+        self.metrics_enabled = bool(int(os.getenv("METRICS_ENABLED", "1")))
+        self.stream_min_bytes = int(os.getenv("STREAM_MIN_BYTES", str(64 << 20)))
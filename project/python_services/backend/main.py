@@ -19,16 +19,53 @@ You should have received a copy of the GNU General Public License
 along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
 """
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from controllers import route_router, station_router, travel_router # pylint: disable=import-error
+from controllers import ( # pylint: disable=import-error
+    route_router, station_router, travel_router, admin_router, metrics_router
+)
+from controllers.metrics import record_request_duration # pylint: disable=import-error
+from controllers.dependencies import get_data_reloader, get_routing_pool # pylint: disable=import-error
+from repositories.data_store import get_data_store # pylint: disable=import-error
+from environment_variables import EnvironmentVariables # pylint: disable=import-error
+from services.data_reloader import DataWatcher # pylint: disable=import-error
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    """Loads the shared data and builds the network snapshot, listings and
+    name indexes at startup, starts the routing workers when ROUTING_WORKERS is set, and watches the
+    data files for changes when RELOAD_WATCH_INTERVAL is set."""
+    get_data_store().warm()
+    reloader = get_data_reloader()
+    env = EnvironmentVariables()
+    pool = get_routing_pool()
+    if pool is not None:
+        await pool.start()
+        reloader.on_reload.append(pool.invalidate)
+    watcher = None
+    if env.reload_watch_interval > 0:
+        watcher = DataWatcher(reloader, [env.path_routes_data, env.path_stations_data],
+                              env.reload_watch_interval)
+        watcher.start()
+    yield
+    if watcher is not None:
+        watcher.stop()
+    if pool is not None:
+        pool.shutdown()
 
 app = FastAPI(
     title="SmartCommute",
     description="This project is used to manage stations, routes and \
     plan trips on Transmilenio.",
     version="0.0.1",
+    lifespan=lifespan,
 )
 
 app.include_router(route_router)
 app.include_router(station_router)
 app.include_router(travel_router)
+app.include_router(admin_router)
+app.include_router(metrics_router)
+
+if EnvironmentVariables().metrics_enabled:
+    app.middleware("http")(record_request_duration)
@@ -19,19 +19,38 @@ You should have received a copy of the GNU General Public License
 along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
 """
 
+import hashlib
 import json
+import os
 from abc import ABC, abstractmethod
+from typing import BinaryIO, Collection, Optional
+from environment_variables import EnvironmentVariables # pylint: disable=import-error
+from repositories.compiled_data import ( # pylint: disable=import-error
+    MAGIC, CompiledData, CompiledRecords
+)
 
 class BaseRepository(ABC):
     """Abstract base class for repositories handling Transmilenio data."""
 
 
-    def __init__(self, path_file: str):
+    def __init__(self, path_file: str, stream_min_bytes: Optional[int] = None):
         """Initializes the repository and loads data from a file.
 
         Args:
-            path_file (str): Path to the JSON file containing the data.
+            path_file (str): Path to the JSON file containing the data, or to
+                a file compiled from it by `compile_data`.
+            stream_min_bytes (Optional[int]): Size from which a JSON file is
+                read one record at a time; 0 always parses it whole. Defaults
+                to the STREAM_MIN_BYTES environment variable.
         """
+        self.path_file = path_file
+        if stream_min_bytes is None:
+            stream_min_bytes = EnvironmentVariables().stream_min_bytes
+        self.stream_min_bytes = stream_min_bytes
+        self.load_error: Exception | None = None
+        # SHA-256 of the JSON contents the data was loaded or compiled from.
+        self.digest: bytes | None = None
+        self.compiled: CompiledData | None = None
         self.data: list = []
         self._load_data(path_file)
 
@@ -39,19 +58,53 @@ class BaseRepository(ABC):
         """Loads data from the specified file.
 
         Args:
-            path_file (str): Path to the JSON file containing the data.
-
-        Raises:
-            FileNotFoundError: If the file is not found.
-            KeyError: If expected keys are missing in the JSON file.
+            path_file (str): Path to the JSON or compiled file containing the data.
+
+        A compiled file is memory-mapped and its records are decoded when
+        they are read. A JSON file of at least `stream_min_bytes` is read one
+        record at a time and each record is validated and packed into the
+        arrays of a compiled file held in memory, so neither the whole file
+        nor its parsed records are ever held at once. If the file is missing
+        or malformed, the error is kept in `load_error` and the repository is
+        left empty.
         """
         try:
-            with open(path_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                self.data = self._extract_data(data)
-        except (FileNotFoundError, KeyError) as e:
+            with open(path_file, "rb") as f:
+                if f.read(len(MAGIC)) == MAGIC:
+                    self.compiled = CompiledData(f, path_file)
+                    self.data, self.digest = self._extract_compiled(self.compiled)
+                    return
+                f.seek(0)
+                if 0 < self.stream_min_bytes <= os.fstat(f.fileno()).st_size:
+                    self.data, self.digest = self._extract_stream(f)
+                    return
+                raw = f.read()
+            data = json.loads(raw)
+            if not isinstance(data, dict):
+                raise ValueError("Expecting an object at the top level.")
+            self.data = self._extract_data(data)
+            self.digest = hashlib.sha256(raw).digest()
+        except (FileNotFoundError, KeyError, TypeError, ValueError) as e:
             print(f"Error loading data: {e}")
+            self.load_error = e
+            self.compiled = None
             self.data = []
+            self.digest = None
+
+    def project(self, position: int, fields: Collection[str]) -> dict:
+        """Reads some fields of a record. Records of a compiled file only
+        decode the fields asked for.
+
+        Args:
+            position (int): The position of the record in `data`.
+            fields (Collection[str]): The fields to read.
+
+        Returns:
+            dict: The record with the given fields, in record order.
+        """
+        if isinstance(self.data, CompiledRecords):
+            return self.data.project(position, fields)
+        return {key: value for key, value in self.data[position].items() if key in fields}
 
     @abstractmethod
     def _extract_data(self, data: dict):
@@ -66,3 +119,34 @@ class BaseRepository(ABC):
         This method must be implemented by subclasses.
         """
         pass # pylint: disable=unnecessary-pass
+
+    @abstractmethod
+    def _extract_stream(self, file: BinaryIO):
+        """Reads, validates and packs the relevant records of a JSON file one
+        at a time.
+
+        Args:
+            file (BinaryIO): The open JSON file, at its start.
+
+        Returns:
+            tuple: The records, in the format of `_extract_compiled`, and the
+                SHA-256 of the file.
+
+        This method must be implemented by subclasses.
+        """
+        pass # pylint: disable=unnecessary-pass
+
+    @abstractmethod
+    def _extract_compiled(self, compiled: CompiledData):
+        """Extracts the relevant records from a compiled data file.
+
+        Args:
+            compiled (CompiledData): The mapped file.
+
+        Returns:
+            tuple: The records, in the format of `_extract_data`, and the
+                SHA-256 of the JSON file they were compiled from.
+
+        This method must be implemented by subclasses.
+        """
+        pass # pylint: disable=unnecessary-pass
@@ -0,0 +1,451 @@
+"""This module is used to store Transmilenio route and station data
+in a compact binary file that is memory-mapped instead of parsed.
+
+Author: Juan Esteban Bedoya <jebedoyal@udistrital.edu.co>
+
+This file is part of SmartCommute project.
+
+SmartCommute is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+SmartCommute is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
+"""
+
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from collections.abc import Sequence as SequenceABC
+from functools import cached_property
+from typing import BinaryIO, Callable, Collection, Dict, List, Optional, Sequence, Tuple
+
+MAGIC = b"SCDB"
+FORMAT_VERSION = 2
+BYTE_ORDERS = ("little", "big")
+HEADER = struct.Struct("<4sHH32s32sI")
+SECTION = struct.Struct("<QQ")
+ALIGNMENT = 8
+
+# Sections of the file and the type of their items, in file order. Every
+# string is stored once in the string table and referenced by its number.
+SECTIONS: Tuple[Tuple[str, str], ...] = (
+    ("string_offsets", "I"), ("string_bytes", "B"),
+    ("route_ids", "I"), ("route_names", "I"),
+    ("route_stop_offsets", "I"), ("route_stops", "I"),
+    ("route_entry_offsets", "I"), ("entry_field_offsets", "I"),
+    ("field_keys", "I"), ("field_values", "I"),
+    ("station_ids", "I"), ("station_names", "I"),
+    ("station_route_offsets", "I"), ("station_routes", "I"),
+    ("route_run_offsets", "I"), ("route_run_times", "d"),
+    ("network", "B")
+)
+
+class CompiledRecords(SequenceABC):
+    """
+    Read-only list of records decoded from a compiled data file when they
+    are accessed, so loading the file does not build any of them.
+    """
+
+    def __init__(self, length: int, decode: Callable[[int, Optional[Collection[str]]], dict]):
+        """
+        Initializes the list.
+
+        Args:
+            length (int): The number of records.
+            decode (Callable[[int, Optional[Collection[str]]], dict]): Builds the
+                record at a position, with only the given fields if any.
+        """
+        self._length = length
+        self._decode = decode
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("record index out of range")
+        return self._decode(index, None)
+
+    def project(self, index: int, fields: Collection[str]) -> dict:
+        """
+        Decodes only some fields of a record.
+
+        Args:
+            index (int): The position of the record.
+            fields (Collection[str]): The fields to decode.
+
+        Returns:
+            dict: The record with the given fields.
+        """
+        return self._decode(index, fields)
+
+
+class CompiledData:
+    """
+    Routes and stations read from a file written by `write_compiled_data`.
+
+    The file is memory-mapped and its arrays are used in place. It also holds
+    the compiled network snapshot, which the travel planner reads without
+    preparing the data again.
+    """
+
+    def __init__(self, file: BinaryIO, path: str): # pylint: disable=too-many-locals
+        """
+        Maps and validates a compiled data file.
+
+        Args:
+            file (BinaryIO): The open file.
+            path (str): The path of the file, for error messages.
+
+        Raises:
+            ValueError: If the file is not compiled data of this format or is
+                corrupted.
+        """
+        self.path = path
+        data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, byte_order, self.routes_digest, self.stations_digest, checksum = \
+                HEADER.unpack_from(data)
+        except struct.error as e:
+            raise ValueError(f"{path} is not compiled data.") from e
+        if magic != MAGIC or version != FORMAT_VERSION \
+                or byte_order != BYTE_ORDERS.index(sys.byteorder):
+            raise ValueError(f"{path} is not compiled data of version {FORMAT_VERSION}.")
+        view = memoryview(data)
+        if zlib.crc32(view[HEADER.size:]) != checksum:
+            raise ValueError(f"{path} is corrupted.")
+
+        self.sections: Dict[str, memoryview] = {}
+        for index, (name, typecode) in enumerate(SECTIONS):
+            offset, items = SECTION.unpack_from(data, HEADER.size + index * SECTION.size)
+            size = items * array(typecode).itemsize
+            if offset + size > len(data):
+                raise ValueError(f"{path} is truncated.")
+            self.sections[name] = view[offset:offset + size].cast(typecode)
+
+    @classmethod
+    def from_sections(
+        cls,
+        sections: Sequence[Sequence],
+        path: str,
+        routes_digest: bytes,
+        stations_digest: bytes
+    ) -> "CompiledData":
+        """
+        Wraps sections packed in memory, such as the ones of a JSON file read
+        incrementally, without copying them.
+
+        Args:
+            sections (Sequence[Sequence]): The items of each section of SECTIONS.
+            path (str): Where the data comes from, for error messages.
+            routes_digest (bytes): The SHA-256 of the routes JSON file.
+            stations_digest (bytes): The SHA-256 of the stations JSON file.
+
+        Returns:
+            CompiledData: The compiled data.
+        """
+        compiled = cls.__new__(cls)
+        compiled.path = path
+        compiled.routes_digest = routes_digest
+        compiled.stations_digest = stations_digest
+        compiled.sections = {
+            name: memoryview(values).cast("B").cast(typecode)
+            for (name, typecode), values in zip(SECTIONS, sections)
+        }
+        return compiled
+
+    @property
+    def network(self) -> memoryview:
+        """
+        The network snapshot compiled from the data, as packed by
+        `services.travel.snapshot_file.snapshot_bytes`.
+
+        Returns:
+            memoryview: The bytes of the snapshot.
+        """
+        return self.sections["network"]
+
+    @cached_property
+    def strings(self) -> Tuple[str, ...]:
+        """
+        The string table, decoded on first use. Records share these strings
+        instead of holding their own copies.
+
+        Returns:
+            Tuple[str, ...]: The strings by number.
+        """
+        offsets = self.sections["string_offsets"]
+        blob = self.sections["string_bytes"]
+        return tuple(
+            str(blob[start:end], "utf-8") for start, end in zip(offsets, offsets[1:])
+        )
+
+    def routes(self) -> CompiledRecords:
+        """
+        Lists the routes as the "routes" array of the JSON data.
+
+        Returns:
+            CompiledRecords: The route records, in their original order.
+        """
+        return CompiledRecords(len(self.sections["route_ids"]), self._route)
+
+    def stations(self) -> CompiledRecords:
+        """
+        Lists the stations as the "stations" array of the JSON data.
+
+        Returns:
+            CompiledRecords: The station records, in their original order.
+        """
+        return CompiledRecords(len(self.sections["station_ids"]), self._station)
+
+    # pylint: disable-next=too-many-locals
+    def _route(self, index: int, fields: Optional[Collection[str]] = None) -> dict:
+        """
+        Decodes a route record.
+
+        Args:
+            index (int): The position of the route.
+            fields (Optional[Collection[str]]): The fields to decode, or None
+                for all of them.
+
+        Returns:
+            dict: The route, with the fields of a validated route or only the
+                given ones. Missing headways and run times are None.
+        """
+        strings = self.strings
+        sections = self.sections
+        route = {}
+        if fields is None or "id" in fields:
+            route["id"] = strings[sections["route_ids"][index]]
+        if fields is None or "name" in fields:
+            route["name"] = strings[sections["route_names"][index]]
+        if fields is None or "schedule" in fields:
+            entry_fields = sections["entry_field_offsets"]
+            keys = sections["field_keys"]
+            values = sections["field_values"]
+            entries = sections["route_entry_offsets"]
+            schedule = []
+            for entry in range(entries[index], entries[index + 1]):
+                start, end = entry_fields[entry], entry_fields[entry + 1]
+                entry = {
+                    strings[key]: strings[value]
+                    for key, value in zip(keys[start:end], values[start:end])
+                }
+                entry["headway"] = int(entry["headway"]) if "headway" in entry else None
+                schedule.append(entry)
+            route["schedule"] = schedule
+        if fields is None or "stations" in fields:
+            stops = sections["route_stop_offsets"]
+            route["stations"] = [
+                strings[station]
+                for station in sections["route_stops"][stops[index]:stops[index + 1]]
+            ]
+        if fields is None or "run_times" in fields:
+            runs = sections["route_run_offsets"]
+            route["run_times"] = sections["route_run_times"][
+                runs[index]:runs[index + 1]].tolist() if runs[index] < runs[index + 1] else None
+        return route
+
+    def _station(self, index: int, fields: Optional[Collection[str]] = None) -> dict:
+        """
+        Decodes a station record.
+
+        Args:
+            index (int): The position of the station.
+            fields (Optional[Collection[str]]): The fields to decode, or None
+                for all of them.
+
+        Returns:
+            dict: The station, with "id", "name" and "routes" keys or only the
+                given ones.
+        """
+        strings = self.strings
+        sections = self.sections
+        station = {}
+        if fields is None or "id" in fields:
+            station["id"] = strings[sections["station_ids"][index]]
+        if fields is None or "name" in fields:
+            station["name"] = strings[sections["station_names"][index]]
+        if fields is None or "routes" in fields:
+            routes = sections["station_route_offsets"]
+            station["routes"] = [
+                strings[route]
+                for route in sections["station_routes"][routes[index]:routes[index + 1]]
+            ]
+        return station
+
+
+class _StringTable:
+    """Numbers every distinct string in the order it is first added."""
+
+    def __init__(self):
+        """Initializes an empty table."""
+        self.numbers: Dict[str, int] = {}
+        self.offsets = array("I", [0])
+        self.blob = bytearray()
+
+    def add(self, value: str) -> int:
+        """
+        Interns a string.
+
+        Args:
+            value (str): The string.
+
+        Returns:
+            int: The number of the string.
+        """
+        number = self.numbers.get(value)
+        if number is None:
+            number = self.numbers[value] = len(self.numbers)
+            self.blob += value.encode("utf-8")
+            self.offsets.append(len(self.blob))
+        return number
+
+
+class CompiledDataBuilder:
+    """
+    Packs routes and stations into the sections of a compiled data file as
+    they are added, so the records never need to be held all at once.
+    """
+
+    def __init__(self):
+        """Initializes empty sections."""
+        self.strings = _StringTable()
+        self.columns: Dict[str, array] = {
+            name: array(typecode) for name, typecode in SECTIONS[2:-1]
+        }
+        for name in ("route_stop_offsets", "route_entry_offsets", "entry_field_offsets",
+                     "station_route_offsets", "route_run_offsets"):
+            self.columns[name].append(0)
+
+    def add_route(self, route: dict):
+        """
+        Packs a route.
+
+        Args:
+            route (dict): A validated route with "id", "name", "schedule",
+                "stations" and optionally "run_times" keys.
+        """
+        strings = self.strings
+        columns = self.columns
+        columns["route_ids"].append(strings.add(route["id"]))
+        columns["route_names"].append(strings.add(route["name"]))
+        columns["route_stops"].extend(strings.add(station) for station in route["stations"])
+        columns["route_stop_offsets"].append(len(columns["route_stops"]))
+        for entry in route["schedule"]:
+            for key, value in entry.items():
+                if value is None:
+                    continue
+                columns["field_keys"].append(strings.add(key))
+                columns["field_values"].append(strings.add(str(value)))
+            columns["entry_field_offsets"].append(len(columns["field_keys"]))
+        columns["route_entry_offsets"].append(len(columns["entry_field_offsets"]) - 1)
+        columns["route_run_times"].extend(route.get("run_times") or ())
+        columns["route_run_offsets"].append(len(columns["route_run_times"]))
+
+    def add_station(self, station: dict):
+        """
+        Packs a station.
+
+        Args:
+            station (dict): A validated station with "id", "name" and "routes" keys.
+        """
+        strings = self.strings
+        columns = self.columns
+        columns["station_ids"].append(strings.add(station["id"]))
+        columns["station_names"].append(strings.add(station["name"]))
+        columns["station_routes"].extend(strings.add(route) for route in station["routes"])
+        columns["station_route_offsets"].append(len(columns["station_routes"]))
+
+    def sections(self, network: Sequence = b"") -> List[Sequence]:
+        """
+        Lists the packed sections in file order.
+
+        Args:
+            network (Sequence): The network snapshot compiled from the same data.
+
+        Returns:
+            List[Sequence]: The items of each section of SECTIONS.
+        """
+        return [
+            self.strings.offsets, bytes(self.strings.blob),
+            *(self.columns[name] for name, _ in SECTIONS[2:-1]), network
+        ]
+
+    def build(
+        self, path: str, routes_digest: bytes = bytes(32), stations_digest: bytes = bytes(32)
+    ) -> CompiledData:
+        """
+        Wraps the packed sections, without a network snapshot, as compiled data
+        held in memory.
+
+        Args:
+            path (str): The file the records were read from, for error messages.
+            routes_digest (bytes): The SHA-256 of the routes JSON file.
+            stations_digest (bytes): The SHA-256 of the stations JSON file.
+
+        Returns:
+            CompiledData: The compiled data.
+        """
+        return CompiledData.from_sections(self.sections(), path, routes_digest,
+                                          stations_digest)
+
+
+# pylint: disable-next=too-many-arguments,too-many-positional-arguments,too-many-locals
+def write_compiled_data(
+    path: str,
+    routes: Sequence[dict],
+    stations: Sequence[dict],
+    routes_digest: bytes,
+    stations_digest: bytes,
+    network: bytes
+):
+    """
+    Writes validated routes and stations as a compiled data file. The file
+    is replaced atomically, so processes that mapped the previous file keep
+    a consistent view of it.
+
+    Args:
+        path (str): The path of the compiled file.
+        routes (Sequence[dict]): Routes with "id", "name", "schedule",
+            "stations" and optionally "run_times" keys.
+        stations (Sequence[dict]): Stations with "id", "name" and "routes" keys.
+        routes_digest (bytes): The SHA-256 of the routes JSON file.
+        stations_digest (bytes): The SHA-256 of the stations JSON file.
+        network (bytes): The network snapshot compiled from the same data.
+    """
+    builder = CompiledDataBuilder()
+    for route in routes:
+        builder.add_route(route)
+    for station in stations:
+        builder.add_station(station)
+
+    body = bytearray(SECTION.size * len(SECTIONS))
+    for index, ((_, typecode), section) in enumerate(zip(SECTIONS, builder.sections(network))):
+        data = memoryview(section).cast("B")
+        body += bytes(-(HEADER.size + len(body)) % ALIGNMENT)
+        SECTION.pack_into(body, index * SECTION.size, HEADER.size + len(body),
+                          len(data) // array(typecode).itemsize)
+        body += data
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, BYTE_ORDERS.index(sys.byteorder),
+                         routes_digest, stations_digest, zlib.crc32(body))
+
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as file:
+        file.write(header)
+        file.write(body)
+    os.replace(temporary, path)
@@ -0,0 +1,191 @@
+"""This module is used to share the Transmilenio data loaded 
+from disk between every service of a process.
+
+Author: Juan Esteban Bedoya <jebedoyal@udistrital.edu.co>
+
+This file is part of SmartCommute project.
+
+SmartCommute is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+SmartCommute is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
+"""
+
+from functools import cached_property
+from threading import Lock
+from typing import Any, List, Optional
+from repositories.base_repository import BaseRepository # pylint: disable=import-error
+from repositories.name_index import NameIndex # pylint: disable=import-error
+from repositories.record_listing import RecordListing # pylint: disable=import-error
+from repositories.route import ( # pylint: disable=import-error
+    RouteRepository, RouteDAO, ROUTE_FIELDS, ROUTE_FILTERS
+)
+from repositories.station import ( # pylint: disable=import-error
+    StationRepository, StationDAO, STATION_FIELDS, STATION_FILTERS
+)
+from repositories.serialized_payload import SerializedPayload # pylint: disable=import-error
+
+def _names(repository: BaseRepository) -> List[str]:
+    """
+    Reads the name of every record without building its object.
+
+    Args:
+        repository (BaseRepository): The repository to read.
+
+    Returns:
+        List[str]: The names, in record order.
+    """
+    return [repository.project(position, ("name",))["name"]
+            for position in range(len(repository.data))]
+
+
+class DataStore:
+    """
+    Holds the route and station repositories of the process, so each data
+    file is parsed and kept in memory only once.
+    """
+
+    def __init__(
+        self,
+        routes: Optional[RouteRepository] = None,
+        stations: Optional[StationRepository] = None
+    ):
+        """
+        Initializes the store, loading the repositories that are not given.
+
+        Args:
+            routes (Optional[RouteRepository]): The route repository to share.
+            stations (Optional[StationRepository]): The station repository to share.
+        """
+        self.routes = routes if routes is not None else RouteRepository()
+        self.stations = stations if stations is not None else StationRepository()
+        # The network snapshot built from these repositories, attached before
+        # the store is published so both are replaced by one assignment.
+        self.snapshot: Optional[Any] = None
+
+    def warm(self) -> "DataStore":
+        """
+        Builds the name indexes, serialized payloads and listings with their
+        filter indexes now, so no request builds them on the event loop.
+        Called at startup and on each reload before the store is swapped in.
+
+        None of them keeps the route or station objects: the indexes hold
+        record positions and the payloads their compressed bodies.
+
+        Returns:
+            DataStore: The same store.
+        """
+        for name in ("route_names", "route_payload", "station_names", "station_payload"):
+            getattr(self, name)
+        for listing in (self.route_listing, self.station_listing):
+            for name in listing.filters:
+                listing.index(name)
+        return self
+
+    @cached_property
+    def route_names(self) -> NameIndex[RouteDAO]:
+        """
+        Name index over the routes, built on first use.
+
+        Returns:
+            NameIndex[RouteDAO]: The route name index.
+        """
+        return NameIndex(_names(self.routes), self.routes.get_route)
+
+    @cached_property
+    def route_payload(self) -> SerializedPayload:
+        """
+        The routes serialized as a JSON response body, built on first use.
+
+        Returns:
+            SerializedPayload: The serialized routes.
+        """
+        routes = self.routes
+        return SerializedPayload(map(routes.get_route, range(len(routes.data))))
+
+    @cached_property
+    def route_listing(self) -> RecordListing:
+        """
+        Paginated listing of the routes, with its filter indexes built on
+        first use.
+
+        Returns:
+            RecordListing: The route listing.
+        """
+        return RecordListing(self.routes, ROUTE_FIELDS, ROUTE_FILTERS)
+
+    @cached_property
+    def station_names(self) -> NameIndex[StationDAO]:
+        """
+        Name index over the stations, built on first use.
+
+        Returns:
+            NameIndex[StationDAO]: The station name index.
+        """
+        return NameIndex(_names(self.stations), self.stations.get_station)
+
+    @cached_property
+    def station_payload(self) -> SerializedPayload:
+        """
+        The stations serialized as a JSON response body, built on first use.
+
+        Returns:
+            SerializedPayload: The serialized stations.
+        """
+        stations = self.stations
+        return SerializedPayload(map(stations.get_station, range(len(stations.data))))
+
+    @cached_property
+    def station_listing(self) -> RecordListing:
+        """
+        Paginated listing of the stations, with its filter indexes built on
+        first use.
+
+        Returns:
+            RecordListing: The station listing.
+        """
+        return RecordListing(self.stations, STATION_FIELDS, STATION_FILTERS)
+
+
+_store: Optional[DataStore] = None
+_store_lock = Lock()
+
+def get_data_store() -> DataStore:
+    """
+    Returns the process-wide data store, loading it on first use.
+
+    Returns:
+        DataStore: The shared data store.
+    """
+    global _store # pylint: disable=global-statement
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = DataStore()
+    return _store
+
+
+def set_data_store(store: DataStore) -> DataStore:
+    """
+    Replaces the process-wide data store. Requests that already hold the
+    previous store keep using it until they finish.
+
+    Args:
+        store (DataStore): The new data store.
+
+    Returns:
+        DataStore: The store that was replaced.
+    """
+    global _store # pylint: disable=global-statement
+    with _store_lock:
+        previous = _store
+        _store = store
+    return previous
@@ -0,0 +1,201 @@
+"""This module is used to read the records of very large Transmilenio
+data files one at a time instead of parsing the whole file at once.
+
+Author: Juan Esteban Bedoya <jebedoyal@udistrital.edu.co>
+
+This file is part of SmartCommute project.
+
+SmartCommute is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+SmartCommute is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
+"""
+
+import codecs
+import json
+import re
+from typing import Any, BinaryIO, Callable, Iterator, Optional
+
+# Bytes read from the file at a time.
+CHUNK_SIZE = 1 << 20
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+# Characters that may continue a number, such as its fraction or exponent.
+NUMBER_TAIL = re.compile(r"[0-9eE+\-.]*")
+
+class _Reader:
+    """
+    Text of a JSON file held from the current position to the end of the
+    last chunk read, so only the value being decoded stays in memory.
+    """
+
+    _decoder = json.JSONDecoder()
+
+    def __init__(self, file: BinaryIO, consume: Optional[Callable[[bytes], None]],
+                 chunk_size: int):
+        """
+        Initializes the reader at the start of the file.
+
+        Args:
+            file (BinaryIO): The open file, encoded as UTF-8.
+            consume (Optional[Callable[[bytes], None]]): Receives every chunk
+                read, such as the `update` of a hash.
+            chunk_size (int): The bytes read at a time.
+        """
+        self.file = file
+        self.consume = consume
+        self.chunk_size = chunk_size
+        self.text = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.position = 0
+        # Characters of the file dropped before the buffer.
+        self.dropped = 0
+        self.eof = False
+
+    def fill(self, size: Optional[int] = None):
+        """
+        Reads the next chunk, dropping the text before the current position.
+
+        Args:
+            size (Optional[int]): The bytes to read, `chunk_size` by default.
+
+        Raises:
+            ValueError: If the file is not valid UTF-8.
+        """
+        chunk = self.file.read(size or self.chunk_size)
+        if chunk and self.consume is not None:
+            self.consume(chunk)
+        self.eof = not chunk
+        self.dropped += self.position
+        self.buffer = self.buffer[self.position:] + self.text.decode(chunk, final=self.eof)
+        self.position = 0
+
+    def peek(self) -> str:
+        """
+        Skips whitespace and returns the next character without consuming it.
+
+        Returns:
+            str: The next character, or an empty string at the end of the file.
+        """
+        while True:
+            self.position = WHITESPACE.match(self.buffer, self.position).end()
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if self.eof:
+                return ""
+            self.fill()
+
+    def expect(self, characters: str) -> str:
+        """
+        Consumes the next character, which must be one of the given ones.
+
+        Args:
+            characters (str): The characters allowed.
+
+        Returns:
+            str: The character consumed.
+
+        Raises:
+            ValueError: If the next character is another one.
+        """
+        character = self.peek()
+        if not character or character not in characters:
+            expected = " or ".join(repr(allowed) for allowed in characters)
+            raise ValueError(f"Expecting {expected} at character {self.dropped + self.position}.")
+        self.position += 1
+        return character
+
+    def value(self) -> Any:
+        """
+        Decodes the next JSON value, reading chunks until it is complete.
+        Each chunk read for the same value is twice as large as the previous
+        one, so a value much larger than a chunk is decoded a logarithmic
+        number of times instead of once per chunk.
+
+        Returns:
+            Any: The value.
+
+        Raises:
+            ValueError: If the value is not valid JSON.
+        """
+        self.peek()
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.buffer, self.position)
+                # A number at the end of the buffer, even one followed by the
+                # start of its fraction or exponent, may continue in the next
+                # chunk.
+                if self.eof or NUMBER_TAIL.match(self.buffer, end).end() < len(self.buffer):
+                    self.position = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self.fill(size)
+            size *= 2
+
+
+def iter_json_array(
+    file: BinaryIO,
+    key: str,
+    consume: Optional[Callable[[bytes], None]] = None,
+    chunk_size: int = CHUNK_SIZE
+) -> Iterator[Any]:
+    """
+    Reads the items of an array stored under a key of a JSON object, one
+    at a time. The rest of the file is validated but not kept.
+
+    Args:
+        file (BinaryIO): The open file, encoded as UTF-8.
+        key (str): The key of the array in the top-level object.
+        consume (Optional[Callable[[bytes], None]]): Receives every chunk of
+            the file, up to its end, such as the `update` of a hash.
+        chunk_size (int): The bytes read at a time.
+
+    Yields:
+        Any: The items of the array, in order. Nothing is yielded when the
+            key is missing.
+
+    Raises:
+        ValueError: If the file is not valid JSON, its top level is not an
+            object, the value of the key is not an array or the key repeats.
+    """
+    reader = _Reader(file, consume, chunk_size)
+    reader.expect("{")
+    found = False
+    if reader.peek() == "}":
+        reader.expect("}")
+    else:
+        while True:
+            name = reader.value()
+            if not isinstance(name, str):
+                raise ValueError("Expecting a property name enclosed in double quotes.")
+            reader.expect(":")
+            if name != key:
+                reader.value()
+            elif found:
+                raise ValueError(f"Duplicate key {key!r}.")
+            else:
+                found = True
+                if reader.peek() != "[":
+                    raise ValueError(f"The value of {key!r} is not an array.")
+                reader.expect("[")
+                if reader.peek() == "]":
+                    reader.expect("]")
+                else:
+                    while True:
+                        yield reader.value()
+                        if reader.expect(",]") == "]":
+                            break
+            if reader.expect(",}") == "}":
+                break
+    if reader.peek():
+        raise ValueError("Extra data after the top-level object.")
@@ -0,0 +1,199 @@
+"""This module is used to search Transmilenio stations and routes 
+by name.
+
+Author: Juan Esteban Bedoya <jebedoyal@udistrital.edu.co>
+
+This file is part of SmartCommute project.
+
+SmartCommute is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+SmartCommute is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
+"""
+
+import unicodedata
+from array import array
+from typing import Callable, Dict, Generic, List, Sequence, Set, Tuple, TypeVar
+
+T = TypeVar("T")
+
+MATCH_MODES = ("substring", "prefix", "fuzzy")
+GRAM_SIZE = 3
+FUZZY_MIN_LENGTH = 4
+FUZZY_MIN_SIMILARITY = 0.5
+
+def fold_name(text: str) -> str:
+    """
+    Normalizes a name for searching: removes accents, lowercases it and
+    collapses whitespace.
+
+    Args:
+        text (str): The text to normalize.
+
+    Returns:
+        str: The folded text.
+    """
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.casefold().split())
+
+
+def _grams(text: str, size: int) -> Set[str]:
+    """
+    Lists the distinct substrings of a given size.
+
+    Args:
+        text (str): The text to split.
+        size (int): The length of the substrings.
+
+    Returns:
+        Set[str]: The distinct substrings of the text.
+    """
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+class NameIndex(Generic[T]):
+    """
+    Inverted index from the 1, 2 and 3 character substrings of every folded
+    name to the items containing them.
+
+    A query is answered by intersecting the posting lists of its grams and
+    confirming the few remaining candidates, so lookups do not depend on the
+    number of items. Results are ranked: exact match, name prefix, word
+    prefix, then any other substring, shorter names first.
+
+    Only the folded names are kept; the items found are loaded by position
+    when a search returns them.
+    """
+
+    def __init__(self, names: Sequence[str], load: Callable[[int], T]):
+        """
+        Builds the index.
+
+        Args:
+            names (Sequence[str]): The name of each item, in item order.
+            load (Callable[[int], T]): Builds the item at a position.
+        """
+        self.load = load
+        self.folded = [fold_name(name) for name in names]
+        postings: Dict[str, List[int]] = {}
+        for position, name in enumerate(self.folded):
+            for size in range(1, GRAM_SIZE + 1):
+                for gram in _grams(name, size):
+                    postings.setdefault(gram, []).append(position)
+        self.postings: Dict[str, array] = {
+            gram: array("I", positions) for gram, positions in postings.items()
+        }
+
+    def search(self, query: str, limit: int, match: str = "substring") -> List[T]:
+        """
+        Finds the items whose names match the query.
+
+        Args:
+            query (str): The name or partial name to look for.
+            limit (int): The maximum number of items to return.
+            match (str): "substring" for names containing the query, "prefix" for
+                names or words starting with it, "fuzzy" to also accept names
+                with typos after the substring matches.
+
+        Returns:
+            List[T]: The matching items, best matches first.
+        """
+        folded = fold_name(query)
+        if not folded or limit <= 0:
+            return []
+
+        ranked = []
+        for position in self._candidates(folded):
+            rank = self._rank(self.folded[position], folded)
+            if rank is None or (match == "prefix" and rank > 2):
+                continue
+            ranked.append((rank, len(self.folded[position]), self.folded[position], position))
+        ranked.sort()
+        positions = [position for *_, position in ranked[:limit]]
+
+        if match == "fuzzy" and len(positions) < limit and len(folded) >= FUZZY_MIN_LENGTH:
+            found = set(positions)
+            for position in self._similar(folded):
+                if position not in found:
+                    positions.append(position)
+                    if len(positions) == limit:
+                        break
+        return [self.load(position) for position in positions]
+
+    def _candidates(self, folded: str) -> List[int]:
+        """
+        Intersects the posting lists of the query grams.
+
+        Args:
+            folded (str): The folded query.
+
+        Returns:
+            List[int]: The positions of the items that may contain the query.
+        """
+        grams = _grams(folded, min(len(folded), GRAM_SIZE))
+        lists = sorted((self.postings.get(gram, ()) for gram in grams), key=len)
+        if not lists or not lists[0]:
+            return []
+        candidates = set(lists[0])
+        for positions in lists[1:]:
+            candidates.intersection_update(positions)
+            if not candidates:
+                break
+        return list(candidates)
+
+    @staticmethod
+    def _rank(name: str, folded: str):
+        """
+        Ranks how well a name matches the query.
+
+        Args:
+            name (str): The folded name.
+            folded (str): The folded query.
+
+        Returns:
+            int | None: 0 for an exact match, 1 for a name prefix, 2 for a word
+                prefix, 3 for another substring, or None if there is no match.
+        """
+        index = name.find(folded)
+        if index < 0:
+            return None
+        if name == folded:
+            return 0
+        if index == 0:
+            return 1
+        if name[index - 1] == " " or f" {folded}" in name:
+            return 2
+        return 3
+
+    def _similar(self, folded: str) -> List[int]:
+        """
+        Finds names sharing enough trigrams with the query to be a typo of it.
+
+        Args:
+            folded (str): The folded query.
+
+        Returns:
+            List[int]: The positions of similar names, most similar first.
+        """
+        grams = _grams(folded, GRAM_SIZE)
+        shared: Dict[int, int] = {}
+        for gram in grams:
+            for position in self.postings.get(gram, ()):
+                shared[position] = shared.get(position, 0) + 1
+        scored: List[Tuple[float, int, str, int]] = []
+        for position, count in shared.items():
+            similarity = count / len(grams)
+            if similarity >= FUZZY_MIN_SIMILARITY:
+                name = self.folded[position]
+                scored.append((-similarity, len(name), name, position))
+        scored.sort()
+        return [position for *_, position in scored]
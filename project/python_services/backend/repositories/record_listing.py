@@ -0,0 +1,204 @@
+"""This module is used to list Transmilenio stations and routes a 
+page at a time, filtered and projected through indexes.
+
+Author: Juan Esteban Bedoya <jebedoyal@udistrital.edu.co>
+
+This file is part of SmartCommute project.
+
+SmartCommute is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+SmartCommute is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
+"""
+
+import base64
+import binascii
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+from repositories.base_repository import BaseRepository # pylint: disable=import-error
+from repositories.name_index import fold_name # pylint: disable=import-error
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+class ListingPage(NamedTuple):
+    """A page of records and the cursor of the next page, if any."""
+    items: Iterator[dict]
+    next_cursor: Optional[str]
+
+
+class RecordListing:
+    """
+    Lists the records of a repository in file order, a page at a time.
+
+    Each filter maps a folded value, such as a station name, to the sorted
+    positions of the records having it. Its index is built on first use, so
+    a page is found by walking the shortest matching position list from the
+    cursor, and only the records of the page are read.
+
+    Cursors are opaque: they hold the digest of the data and the position of
+    the last record sent, so they stop being valid when the data changes.
+    """
+
+    def __init__(
+        self,
+        repository: BaseRepository,
+        fields: Tuple[str, ...],
+        filters: Dict[str, Callable[[dict], Iterable[str]]]
+    ):
+        """
+        Initializes the listing.
+
+        Args:
+            repository (BaseRepository): The repository whose records are listed.
+            fields (Tuple[str, ...]): The fields of a record, in response order.
+            filters (Dict[str, Callable[[dict], Iterable[str]]]): The values of
+                each filter in a record.
+        """
+        self.repository = repository
+        self.fields = fields
+        self.filters = filters
+        self.version = (repository.digest or b"").hex()[:16]
+        self._indexes: Dict[str, Dict[str, array]] = {}
+
+    def index(self, name: str) -> Dict[str, array]:
+        """
+        Returns the index of a filter, building it on first use.
+
+        Args:
+            name (str): The filter name.
+
+        Returns:
+            Dict[str, array]: The ascending record positions of each folded value.
+        """
+        index = self._indexes.get(name)
+        if index is None:
+            index = {}
+            values = self.filters[name]
+            for position, record in enumerate(self.repository.data):
+                for value in values(record):
+                    positions = index.setdefault(fold_name(value), array("I"))
+                    if not positions or positions[-1] != position:
+                        positions.append(position)
+            self._indexes[name] = index
+        return index
+
+    def page( # pylint: disable=too-many-locals
+        self,
+        fields: Optional[Sequence[str]] = None,
+        filters: Optional[Dict[str, str]] = None,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> ListingPage:
+        """
+        Finds a page of records.
+
+        Args:
+            fields (Optional[Sequence[str]]): The fields to return, or None for
+                all of them.
+            filters (Optional[Dict[str, str]]): The value each listed record
+                must have for each filter.
+            cursor (Optional[str]): The cursor returned with the previous page,
+                or None for the first page.
+            limit (int): The maximum number of records in the page.
+
+        Returns:
+            ListingPage: The records, read as they are sent, and the cursor of
+                the next page.
+
+        Raises:
+            ValueError: If a field or filter is unknown, or the cursor is
+                malformed or belongs to other data.
+        """
+        fields = self.fields if fields is None else tuple(fields)
+        unknown = [field for field in fields if field not in self.fields]
+        unknown += [name for name in filters or {} if name not in self.filters]
+        if unknown:
+            raise ValueError(f"Unknown fields or filters: {', '.join(unknown)}.")
+        after = self._decode_cursor(cursor) if cursor else -1
+
+        if filters:
+            lists: List[Sequence[int]] = [
+                self.index(name).get(fold_name(value), array("I"))
+                for name, value in filters.items()
+            ]
+            lists.sort(key=len)
+            shortest, others = lists[0], lists[1:]
+            candidates: Iterable[int] = (
+                position for position in shortest[bisect_right(shortest, after):]
+                if all(_contains(positions, position) for positions in others)
+            )
+        else:
+            candidates = range(after + 1, len(self.repository.data))
+
+        positions = []
+        for position in candidates:
+            positions.append(position)
+            if len(positions) > limit:
+                break
+        next_cursor = None
+        if len(positions) > limit:
+            positions.pop()
+            next_cursor = self._encode_cursor(positions[-1])
+        selected = set(fields)
+        items = (self.repository.project(position, selected) for position in positions)
+        return ListingPage(items, next_cursor)
+
+    def _encode_cursor(self, position: int) -> str:
+        """
+        Builds the cursor that resumes after a record.
+
+        Args:
+            position (int): The position of the last record sent.
+
+        Returns:
+            str: The cursor.
+        """
+        return base64.urlsafe_b64encode(f"{self.version}:{position}".encode()).decode()
+
+    def _decode_cursor(self, cursor: str) -> int:
+        """
+        Reads a cursor built by `_encode_cursor`.
+
+        Args:
+            cursor (str): The cursor.
+
+        Returns:
+            int: The position of the last record sent.
+
+        Raises:
+            ValueError: If the cursor is malformed or belongs to other data.
+        """
+        try:
+            version, _, position = base64.urlsafe_b64decode(cursor.encode()).decode() \
+                .partition(":")
+            after = int(position)
+        except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+            raise ValueError("The cursor is not valid.") from e
+        if version != self.version or after < 0:
+            raise ValueError("The cursor is not valid for the current data.")
+        return after
+
+
+def _contains(positions: Sequence[int], position: int) -> bool:
+    """
+    Checks whether a sorted list holds a position.
+
+    Args:
+        positions (Sequence[int]): The ascending positions.
+        position (int): The position to look for.
+
+    Returns:
+        bool: True if the position is in the list.
+    """
+    index = bisect_left(positions, position)
+    return index < len(positions) and positions[index] == position
@@ -19,26 +19,114 @@ You should have received a copy of the GNU General Public License
 along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
 """
 
-from pydantic import BaseModel
+import hashlib
+from typing import Any, BinaryIO, Optional
+from pydantic import BaseModel, ValidationError, field_validator
 from environment_variables import EnvironmentVariables # pylint: disable=import-error
 from repositories.base_repository import BaseRepository # pylint: disable=import-error
+from repositories.compiled_data import ( # pylint: disable=import-error
+    CompiledData, CompiledDataBuilder, CompiledRecords
+)
+from repositories.json_stream import iter_json_array # pylint: disable=import-error
+
+class ScheduleEntryDAO(BaseModel):
+    """Represents a period in which a Transmilenio route runs on a weekday.
+
+    Times are "HH:MM"; entries whose day or times cannot be parsed are
+    ignored by the travel planner. `headway` is the whole minutes between
+    departures, given as a number or a numeric string.
+    """
+    day: str = ""
+    start_time: str = ""
+    end_time: str = ""
+    headway: Optional[int] = None
+
+    @field_validator("headway", mode="before")
+    @classmethod
+    def check_headway(cls, value: Any) -> Optional[int]:
+        """Accepts a headway given as a whole number or a numeric string.
+
+        Args:
+            value (Any): The headway of the entry.
+
+        Returns:
+            Optional[int]: The minutes between departures, or None if missing.
+
+        Raises:
+            ValueError: If the headway is not a whole number of minutes
+                between 1 and a day.
+        """
+        if value is None:
+            return None
+        if isinstance(value, str) and value.strip().isdigit():
+            value = int(value)
+        if isinstance(value, bool) or not isinstance(value, int) or not 0 < value <= 24 * 60:
+            raise ValueError("headway must be a whole number of minutes between 1 and 1440")
+        return value
+
 
 class RouteDAO(BaseModel):
-    """Represents the data structure for Transmilenio routes."""
+    """Represents the data structure for Transmilenio routes.
+
+    `run_times` holds the minutes between each station and the next, when
+    they are known.
+    """
     id: str
     name: str
-    schedule: list[dict[str, str]]
+    schedule: list[ScheduleEntryDAO]
     stations: list[str]
+    run_times: Optional[list[float]] = None
+
+
+def validate_route(route: Any) -> RouteDAO:
+    """Validates a route record of the data file.
 
+    Args:
+        route (Any): The record.
+
+    Returns:
+        RouteDAO: The route.
+
+    Raises:
+        ValueError: If the record is invalid, naming the route and the first
+            invalid field.
+    """
+    try:
+        return RouteDAO.model_validate(route)
+    except ValidationError as e:
+        error = e.errors()[0]
+        location = ".".join(str(part) for part in error["loc"]) or "record"
+        route_id = route.get("id") if isinstance(route, dict) else None
+        raise ValueError(f"Route {route_id!r}: {location}: {error['msg']}") from None
+
+
+# The fields of a route record, in response order.
+ROUTE_FIELDS = tuple(RouteDAO.model_fields)
+
+# The values each listing filter matches in a route record: the names of
+# the stations it stops at and the days its schedule lists.
+ROUTE_FILTERS = {
+    "station": lambda route: route["stations"],
+    "day": lambda route: [entry.get("day", "") for entry in route["schedule"]]
+}
 
 class RouteRepository(BaseRepository):
     """Repository for managing Transmilenio route data."""
 
 
-    def __init__(self):
-        """Initializes the repository and loads route data."""
-        env = EnvironmentVariables()
-        super().__init__(env.path_routes_data)
+    def __init__(self, path_file: Optional[str] = None, stream_min_bytes: Optional[int] = None):
+        """Initializes the repository and loads route data.
+
+        Args:
+            path_file (Optional[str]): Path to the routes data file. Defaults to
+                the PATH_ROUTES_DATA environment variable.
+            stream_min_bytes (Optional[int]): Size from which a JSON file is
+                read one record at a time; 0 always parses it whole. Defaults
+                to the STREAM_MIN_BYTES environment variable.
+        """
+        if path_file is None:
+            path_file = EnvironmentVariables().path_routes_data
+        super().__init__(path_file, stream_min_bytes)
 
     def _extract_data(self, data: dict) -> list[dict]:
         """Extracts route data from the provided dictionary.
@@ -47,23 +135,64 @@ class RouteRepository(BaseRepository):
             data (dict): The raw data containing route information.
 
         Returns:
-            list[dict]: A list of dictionaries representing routes.
+            list[dict]: A list of dictionaries representing routes, with the
+                fields of `RouteDAO` as a streamed or compiled file has them.
+
+        Raises:
+            ValueError: If a route is invalid.
         """
-        return data.get("routes", [])
+        return [validate_route(route).model_dump() for route in data.get("routes", [])]
+
+    def _extract_stream(self, file: BinaryIO) -> tuple[CompiledRecords, bytes]:
+        """Reads route data from a JSON file one route at a time, validating
+        and packing each one as it is read.
+
+        Args:
+            file (BinaryIO): The open JSON file, at its start.
+
+        Returns:
+            tuple[CompiledRecords, bytes]: The route records and the SHA-256 of
+                the file.
+        """
+        builder = CompiledDataBuilder()
+        digest = hashlib.sha256()
+        for route in iter_json_array(file, "routes", digest.update):
+            builder.add_route(validate_route(route).model_dump())
+        return builder.build(self.path_file).routes(), digest.digest()
+
+    def _extract_compiled(self, compiled: CompiledData) -> tuple[CompiledRecords, bytes]:
+        """Extracts route data from a compiled data file.
+
+        Args:
+            compiled (CompiledData): The mapped file.
+
+        Returns:
+            tuple[CompiledRecords, bytes]: The route records and the SHA-256 of
+                the JSON file they were compiled from.
+        """
+        return compiled.routes(), compiled.routes_digest
 
     def get_routes(self) -> list[RouteDAO]:
         """Retrieves all Transmilenio routes.
 
         Returns:
             list[RouteDAO]: A list of route objects.
+
+        Raises:
+            ValueError: If a route is invalid.
+        """
+        return [validate_route(route) for route in self.data]
+
+    def get_route(self, position: int) -> RouteDAO:
+        """Retrieves the Transmilenio route at a position of the data.
+
+        Args:
+            position (int): The position of the route in `data`.
+
+        Returns:
+            RouteDAO: The route object.
+
+        Raises:
+            ValueError: If the route is invalid.
         """
-        routes = []
-        for route in self.data:
-            route_temp = RouteDAO(
-                id = route["id"],
-                name = route["name"],
-                schedule = route["schedule"],
-                stations = route["stations"]
-            )
-            routes.append(route_temp)
-        return routes
+        return validate_route(self.data[position])
@@ -0,0 +1,88 @@
+"""This module is used to keep Transmilenio data serialized and 
+compressed, ready to be sent.
+
+Author: Juan Esteban Bedoya <jebedoyal@udistrital.edu.co>
+
+This file is part of SmartCommute project.
+
+SmartCommute is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+SmartCommute is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
+"""
+
+import gzip
+import hashlib
+import json
+import zlib
+from typing import Dict, Iterable
+from pydantic import BaseModel
+
+try:
+    import brotli # pylint: disable=import-error
+except ImportError:
+    brotli = None
+
+class SerializedPayload:
+    """
+    JSON body of a list of models, serialized once together with its
+    compressed variants and an entity tag derived from its content.
+
+    Only the compressed variants are kept: the plain body is rebuilt from
+    the gzip one for the few clients that do not accept compression.
+    """
+
+    __slots__ = ("etag", "encoded")
+
+    def __init__(self, items: Iterable[BaseModel]):
+        """
+        Serializes and compresses the items one at a time, so neither the
+        models nor the plain body are ever held together.
+
+        Args:
+            items (Iterable[BaseModel]): The models to serialize, in order.
+        """
+        digest = hashlib.sha256()
+        gzip_compressor = zlib.compressobj(9, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        brotli_compressor = brotli.Compressor() if brotli is not None else None
+        gzip_parts = []
+        brotli_parts = []
+
+        def write(chunk: bytes):
+            digest.update(chunk)
+            gzip_parts.append(gzip_compressor.compress(chunk))
+            if brotli_compressor is not None:
+                brotli_parts.append(brotli_compressor.process(chunk))
+
+        separator = b"["
+        for item in items:
+            write(separator + json.dumps(
+                item.model_dump(mode="json"),
+                ensure_ascii=False, allow_nan=False, separators=(",", ":")
+            ).encode("utf-8"))
+            separator = b","
+        write(b"[]" if separator == b"[" else b"]")
+        gzip_parts.append(gzip_compressor.flush())
+        self.etag = f'"{digest.hexdigest()[:32]}"'
+        self.encoded: Dict[str, bytes] = {"gzip": b"".join(gzip_parts)}
+        if brotli_compressor is not None:
+            brotli_parts.append(brotli_compressor.finish())
+            self.encoded["br"] = b"".join(brotli_parts)
+
+    @property
+    def body(self) -> bytes:
+        """
+        The plain JSON body, decompressed from the gzip variant.
+
+        Returns:
+            bytes: The serialized items.
+        """
+        return gzip.decompress(self.encoded["gzip"])
@@ -19,9 +19,15 @@ You should have received a copy of the GNU General Public License
 along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
 """
 
+import hashlib
+from typing import BinaryIO, Optional
 from pydantic import BaseModel
 from environment_variables import EnvironmentVariables # pylint: disable=import-error
 from repositories.base_repository import BaseRepository # pylint: disable=import-error
+from repositories.compiled_data import ( # pylint: disable=import-error
+    CompiledData, CompiledDataBuilder, CompiledRecords
+)
+from repositories.json_stream import iter_json_array # pylint: disable=import-error
 
 class StationDAO(BaseModel):
     """Data structure representing a Transmilenio station."""
@@ -30,13 +36,31 @@ class StationDAO(BaseModel):
     routes: list[str]
 
 
+# The fields of a station record, in response order.
+STATION_FIELDS = tuple(StationDAO.model_fields)
+
+# The values each listing filter matches in a station record: the IDs of
+# the routes it lists.
+STATION_FILTERS = {
+    "route": lambda station: station["routes"]
+}
+
 class StationRepository(BaseRepository):
     """Repository for managing Transmilenio station data."""
 
-    def __init__(self):
-        """Initializes the repository and loads station data."""
-        env = EnvironmentVariables()
-        super().__init__(env.path_stations_data)
+    def __init__(self, path_file: Optional[str] = None, stream_min_bytes: Optional[int] = None):
+        """Initializes the repository and loads station data.
+
+        Args:
+            path_file (Optional[str]): Path to the stations data file. Defaults to
+                the PATH_STATIONS_DATA environment variable.
+            stream_min_bytes (Optional[int]): Size from which a JSON file is
+                read one record at a time; 0 always parses it whole. Defaults
+                to the STREAM_MIN_BYTES environment variable.
+        """
+        if path_file is None:
+            path_file = EnvironmentVariables().path_stations_data
+        super().__init__(path_file, stream_min_bytes)
 
     def _extract_data(self, data: dict) -> list[dict]:
         """Extracts station data from the provided dictionary.
@@ -49,6 +73,35 @@ class StationRepository(BaseRepository):
         """
         return data.get("stations", [])
 
+    def _extract_stream(self, file: BinaryIO) -> tuple[CompiledRecords, bytes]:
+        """Reads station data from a JSON file one station at a time, validating
+        and packing each one as it is read.
+
+        Args:
+            file (BinaryIO): The open JSON file, at its start.
+
+        Returns:
+            tuple[CompiledRecords, bytes]: The station records and the SHA-256 of
+                the file.
+        """
+        builder = CompiledDataBuilder()
+        digest = hashlib.sha256()
+        for station in iter_json_array(file, "stations", digest.update):
+            builder.add_station(StationDAO(**station).model_dump())
+        return builder.build(self.path_file).stations(), digest.digest()
+
+    def _extract_compiled(self, compiled: CompiledData) -> tuple[CompiledRecords, bytes]:
+        """Extracts station data from a compiled data file.
+
+        Args:
+            compiled (CompiledData): The mapped file.
+
+        Returns:
+            tuple[CompiledRecords, bytes]: The station records and the SHA-256 of
+                the JSON file they were compiled from.
+        """
+        return compiled.stations(), compiled.stations_digest
+
     def get_stations(self) -> list[StationDAO]:
         """Retrieves all Transmilenio stations.
 
@@ -64,3 +117,19 @@ class StationRepository(BaseRepository):
             )
             stations.append(route_temp)
         return stations
+
+    def get_station(self, position: int) -> StationDAO:
+        """Retrieves the Transmilenio station at a position of the data.
+
+        Args:
+            position (int): The position of the station in `data`.
+
+        Returns:
+            StationDAO: The station object.
+        """
+        station = self.data[position]
+        return StationDAO(
+            id = station["id"],
+            name = station["name"],
+            routes = station["routes"]
+        )
@@ -0,0 +1,313 @@
+"""This module defines services for reloading Transmilenio data 
+without restarting the application.
+
+Author: Juan Esteban Bedoya <jebedoyal@udistrital.edu.co>
+
+This file is part of SmartCommute project.
+
+SmartCommute is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+SmartCommute is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
+"""
+
+import copy
+import os
+import time
+from threading import Event, Lock, Thread
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from repositories.compiled_data import CompiledRecords # pylint: disable=import-error
+from repositories.data_store import ( # pylint: disable=import-error
+    DataStore, get_data_store, set_data_store
+)
+from repositories.route import RouteRepository # pylint: disable=import-error
+from repositories.station import StationRepository # pylint: disable=import-error
+from services.metrics import MetricsRegistry # pylint: disable=import-error
+from services.travel_finder import TravelFinder # pylint: disable=import-error
+from services.travel.network_snapshot import NetworkSnapshot, SnapshotHolder # pylint: disable=import-error
+
+class ReloadError(Exception):
+    """Raised when the new data cannot be loaded or fails validation."""
+
+
+class ReloadMetrics:
+    """Counters and timings describing the reloads of the process."""
+
+    def __init__(self):
+        """Initializes every counter to zero."""
+        self.successes = 0
+        self.failures = 0
+        self.last_duration_seconds = 0.0
+        self.last_outcome: Optional[str] = None
+        self.last_error: Optional[str] = None
+        self.last_success_timestamp: Optional[float] = None
+        self.data_version: Optional[int] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Returns the metrics as a dictionary.
+
+        Returns:
+            Dict[str, Any]: The current values of the metrics.
+        """
+        return {
+            "reload_success_total": self.successes,
+            "reload_failure_total": self.failures,
+            "last_reload_duration_seconds": self.last_duration_seconds,
+            "last_reload_outcome": self.last_outcome,
+            "last_reload_error": self.last_error,
+            "last_reload_success_timestamp": self.last_success_timestamp,
+            "data_version": self.data_version
+        }
+
+
+class StoreSnapshotHolder(SnapshotHolder):
+    """
+    Serves the snapshot attached to the process-wide data store, so the
+    repositories and the snapshot built from them are always read as a
+    consistent pair and replaced by a single assignment.
+    """
+
+    def __init__(self):
+        """Initializes the holder over the current data store."""
+        super().__init__(get_data_store().snapshot)
+
+    def current(self) -> NetworkSnapshot:
+        """
+        Returns the snapshot of the data store currently being served.
+
+        Returns:
+            NetworkSnapshot: The current snapshot.
+        """
+        return get_data_store().snapshot
+
+    def swap(self, snapshot: NetworkSnapshot) -> NetworkSnapshot:
+        """
+        Publishes a copy of the current data store holding a new snapshot.
+
+        Args:
+            snapshot (NetworkSnapshot): The new snapshot to serve.
+
+        Returns:
+            NetworkSnapshot: The snapshot that was replaced.
+        """
+        with self._lock:
+            store = copy.copy(get_data_store())
+            store.snapshot = snapshot
+            return set_data_store(store).snapshot
+
+
+class DataReloader:
+    """
+    Loads the data files again, validates them, builds the derived indexes
+    and swaps everything in. Only one reload runs at a time.
+    """
+
+    def __init__(self, travel_finder: TravelFinder, registry: Optional[MetricsRegistry] = None):
+        """
+        Initializes the reloader.
+
+        Args:
+            travel_finder (TravelFinder): The travel finder whose snapshot is
+                replaced on each reload.
+            registry (Optional[MetricsRegistry]): Where the reloads are also
+                exported for /metrics, if instrumentation is enabled.
+        """
+        self.travel_finder = travel_finder
+        # Called with the new snapshot after each successful reload.
+        self.on_reload: List[Callable[[NetworkSnapshot], None]] = []
+        self.metrics = ReloadMetrics()
+        self.metrics.data_version = travel_finder.snapshots.current().version
+        self.registry = registry
+        if registry is not None:
+            registry.data_version.set(self.metrics.data_version)
+        self._lock = Lock()
+
+    def is_running(self) -> bool:
+        """
+        Tells whether a reload is in progress.
+
+        Returns:
+            bool: True if a reload is running.
+        """
+        return self._lock.locked()
+
+    def reload(self) -> Dict[str, Any]:
+        """
+        Reloads the data. On failure the current data keeps being served.
+
+        Returns:
+            Dict[str, Any]: The reload metrics after the reload.
+
+        Raises:
+            ReloadError: If the new data is invalid.
+        """
+        with self._lock:
+            start = time.perf_counter()
+            try:
+                store = self._load_store()
+                snapshot = self.travel_finder.reload(
+                    store.routes, store.stations, lambda built: self._publish(store, built)
+                )
+            except ReloadError as e:
+                self._record(start, "failure", str(e))
+                raise
+            except Exception as e: # pylint: disable=broad-exception-caught
+                self._record(start, "failure", str(e))
+                raise ReloadError(str(e)) from e
+            self.metrics.data_version = snapshot.version
+            self._record(start, "success", None)
+            for listener in self.on_reload:
+                listener(snapshot)
+            return self.metrics.as_dict()
+
+    @staticmethod
+    def _publish(store: DataStore, snapshot: NetworkSnapshot):
+        """
+        Attaches the new snapshot to the new store and publishes both at once.
+
+        Args:
+            store (DataStore): The new data store.
+            snapshot (NetworkSnapshot): The snapshot built from its repositories.
+        """
+        store.snapshot = snapshot
+        set_data_store(store)
+
+    @staticmethod
+    def load_repositories() -> Tuple[RouteRepository, StationRepository]:
+        """
+        Loads and validates new repositories, without building anything a
+        travel search does not use.
+
+        Returns:
+            Tuple[RouteRepository, StationRepository]: The new repositories.
+
+        Raises:
+            ReloadError: If a file cannot be read or its data is invalid.
+        """
+        routes, stations = RouteRepository(), StationRepository()
+        for repository in (routes, stations):
+            if repository.load_error is not None:
+                raise ReloadError(f"Cannot load {repository.path_file}: {repository.load_error}")
+            if not repository.data:
+                raise ReloadError(f"No data found in {repository.path_file}")
+        try:
+            # Compiled and streamed files were validated as they were packed.
+            if not isinstance(routes.data, CompiledRecords):
+                routes.get_routes()
+            if not isinstance(stations.data, CompiledRecords):
+                stations.get_stations()
+        except (KeyError, TypeError, ValueError) as e:
+            raise ReloadError(f"Invalid data: {e}") from e
+        return routes, stations
+
+    @staticmethod
+    def _load_store() -> DataStore:
+        """
+        Loads and validates new repositories, and builds the indexes and
+        payloads of the new store before it is served.
+
+        Returns:
+            DataStore: A store with the new repositories.
+
+        Raises:
+            ReloadError: If a file cannot be read or its data is invalid.
+        """
+        store = DataStore(*DataReloader.load_repositories())
+        try:
+            store.warm()
+        except (KeyError, TypeError, ValueError) as e:
+            raise ReloadError(f"Invalid data: {e}") from e
+        return store
+
+    def _record(self, start: float, outcome: str, error: Optional[str]):
+        """
+        Records the outcome of a reload.
+
+        Args:
+            start (float): The `time.perf_counter()` value when the reload began.
+            outcome (str): "success" or "failure".
+            error (Optional[str]): The error message of a failed reload.
+        """
+        self.metrics.last_duration_seconds = time.perf_counter() - start
+        self.metrics.last_outcome = outcome
+        self.metrics.last_error = error
+        if outcome == "success":
+            self.metrics.successes += 1
+            self.metrics.last_success_timestamp = time.time()
+        else:
+            self.metrics.failures += 1
+        if self.registry is not None:
+            self.registry.observe_reload(outcome, self.metrics.last_duration_seconds,
+                                         self.metrics.data_version,
+                                         self.metrics.last_success_timestamp)
+
+
+class DataWatcher:
+    """
+    Polls the modification time of the data files and triggers a reload
+    when any of them changes.
+    """
+
+    def __init__(self, reloader: DataReloader, paths: List[str], interval: float):
+        """
+        Initializes the watcher.
+
+        Args:
+            reloader (DataReloader): The reloader to trigger.
+            paths (List[str]): The files to watch.
+            interval (float): Seconds between checks.
+        """
+        self.reloader = reloader
+        self.paths = paths
+        self.interval = interval
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+        self._last_seen = self._signature()
+
+    def start(self):
+        """Starts watching in a daemon thread."""
+        self._thread = Thread(target=self._run, name="data-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stops watching and waits for the thread to finish."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _signature(self) -> Tuple[Optional[float], ...]:
+        """
+        Reads the modification time of every watched file.
+
+        Returns:
+            Tuple[Optional[float], ...]: One modification time per file, None for
+                files that cannot be read.
+        """
+        signature = []
+        for path in self.paths:
+            try:
+                signature.append(os.stat(path).st_mtime)
+            except (OSError, TypeError):
+                signature.append(None)
+        return tuple(signature)
+
+    def _run(self):
+        """Checks the files until stopped, reloading after each change."""
+        while not self._stop.wait(self.interval):
+            signature = self._signature()
+            if signature == self._last_seen:
+                continue
+            self._last_seen = signature
+            try:
+                self.reloader.reload()
+            except ReloadError as e:
+                print(f"Error reloading data: {e}")
@@ -0,0 +1,264 @@
+"""This module defines the Prometheus-style metrics of the 
+SmartCommute API.
+
+Author: Juan Esteban Bedoya <jebedoyal@udistrital.edu.co>
+
+This file is part of SmartCommute project.
+
+SmartCommute is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+SmartCommute is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
+"""
+
+from bisect import bisect_left
+from threading import Lock
+from typing import Dict, List, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+                   2.5, 5.0)
+RELOAD_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+def _labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """
+    Formats a label set in the text exposition format.
+
+    Args:
+        names (Sequence[str]): The label names.
+        values (Sequence[str]): The label values, in the same order.
+
+    Returns:
+        str: The labels between braces, or an empty string without labels.
+    """
+    if not names:
+        return ""
+    escaped = (
+        str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        for value in values
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in zip(names, escaped)) + "}"
+
+
+class Counter:
+    """A monotonically increasing count per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()):
+        """
+        Initializes the counter.
+
+        Args:
+            name (str): The metric name.
+            description (str): The help text.
+            labels (Sequence[str]): The label names.
+        """
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self.values: Dict[Tuple[str, ...], float] = {}
+        self._lock = Lock()
+
+    def inc(self, *labels: str, amount: float = 1):
+        """
+        Increments the count of a label set.
+
+        Args:
+            *labels (str): The label values.
+            amount (float): The amount to add.
+        """
+        with self._lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self) -> List[str]:
+        """
+        Formats the current values.
+
+        Returns:
+            List[str]: One line per label set.
+        """
+        with self._lock:
+            values = list(self.values.items())
+        return [f"{self.name}{_labels(self.labels, key)} {value}" for key, value in values]
+
+
+class Gauge(Counter):
+    """A value per label set that may go up and down."""
+
+    kind = "gauge"
+
+    def set(self, value: float, *labels: str):
+        """
+        Replaces the value of a label set.
+
+        Args:
+            value (float): The new value.
+            *labels (str): The label values.
+        """
+        with self._lock:
+            self.values[labels] = value
+
+
+class Histogram:
+    """Observations counted in cumulative buckets, per label set."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        """
+        Initializes the histogram.
+
+        Args:
+            name (str): The metric name.
+            description (str): The help text.
+            labels (Sequence[str]): The label names.
+            buckets (Sequence[float]): The upper bounds of the buckets, ascending.
+        """
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # Per label set: the count of each bucket, then of +Inf, and the sum.
+        self.values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+        self._lock = Lock()
+
+    def observe(self, value: float, *labels: str):
+        """
+        Records an observation.
+
+        Args:
+            value (float): The observed value.
+            *labels (str): The label values.
+        """
+        bucket = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self.values.get(labels)
+            if entry is None:
+                entry = self.values[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+            entry[0][bucket] += 1
+            entry[1][0] += value
+
+    def samples(self) -> List[str]:
+        """
+        Formats the buckets, sum and count of every label set.
+
+        Returns:
+            List[str]: The sample lines.
+        """
+        with self._lock:
+            values = [(key, list(counts), total[0]) for key, (counts, total) in self.values.items()]
+        lines = []
+        bounds = [str(bound) for bound in self.buckets] + ["+Inf"]
+        for key, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket"
+                             f"{_labels(self.labels + ('le',), key + (bound,))} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, key)} {total}")
+            lines.append(f"{self.name}_count{_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    The metrics of the process, rendered in the Prometheus text format.
+
+    Each process keeps its own values; with several uvicorn workers, each
+    scrape reaches one of them.
+    """
+
+    def __init__(self):
+        """Creates the request and search metrics."""
+        self.request_duration = Histogram(
+            "smartcommute_http_request_duration_seconds",
+            "Time to answer an HTTP request.", ("method", "endpoint", "status")
+        )
+        self.search_stage_duration = Histogram(
+            "smartcommute_search_stage_duration_seconds",
+            "Time spent in each stage of a travel search.", ("optimization", "stage")
+        )
+        self.search_candidates = Counter(
+            "smartcommute_search_candidates_total",
+            "Candidates examined by travel searches.", ("optimization", "kind")
+        )
+        self.reloads = Counter(
+            "smartcommute_data_reloads_total", "Data reloads, by outcome.", ("outcome",)
+        )
+        self.reload_duration = Histogram(
+            "smartcommute_data_reload_duration_seconds", "Time to reload the data.",
+            buckets=RELOAD_BUCKETS
+        )
+        self.data_version = Gauge(
+            "smartcommute_data_version", "Version of the network snapshot being served."
+        )
+        self.last_reload_success = Gauge(
+            "smartcommute_data_last_reload_success_timestamp_seconds",
+            "Unix time of the last successful data reload."
+        )
+        self.metrics = (self.request_duration, self.search_stage_duration,
+                        self.search_candidates, self.reloads, self.reload_duration,
+                        self.data_version, self.last_reload_success)
+
+    def observe_search(self, optimization: str, stages: Dict[str, float],
+                       counts: Dict[str, int]):
+        """
+        Records the stages and counters of a travel search.
+
+        Args:
+            optimization (str): The optimization strategy of the search.
+            stages (Dict[str, float]): The seconds spent in each stage.
+            counts (Dict[str, int]): The candidates examined, by kind.
+        """
+        for stage, seconds in stages.items():
+            self.search_stage_duration.observe(seconds, optimization, stage)
+        for kind, amount in counts.items():
+            self.search_candidates.inc(optimization, kind, amount=amount)
+
+    def observe_reload(self, outcome: str, seconds: float, data_version: Optional[int],
+                       success_timestamp: Optional[float]):
+        """
+        Records the outcome of a data reload.
+
+        Args:
+            outcome (str): "success" or "failure".
+            seconds (float): The duration of the reload.
+            data_version (Optional[int]): The version of the snapshot served
+                after the reload.
+            success_timestamp (Optional[float]): The Unix time of the last
+                successful reload, if any.
+        """
+        self.reloads.inc(outcome)
+        self.reload_duration.observe(seconds)
+        if data_version is not None:
+            self.data_version.set(data_version)
+        if success_timestamp is not None:
+            self.last_reload_success.set(success_timestamp)
+
+    def render(self) -> str:
+        """
+        Formats every metric in the Prometheus text exposition format.
+
+        Returns:
+            str: The exposition, ending with a newline.
+        """
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
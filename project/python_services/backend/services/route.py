@@ -19,9 +19,13 @@ You should have received a copy of the GNU General Public License
 along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
 """
 
-from typing import List
+from typing import List, Optional, Sequence
 from pydantic import BaseModel
-from repositories.route import RouteRepository, RouteDAO # pylint: disable=import-error
+from repositories.route import RouteDAO # pylint: disable=import-error
+from repositories.data_store import DataStore # pylint: disable=import-error
+from repositories.record_listing import ListingPage, DEFAULT_PAGE_SIZE # pylint: disable=import-error
+from repositories.serialized_payload import SerializedPayload # pylint: disable=import-error
+from services.travel.schedule import WEEKDAYS # pylint: disable=import-error
 
 class RouteNameDTO(BaseModel):
     """
@@ -35,9 +39,14 @@ class RouteServices:
     Provides services for searching Transmilenio routes.
     """
 
-    def __init__(self):
-        """Initializes the service with a route repository."""
-        self.repository = RouteRepository()
+    def __init__(self, store: DataStore):
+        """Initializes the service with the shared data store.
+
+        Args:
+            store (DataStore): The data store holding the route repository.
+        """
+        self.store = store
+        self.repository = store.routes
 
     def get_all(self) -> List[RouteDAO]:
         """Retrieves all Transmilenio routes.
@@ -47,17 +56,65 @@ class RouteServices:
         """
         return self.repository.get_routes()
 
-    def get_by_name(self, name: str) -> RouteDAO:
+    def get_all_serialized(self) -> SerializedPayload:
+        """Retrieves all Transmilenio routes, already serialized as JSON.
+
+        Returns:
+            SerializedPayload: The routes as JSON bytes, with compressed
+                variants and an entity tag.
+        """
+        return self.store.route_payload
+
+    def get_page( # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        fields: Optional[Sequence[str]] = None,
+        station: Optional[str] = None,
+        day: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> ListingPage:
+        """Retrieves a page of Transmilenio routes, in file order.
+
+        Args:
+            fields (Optional[Sequence[str]]): The fields of each route to
+                return, or None for all of them.
+            station (Optional[str]): Only routes stopping at the station with
+                this name.
+            day (Optional[str]): Only routes whose schedule lists this weekday.
+            cursor (Optional[str]): The cursor of the previous page, or None for
+                the first page.
+            limit (int): The maximum number of routes in the page.
+
+        Returns:
+            ListingPage: The routes, read as they are sent, and the cursor of
+                the next page.
+
+        Raises:
+            ValueError: If the day, a field or the cursor is not valid.
+        """
+        filters = {}
+        if station is not None:
+            filters["station"] = station
+        if day is not None:
+            if day.strip().lower() not in WEEKDAYS:
+                raise ValueError(f"Unknown day: {day}.")
+            filters["day"] = day
+        return self.store.route_listing.page(fields, filters, cursor, limit)
+
+    def get_by_name(
+        self, name: str, limit: int = 20, match: str = "substring"
+    ) -> List[RouteDAO]:
         """Retrieves Transmilenio routes that match a given name.
 
+        Matching ignores case and accents. Exact matches come first, then
+        names starting with the given text, then any other match.
+
         Args:
             name (str): The name or partial name of the route.
+            limit (int): The maximum number of routes to return.
+            match (str): "substring", "prefix" or "fuzzy" (tolerates typos).
 
         Returns:
-            List[RouteDAO]: A list of routes containing the given name.
+            List[RouteDAO]: A list of routes matching the given name, best first.
         """
-        response = []
-        for route in self.repository.get_routes():
-            if name.lower() in route.name.lower():
-                response.append(route)
-        return response
+        return self.store.route_names.search(name, limit, match)
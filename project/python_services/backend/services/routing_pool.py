@@ -0,0 +1,321 @@
+"""This module is used to run travel searches in worker processes.
+
+Author: Juan Esteban Bedoya <jebedoyal@udistrital.edu.co>
+
+This file is part of SmartCommute project.
+
+SmartCommute is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+SmartCommute is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
+"""
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from queue import Empty
+from datetime import datetime
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from services.data_reloader import DataReloader # pylint: disable=import-error
+from services.travel_finder import TravelFinder # pylint: disable=import-error
+from services.travel.search_timings import SearchTimings # pylint: disable=import-error
+
+class PoolSaturatedError(Exception):
+    """Raised when the pool already holds as many searches as it accepts."""
+
+
+class _WorkerState:
+    """State of a worker process: the travel finder it loaded."""
+
+    def __init__(self):
+        """Initializes a worker that has not loaded any data."""
+        self.finder: Optional[TravelFinder] = None
+
+
+_WORKER = _WorkerState()
+
+def _start_worker(ready: multiprocessing.Queue):
+    """
+    Initializer of every worker: loads the repositories and the network
+    snapshot of its travel finder before the worker takes any search, then
+    tells the parent it is ready.
+
+    Args:
+        ready (multiprocessing.Queue): Receives the process ID of the worker.
+
+    Raises:
+        ReloadError: If the data files are invalid.
+    """
+    _WORKER.finder = TravelFinder.from_environment(*DataReloader.load_repositories())
+    ready.put(os.getpid())
+
+
+def _find_routes(timed: bool, *args) -> Tuple[dict, Optional[SearchTimings]]:
+    """
+    Runs `TravelFinder.find_routes` in a worker.
+
+    Args:
+        timed (bool): Whether the stages of the search are timed.
+        *args: The arguments of `TravelFinder.find_routes`.
+
+    Returns:
+        Tuple[dict, Optional[SearchTimings]]: The search result and, if timed,
+            the timings of the search.
+    """
+    timings = SearchTimings() if timed else None
+    return _WORKER.finder.find_routes(*args, timings=timings), timings
+
+
+def _find_routes_batch(
+    timed: bool, *args
+) -> List[Tuple[dict, Optional[SearchTimings]]]:
+    """
+    Runs `TravelFinder.find_routes_batch` in a worker.
+
+    Args:
+        timed (bool): Whether the stages of each search are timed.
+        *args: The pairs, maximum transfers, departure and limit of
+            `TravelFinder.find_routes_batch`.
+
+    Returns:
+        List[Tuple[dict, Optional[SearchTimings]]]: The result of each pair and,
+            if timed, the timings of its search.
+    """
+    return list(_WORKER.finder.find_routes_batch(*args, timed=timed))
+
+
+def _spawned():
+    """Runs in a worker once its initializer has loaded the data."""
+
+
+class RoutingPool: # pylint: disable=too-many-instance-attributes
+    """
+    Process pool for CPU-bound travel searches, so they run in parallel
+    instead of contending for the GIL of the web process.
+
+    Each worker loads the data once, when it starts. After the parent
+    reloads the data, a new set of workers is started and loaded while the
+    current ones keep searching, and searches go to the new workers once
+    every one of them is ready. At most `max_pending` searches are running
+    or waiting; further ones are rejected so callers can answer 503 instead
+    of queueing without bound.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        """
+        Creates the pool. Workers are spawned by `start()` or the first search.
+
+        Args:
+            workers (int): The number of worker processes.
+            max_pending (int): The maximum number of searches running or waiting.
+        """
+        self.workers = workers
+        self.max_pending = max_pending
+        self.generation = 0
+        self.pending = 0
+        self.rejected = 0
+        self.reload_failures = 0
+        self._context = multiprocessing.get_context("spawn")
+        self._lock = Lock()
+        self.executor, self._ready = self._create_executor()
+
+    def _create_executor(self) -> Tuple[ProcessPoolExecutor, multiprocessing.Queue]:
+        """
+        Creates a set of workers, none of them spawned yet.
+
+        Returns:
+            Tuple[ProcessPoolExecutor, multiprocessing.Queue]: The executor and
+                the queue its workers report to once they loaded the data.
+        """
+        ready = self._context.Queue()
+        executor = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=self._context,
+            initializer=_start_worker, initargs=(ready,)
+        )
+        return executor, ready
+
+    async def start(self):
+        """
+        Spawns every worker and waits until each one has loaded the data in
+        its initializer.
+
+        Raises:
+            BrokenProcessPool: If a worker failed to load the data.
+        """
+        await asyncio.get_running_loop().run_in_executor(
+            None, self._spawn, self.executor, self._ready
+        )
+
+    def _spawn(self, executor: ProcessPoolExecutor, ready: multiprocessing.Queue):
+        """
+        Spawns every worker of an executor and blocks until each one has
+        reported that it loaded the data.
+
+        Args:
+            executor (ProcessPoolExecutor): The executor to spawn.
+            ready (multiprocessing.Queue): The queue its workers report to.
+
+        Raises:
+            BrokenProcessPool: If a worker failed to load the data.
+        """
+        # While no worker is idle, each submission spawns another one.
+        for _ in range(self.workers):
+            executor.submit(_spawned)
+        started = 0
+        while started < self.workers:
+            try:
+                ready.get(timeout=0.5)
+                started += 1
+            except Empty:
+                # Raises once a worker failed in its initializer.
+                executor.submit(_spawned)
+
+    def invalidate(self, *_):
+        """
+        Replaces the workers with new ones loaded from the data files, so no
+        search waits for a worker to load them. Blocks until the new workers
+        are ready; the searches already given to the current ones finish
+        there. If the new workers fail to load the data, the current ones
+        keep serving.
+        """
+        with self._lock:
+            executor, ready = self._create_executor()
+            try:
+                self._spawn(executor, ready)
+            except BrokenProcessPool as e:
+                executor.shutdown(wait=False, cancel_futures=True)
+                self.reload_failures += 1
+                print(f"Error reloading the routing workers: {e}")
+                return
+            previous = self.executor
+            self.executor, self._ready = executor, ready
+            self.generation += 1
+            previous.shutdown(wait=False)
+
+    async def find_routes( # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        origin: str,
+        destination: str,
+        optimization: str,
+        max_transfers: int,
+        departure: Optional[datetime],
+        limit: int,
+        timings: Optional[SearchTimings] = None
+    ) -> dict:
+        """
+        Runs a search in a worker process.
+
+        Args:
+            origin (str): The starting station.
+            destination (str): The destination station.
+            optimization (str): The optimization strategy.
+            max_transfers (int): The maximum number of transfers.
+            departure (Optional[datetime]): The local departure time.
+            limit (int): The number of routes returned by candidate strategies.
+            timings (Optional[SearchTimings]): Where the stages timed in the
+                worker are added, if the search is timed.
+
+        Returns:
+            dict: The search result, as `TravelFinder.find_routes` returns it.
+
+        Raises:
+            PoolSaturatedError: If `max_pending` searches are already queued.
+        """
+        result, worker_timings = await self._run(
+            True, _find_routes, timings is not None, origin, destination,
+            optimization, max_transfers, departure, limit
+        )
+        if worker_timings is not None:
+            timings.merge(worker_timings)
+        return result
+
+    async def find_routes_batch( # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        pairs: Sequence[Tuple[str, str, str]],
+        max_transfers: int,
+        departure: datetime,
+        limit: int,
+        timed: bool,
+        admit: bool = True
+    ) -> List[Tuple[dict, Optional[SearchTimings]]]:
+        """
+        Runs part of a batch of searches in a worker process.
+
+        Args:
+            pairs (Sequence[Tuple[str, str, str]]): The origin, destination and
+                optimization of each search.
+            max_transfers (int): The maximum number of transfers.
+            departure (datetime): The local departure time.
+            limit (int): The number of routes returned by candidate strategies.
+            timed (bool): Whether the stages of each search are timed.
+            admit (bool): Whether the part is rejected when the pool is full.
+                The later parts of a batch whose first part was accepted are
+                not, so a batch is not cut off midway.
+
+        Returns:
+            List[Tuple[dict, Optional[SearchTimings]]]: The result of each pair,
+                as `TravelFinder.find_routes_batch` yields it.
+
+        Raises:
+            PoolSaturatedError: If `admit` is set and `max_pending` searches are
+                already queued.
+        """
+        return await self._run(admit, _find_routes_batch, timed, pairs, max_transfers,
+                               departure, limit)
+
+    async def _run(self, admit: bool, function: Callable, *args) -> Any:
+        """
+        Runs a function in a worker process, counting it as pending meanwhile.
+
+        Args:
+            admit (bool): Whether it is rejected when `max_pending` searches are
+                already queued.
+            function (Callable): The function to run.
+            *args: Its arguments.
+
+        Returns:
+            Any: What the function returned.
+
+        Raises:
+            PoolSaturatedError: If it is rejected.
+        """
+        if admit and self.pending >= self.max_pending:
+            self.rejected += 1
+            raise PoolSaturatedError(f"{self.pending} searches are already pending.")
+        self.pending += 1
+        try:
+            return await asyncio.wrap_future(self.executor.submit(function, *args))
+        finally:
+            self.pending -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Reports the load of the pool.
+
+        Returns:
+            Dict[str, Any]: The workers, pending and rejected searches, the
+                data generation and the reloads the workers failed.
+        """
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "rejected_total": self.rejected,
+            "data_generation": self.generation,
+            "reload_failures_total": self.reload_failures
+        }
+
+    def shutdown(self):
+        """Stops the workers, cancelling the searches still waiting."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
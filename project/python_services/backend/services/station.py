@@ -19,9 +19,12 @@ You should have received a copy of the GNU General Public License
 along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
 """
 
-from typing import List
+from typing import List, Optional, Sequence
 from pydantic import BaseModel
-from repositories.station import StationRepository, StationDAO # pylint: disable=import-error
+from repositories.station import StationDAO # pylint: disable=import-error
+from repositories.data_store import DataStore # pylint: disable=import-error
+from repositories.record_listing import ListingPage, DEFAULT_PAGE_SIZE # pylint: disable=import-error
+from repositories.serialized_payload import SerializedPayload # pylint: disable=import-error
 
 class StationNameDTO(BaseModel):
     """
@@ -35,9 +38,14 @@ class StationServices:
     Provides services for searching Transmilenio stations.
     """
 
-    def __init__(self):
-        """Initializes the service with a station repository."""
-        self.repository = StationRepository()
+    def __init__(self, store: DataStore):
+        """Initializes the service with the shared data store.
+
+        Args:
+            store (DataStore): The data store holding the station repository.
+        """
+        self.store = store
+        self.repository = store.stations
 
     def get_all(self) -> List[StationDAO]:
         """Retrieves all Transmilenio stations.
@@ -47,17 +55,56 @@ class StationServices:
         """
         return self.repository.get_stations()
 
-    def get_by_name(self, name: str) -> StationDAO:
+    def get_all_serialized(self) -> SerializedPayload:
+        """Retrieves all Transmilenio stations, already serialized as JSON.
+
+        Returns:
+            SerializedPayload: The stations as JSON bytes, with compressed
+                variants and an entity tag.
+        """
+        return self.store.station_payload
+
+    def get_page(
+        self,
+        fields: Optional[Sequence[str]] = None,
+        route: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE
+    ) -> ListingPage:
+        """Retrieves a page of Transmilenio stations, in file order.
+
+        Args:
+            fields (Optional[Sequence[str]]): The fields of each station to
+                return, or None for all of them.
+            route (Optional[str]): Only stations listing the route with this ID.
+            cursor (Optional[str]): The cursor of the previous page, or None for
+                the first page.
+            limit (int): The maximum number of stations in the page.
+
+        Returns:
+            ListingPage: The stations, read as they are sent, and the cursor of
+                the next page.
+
+        Raises:
+            ValueError: If a field or the cursor is not valid.
+        """
+        filters = {"route": route} if route is not None else {}
+        return self.store.station_listing.page(fields, filters, cursor, limit)
+
+    def get_by_name(
+        self, name: str, limit: int = 20, match: str = "substring"
+    ) -> List[StationDAO]:
         """Retrieves Transmilenio stations that match a given name.
 
+        Matching ignores case and accents. Exact matches come first, then
+        names starting with the given text, then any other match.
+
         Args:
             name (str): The name or partial name of the station.
+            limit (int): The maximum number of stations to return.
+            match (str): "substring", "prefix" or "fuzzy" (tolerates typos).
 
         Returns:
-            List[StationDAO]: A list of stations containing the given name.
+            List[StationDAO]: A list of stations matching the given name, best first.
         """
-        response = []
-        for station in self.repository.get_stations():
-            if name.lower() in station.name.lower():
-                response.append(station)
-        return response
+        return self.store.station_names.search(name, limit, match)
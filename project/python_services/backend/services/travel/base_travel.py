@@ -20,33 +20,138 @@ along with SmartCommute. If not, see <https://www.gnu.org/licenses/>.
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+from services.travel.compact_network import CompactNetwork # pylint: disable=import-error
+from services.travel.route_processor import TransferCandidate # pylint: disable=import-error
+from services.travel.selection import DEFAULT_LIMIT # pylint: disable=import-error
+from services.travel.timetable import Timetable # pylint: disable=import-error
+
+class TravelQuery(NamedTuple):
+    """Parameters of a single travel search, expressed with station IDs."""
+    origin: int
+    destination: int
+    active_routes: Sequence[int]
+    max_transfers: int = 1
+    limit: int = DEFAULT_LIMIT
+    departure: Optional[datetime] = None
+    timetable: Optional[Timetable] = None
+
 
 class RouteStrategy(ABC):
-    """Interface for route selection strategy."""
+    """
+    Interface for route selection strategy.
+
+    Strategies that run their own search set `uses_candidates` to False, so
+    the direct and transfer candidates are not computed for them. The others
+    rank light (key, item) candidates from the generators below, keep the
+    best `query.limit` with `select_top`, and build response options only for
+    those.
+
+    Strategies that follow the departures of the routes set `time_dependent`
+    to True; their results depend on the departure itself rather than only
+    on which routes are running.
+    """
+
+    uses_candidates = True
+    time_dependent = False
 
     @abstractmethod
     def select_routes(
         self,
-        direct_routes: List[str],
-        transfer_routes: List[Dict[str, Any]],
-        route_stations: Dict[str, List[str]],
-        origin: str,
-        destination: str
+        direct_routes: List[int],
+        transfer_routes: List[TransferCandidate],
+        network: CompactNetwork,
+        query: TravelQuery
     ) -> dict:
         """
         Selects routes based on the provided criteria.
 
         Args:
-            direct_routes (List[str]): List of direct routes.
-            transfer_routes (List[Dict[str, Any]]): List of transfer routes with
-                station details.
-            route_stations (Dict[str, List[str]]): Dictionary mapping route names
-                to stations.
-            origin (str): The origin station.
-            destination (str): The destination station.
+            direct_routes (List[int]): List of direct route IDs.
+            transfer_routes (List[TransferCandidate]): List of transfer journeys.
+            network (CompactNetwork): The network the IDs belong to, used to
+                resolve names for the response.
+            query (TravelQuery): The parameters of the search.
 
         Returns:
             dict: A dictionary containing the selected routes.
         """
         pass # pylint: disable=unnecessary-pass
+
+    @staticmethod
+    def direct_candidates(
+        direct_routes: List[int], network: CompactNetwork, query: TravelQuery
+    ) -> Iterator[Tuple[float, int]]:
+        """
+        Produces the stations traveled on each direct route.
+
+        Args:
+            direct_routes (List[int]): List of direct route IDs.
+            network (CompactNetwork): The network the IDs belong to.
+            query (TravelQuery): The origin and destination of the search.
+
+        Yields:
+            Tuple[float, int]: The stations traveled and the route ID.
+        """
+        for route in direct_routes:
+            positions = network.positions[route]
+            if query.origin in positions and query.destination in positions:
+                yield abs(positions[query.origin] - positions[query.destination]), route
+            else:
+                yield float('inf'), route
+
+    @staticmethod
+    def direct_option(
+        route: int, distance: float, network: CompactNetwork, query: TravelQuery
+    ) -> Dict[str, Any]:
+        """
+        Builds the response option of a direct route.
+
+        Args:
+            route (int): The route ID.
+            distance (float): The stations traveled on the route.
+            network (CompactNetwork): The network the IDs belong to.
+            query (TravelQuery): The origin and destination of the search.
+
+        Returns:
+            Dict[str, Any]: The route name, type, transfers, stations traveled
+                and details.
+        """
+        return {
+            "route": network.route_names[route],
+            "type": network.route_type(route),
+            "transfers": 0,
+            "stations_traveled": distance,
+            "details": {
+                "from": network.station_names[query.origin],
+                "to": network.station_names[query.destination],
+                "total_stations": network.route_length(route)
+            }
+        }
+
+    @staticmethod
+    def transfer_option(
+        transfer: TransferCandidate, network: CompactNetwork, query: TravelQuery
+    ) -> Dict[str, Any]:
+        """
+        Builds the response option of a one-transfer journey.
+
+        Args:
+            transfer (TransferCandidate): The journey.
+            network (CompactNetwork): The network the IDs belong to.
+            query (TravelQuery): The origin and destination of the search.
+
+        Returns:
+            Dict[str, Any]: The combined route names and types, transfers,
+                stations traveled and details of both segments.
+        """
+        details = transfer.details(network, query.origin, query.destination)
+        first, second = details["first_segment"], details["second_segment"]
+        return {
+            "route": f"{first['route']} + {second['route']}",
+            "type": f"{first['type']} + {second['type']}",
+            "transfers": 1,
+            "stations_traveled": transfer.score,
+            "details": details
+        }
@@ -0,0 +1,419 @@
+"""This module defines a compact, integer-based representation of 
+the Transmilenio network used by the travel planner.
+
+Author: Juan Esteban Bedoya <jebedoyal@udistrital.edu.co>
+
+This file is part of SmartCommute project.
+
+SmartCommute is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+SmartCommute is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
+"""
+
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+from services.travel.route_validator import RouteValidator # pylint: disable=import-error
+
+# The flat arrays of a network, in the order they are stored in a snapshot file.
+ARRAYS = (
+    "bidirectional", "stop_offsets", "stops",
+    "position_offsets", "position_stations", "first_positions",
+    "station_route_offsets", "station_routes",
+    "boarding_offsets", "boarding_routes", "boarding_positions",
+    "hub_route_offsets", "hub_partners", "hub_offsets",
+    "hub_occurrences", "hub_first_positions", "hub_second_positions"
+)
+
+class RoutePositions(Mapping):
+    """
+    The first position of each station on a route, read from the position
+    arrays of a network without building a dictionary.
+    """
+
+    __slots__ = ("_stations", "_positions", "_low", "_high")
+
+    def __init__(self, stations: Sequence[int], positions: Sequence[int], low: int, high: int):
+        """
+        Initializes the view.
+
+        Args:
+            stations (Sequence[int]): The station IDs of every route, sorted
+                within each route.
+            positions (Sequence[int]): The first position of each of them.
+            low (int): Where the entries of the route start.
+            high (int): Where the entries of the route end.
+        """
+        self._stations = stations
+        self._positions = positions
+        self._low = low
+        self._high = high
+
+    def _index(self, station: int) -> int:
+        """
+        Finds the entry of a station.
+
+        Args:
+            station (int): The station ID.
+
+        Returns:
+            int: The index of the entry, or -1 if the route does not stop there.
+        """
+        index = bisect_left(self._stations, station, self._low, self._high)
+        if index < self._high and self._stations[index] == station:
+            return index
+        return -1
+
+    def __getitem__(self, key: int) -> int:
+        index = self._index(key)
+        if index < 0:
+            raise KeyError(key)
+        return self._positions[index]
+
+    def __contains__(self, key) -> bool:
+        return self._index(key) >= 0
+
+    def get(self, key, default=None):
+        index = self._index(key)
+        return self._positions[index] if index >= 0 else default
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._stations[self._low:self._high])
+
+    def __len__(self) -> int:
+        return self._high - self._low
+
+
+class CompactNetwork:
+    """
+    Stations and routes interned as dense integers.
+
+    Stations listed in the stations data come first, so a station ID is
+    "listed" when it is lower than `listed_stations`; stations that only
+    appear in some route's stop list get the IDs after them. Routes are
+    numbered in ascending order of their IDs, so sorting route numbers
+    sorts them by name.
+
+    Stop sequences and station -> routes adjacency are stored CSR style:
+    a flat array of values plus an array of offsets, one slot per row. So
+    is the first position of each station on each route: the rows of
+    `position_stations` and `first_positions` hold the stations of a route
+    in ascending order and their first stop position, and `positions`
+    reads them as one mapping per route. The rows of `boarding_routes` and
+    `boarding_positions` hold, for each station, the routes listed with it
+    that stop there and the first position of the station on each of them.
+
+    Transfer hubs are precomputed for each ordered pair of routes (first,
+    second): the stops of the first route where the second can be boarded,
+    that is, stations listed with the second route in the stations data and
+    on its stop list. `hub_route_offsets` splits `hub_partners`, the sorted
+    second routes of each first route, and `hub_offsets` splits the entries
+    of each pair. An entry holds the position of the stop on the first
+    route and the first position of its station on both routes.
+
+    The hubs are by far the largest arrays. They hold one entry per route
+    stop and route boarding at its station, and a partner and an offset
+    per pair of routes meeting somewhere. With 7,200 routes and 135,000
+    stops that is 4.4 million pairs and 4.8 million entries: 93 MB of the
+    94 MB of arrays, which the snapshot and compiled data files store too.
+    """
+
+    __slots__ = (
+        "station_names", "station_ids", "listed_stations",
+        "route_names", "route_ids", "bidirectional",
+        "stop_offsets", "stops", "position_offsets", "position_stations",
+        "first_positions", "positions",
+        "station_route_offsets", "station_routes",
+        "boarding_offsets", "boarding_routes", "boarding_positions",
+        "hub_route_offsets", "hub_partners", "hub_offsets",
+        "hub_occurrences", "hub_first_positions", "hub_second_positions"
+    )
+
+    def __init__(
+        self,
+        stations_data: Dict[str, Set[str]],
+        route_stations: Dict[str, List[str]]
+    ):
+        """
+        Interns the prepared station and route data.
+
+        Args:
+            stations_data (Dict[str, Set[str]]): A dictionary mapping station
+                names to sets of routes passing through them.
+            route_stations (Dict[str, List[str]]): A dictionary mapping route IDs
+                to lists of stations on each route.
+        """
+        self.station_names: Tuple[str, ...] = tuple(stations_data) + tuple(sorted({
+            station for stations in route_stations.values() for station in stations
+            if station not in stations_data
+        }))
+        self.station_ids: Dict[str, int] = {
+            name: station for station, name in enumerate(self.station_names)
+        }
+        self.listed_stations = len(stations_data)
+
+        self.route_names: Tuple[str, ...] = tuple(sorted(route_stations))
+        self.route_ids: Dict[str, int] = {
+            name: route for route, name in enumerate(self.route_names)
+        }
+        self.bidirectional = array("B", (
+            RouteValidator.is_bidirectional_route(name) for name in self.route_names
+        ))
+
+        self.stop_offsets = array("I", [0])
+        self.stops = array("I")
+        for name in self.route_names:
+            self.stops.extend(self.station_ids[station] for station in route_stations[name])
+            self.stop_offsets.append(len(self.stops))
+        positions = self._index_positions()
+        self.positions = self._route_positions()
+
+        self.station_route_offsets = array("I", [0])
+        self.station_routes = array("I")
+        for name in self.station_names[:self.listed_stations]:
+            self.station_routes.extend(sorted(
+                self.route_ids[route] for route in stations_data[name]
+                if route in self.route_ids
+            ))
+            self.station_route_offsets.append(len(self.station_routes))
+        for _ in self.station_names[self.listed_stations:]:
+            self.station_route_offsets.append(len(self.station_routes))
+        self._index_boarding(positions)
+        self._transfer_hubs()
+
+    @classmethod
+    def from_arrays(
+        cls,
+        station_names: Sequence[str],
+        listed_stations: int,
+        route_names: Sequence[str],
+        arrays: Dict[str, Sequence[int]]
+    ) -> "CompactNetwork":
+        """
+        Rebuilds a network from arrays that were already interned, for
+        example views into a memory-mapped snapshot file. The arrays are used
+        as given, without copying; only the name lookups are built again.
+
+        Args:
+            station_names (Sequence[str]): The station names by ID.
+            listed_stations (int): The number of stations listed in the
+                stations data.
+            route_names (Sequence[str]): The route names by ID, in ascending order.
+            arrays (Dict[str, Sequence[int]]): The arrays named in `ARRAYS`.
+
+        Returns:
+            CompactNetwork: The network.
+        """
+        network = cls.__new__(cls)
+        network.station_names = tuple(station_names)
+        network.station_ids = {
+            name: station for station, name in enumerate(network.station_names)
+        }
+        network.listed_stations = listed_stations
+        network.route_names = tuple(route_names)
+        network.route_ids = {name: route for route, name in enumerate(network.route_names)}
+        for name in ARRAYS:
+            setattr(network, name, arrays[name])
+        network.positions = network._route_positions() # pylint: disable=protected-access
+        return network
+
+    def _index_positions(self) -> List[Dict[int, int]]:
+        """
+        Builds the position arrays from the stops.
+
+        Returns:
+            List[Dict[int, int]]: For each route ID, a dictionary mapping the
+                IDs of its stations to their first position on the route, for
+                building the other arrays.
+        """
+        self.position_offsets = array("I", [0])
+        self.position_stations = array("I")
+        self.first_positions = array("I")
+        positions: List[Dict[int, int]] = []
+        for route in range(len(self.route_names)):
+            route_positions: Dict[int, int] = {}
+            for position, station in enumerate(self.route_stops(route)):
+                route_positions.setdefault(station, position)
+            for station in sorted(route_positions):
+                self.position_stations.append(station)
+                self.first_positions.append(route_positions[station])
+            self.position_offsets.append(len(self.position_stations))
+            positions.append(route_positions)
+        return positions
+
+    def _route_positions(self) -> Tuple[RoutePositions, ...]:
+        """
+        Wraps the rows of the position arrays.
+
+        Returns:
+            Tuple[RoutePositions, ...]: For each route ID, the first position
+                of its stations on the route.
+        """
+        offsets = self.position_offsets
+        return tuple(
+            RoutePositions(self.position_stations, self.first_positions, low, high)
+            for low, high in zip(offsets, offsets[1:])
+        )
+
+    def _index_boarding(self, positions: List[Dict[int, int]]):
+        """
+        Builds the boarding arrays from the adjacency.
+
+        Args:
+            positions (List[Dict[int, int]]): The first position of the
+                stations of each route, as `_index_positions` returns them.
+        """
+        self.boarding_offsets = array("I", [0])
+        self.boarding_routes = array("I")
+        self.boarding_positions = array("I")
+        for station in range(len(self.station_names)):
+            for route in self.routes_at(station):
+                position = positions[route].get(station)
+                if position is not None:
+                    self.boarding_routes.append(route)
+                    self.boarding_positions.append(position)
+            self.boarding_offsets.append(len(self.boarding_routes))
+
+    def _transfer_hubs(self):
+        """Builds the transfer hub arrays from the stops and boarding arrays."""
+        self.hub_route_offsets = array("I", [0])
+        self.hub_partners = array("I")
+        self.hub_offsets = array("I", [0])
+        self.hub_occurrences = array("I")
+        self.hub_first_positions = array("I")
+        self.hub_second_positions = array("I")
+        boarding = [
+            list(zip(self.boarding_at(station), self.boarding_positions[low:high]))
+            for station, (low, high) in enumerate(
+                zip(self.boarding_offsets, self.boarding_offsets[1:]))
+        ]
+        for first in range(len(self.route_names)):
+            first_positions = self.positions[first]
+            by_partner: Dict[int, List[Tuple[int, int, int]]] = {}
+            for occurrence, station in enumerate(self.route_stops(first)):
+                first_position = None
+                for second, second_position in boarding[station]:
+                    if first_position is None:
+                        first_position = first_positions[station]
+                    by_partner.setdefault(second, []).append(
+                        (occurrence, first_position, second_position))
+            for second in sorted(by_partner):
+                for occurrence, first_position, second_position in by_partner[second]:
+                    self.hub_occurrences.append(occurrence)
+                    self.hub_first_positions.append(first_position)
+                    self.hub_second_positions.append(second_position)
+                self.hub_partners.append(second)
+                self.hub_offsets.append(len(self.hub_occurrences))
+            self.hub_route_offsets.append(len(self.hub_partners))
+
+    def hub_range(self, first: int, second: int) -> Tuple[int, int]:
+        """
+        Finds the transfer hub entries of a pair of routes.
+
+        Args:
+            first (int): The route ID traveled first.
+            second (int): The route ID traveled second.
+
+        Returns:
+            Tuple[int, int]: The start and end of the entries in the `hub_*`
+                arrays; empty when the routes share no transfer station.
+        """
+        low = self.hub_route_offsets[first]
+        high = self.hub_route_offsets[first + 1]
+        index = bisect_left(self.hub_partners, second, low, high)
+        if index == high or self.hub_partners[index] != second:
+            return 0, 0
+        return self.hub_offsets[index], self.hub_offsets[index + 1]
+
+    def find_station(self, name: str) -> Optional[int]:
+        """
+        Resolves a station name to its ID.
+
+        Args:
+            name (str): The station name.
+
+        Returns:
+            Optional[int]: The station ID, or None if the station is not listed
+                in the stations data.
+        """
+        station = self.station_ids.get(name)
+        if station is None or station >= self.listed_stations:
+            return None
+        return station
+
+    def route_stops(self, route: int) -> memoryview:
+        """
+        Returns the ordered stations of a route without copying them.
+
+        Args:
+            route (int): The route ID.
+
+        Returns:
+            memoryview: The station IDs of the route in travel order.
+        """
+        return memoryview(self.stops)[self.stop_offsets[route]:self.stop_offsets[route + 1]]
+
+    def route_length(self, route: int) -> int:
+        """
+        Returns the number of stops of a route.
+
+        Args:
+            route (int): The route ID.
+
+        Returns:
+            int: The number of stops.
+        """
+        return self.stop_offsets[route + 1] - self.stop_offsets[route]
+
+    def routes_at(self, station: int) -> memoryview:
+        """
+        Returns the routes passing through a station without copying them.
+
+        Args:
+            station (int): The station ID.
+
+        Returns:
+            memoryview: The route IDs serving the station, in ascending order.
+        """
+        return memoryview(self.station_routes)[
+            self.station_route_offsets[station]:self.station_route_offsets[station + 1]
+        ]
+
+    def boarding_at(self, station: int) -> memoryview:
+        """
+        Returns the routes that can be boarded at a station without copying
+        them: the routes listed with it that stop there.
+
+        Args:
+            station (int): The station ID.
+
+        Returns:
+            memoryview: The route IDs, in ascending order. The first position of
+                the station on each of them is in `boarding_positions`, from
+                `boarding_offsets[station]` on.
+        """
+        return memoryview(self.boarding_routes)[
+            self.boarding_offsets[station]:self.boarding_offsets[station + 1]
+        ]
+
+    def route_type(self, route: int) -> str:
+        """
+        Describes the direction type of a route.
+
+        Args:
+            route (int): The route ID.
+
+        Returns:
+            str: "bidirectional" or "unidirectional".
+        """
+        return "bidirectional" if self.bidirectional[route] else "unidirectional"
@@ -19,9 +19,17 @@ You should have received a copy of the GNU General Public License
 along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
 """
 
-from typing import Dict, List, Set
-from repositories.route import RouteRepository, RouteDAO # pylint: disable=import-error
-from repositories.station import StationRepository, StationDAO # pylint: disable=import-error
+import hashlib
+from itertools import count
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Set, Tuple
+from repositories.compiled_data import CompiledRecords # pylint: disable=import-error
+from repositories.route import RouteRepository # pylint: disable=import-error
+from repositories.station import StationRepository # pylint: disable=import-error
+from services.travel.network_snapshot import NetworkSnapshot # pylint: disable=import-error
+from services.travel.schedule import parse_departures, parse_schedule # pylint: disable=import-error
+from services.travel.snapshot_file import load_or_write_snapshot, read_snapshot # pylint: disable=import-error
+
+_snapshot_versions = count(1)
 
 class DataPreparer:
     """Class responsible for preparing data related to routes and stations."""
@@ -39,9 +47,11 @@ class DataPreparer:
 
     def prepare_data(
         self
-    ) -> (Dict[str, Set[str]], Dict[str, Dict[str, str]], Dict[str, List[str]]):
+    ) -> (Dict[str, Set[str]], Dict[str, Dict[int, List[Tuple[int, int]]]], Dict[str, List[str]],
+          Dict[str, Dict[int, List[int]]], Dict[str, Optional[List[float]]]):
         """
-        Prepares data for stations, schedules, and route-station relationships.
+        Prepares data for stations, schedules, route-station relationships
+        and timetables.
 
         Args:
             None
@@ -50,26 +60,127 @@ class DataPreparer:
             Tuple:
                 - stations_data (Dict[str, Set[str]]): A dictionary mapping station
                   names to sets of routes passing through them.
-                - schedules (Dict[str, Dict[str, str]]): A dictionary mapping route IDs
-                  to dictionaries of schedule days and corresponding start-end times.
+                - schedules (Dict[str, Dict[int, List[Tuple[int, int]]]]): A dictionary
+                  mapping route IDs to their running minute ranges per weekday.
                 - route_stations (Dict[str, List[str]]): A dictionary mapping route IDs
                   to lists of stations on each route.
+                - departures (Dict[str, Dict[int, List[int]]]): A dictionary mapping
+                  route IDs to their departure minutes per weekday.
+                - run_times (Dict[str, Optional[List[float]]]): A dictionary mapping
+                  route IDs to the minutes between consecutive stations, if known.
         """
-        routes: List[RouteDAO] = self.route_repo.get_routes()
-        stations: List[StationDAO] = self.station_repo.get_stations()
-
         stations_data: Dict[str, Set[str]] = {
-            station.name: set(station.routes) for station in stations
+            name: set(routes) for name, routes in self._station_routes()
         }
 
-        schedules: Dict[str, Dict[str, str]] = {}
+        schedules: Dict[str, Dict[int, List[Tuple[int, int]]]] = {}
         route_stations: Dict[str, List[str]] = {}
-        for route in routes:
-            schedules[route.id] = {
-                sched.get("day", "").lower(): f"{sched.get('start_time', '')} - {sched.get('end_time', '')}"
-                for sched in route.schedule
-                if sched.get("start_time") and sched.get("end_time")
-            }
-            route_stations[route.id] = route.stations
-
-        return stations_data, schedules, route_stations
+        departures: Dict[str, Dict[int, List[int]]] = {}
+        run_times: Dict[str, Optional[List[float]]] = {}
+        for route_id, stations, schedule, route_run_times in self._route_records():
+            schedules[route_id] = parse_schedule(schedule)
+            route_stations[route_id] = stations
+            departures[route_id] = parse_departures(schedule)
+            run_times[route_id] = route_run_times
+
+        return stations_data, schedules, route_stations, departures, run_times
+
+    def _route_records(
+        self
+    ) -> Iterator[Tuple[str, List[str], List[Mapping[str, Any]], Optional[List[float]]]]:
+        """
+        Reads the fields of each route the travel planner needs. Routes of a
+        compiled or streamed file are decoded one at a time from its arrays,
+        without building a RouteDAO for each of them.
+
+        Returns:
+            Iterator[Tuple[str, List[str], List[Mapping[str, Any]], Optional[List[float]]]]:
+                The id, stations, schedule entries and run times of each route.
+        """
+        records = self.route_repo.data
+        if isinstance(records, CompiledRecords):
+            fields = ("id", "schedule", "stations", "run_times")
+            for position in range(len(records)):
+                route = records.project(position, fields)
+                yield route["id"], route["stations"], route["schedule"], route.get("run_times")
+            return
+        for route in self.route_repo.get_routes():
+            schedule = [entry.model_dump() for entry in route.schedule]
+            yield route.id, route.stations, schedule, route.run_times
+
+    def _station_routes(self) -> Iterator[Tuple[str, List[str]]]:
+        """
+        Reads the routes of each station, without building a StationDAO for
+        the stations of a compiled or streamed file.
+
+        Returns:
+            Iterator[Tuple[str, List[str]]]: The name and routes of each station.
+        """
+        records = self.station_repo.data
+        if isinstance(records, CompiledRecords):
+            for position in range(len(records)):
+                station = records.project(position, ("name", "routes"))
+                yield station["name"], station["routes"]
+            return
+        for station in self.station_repo.get_stations():
+            yield station.name, station.routes
+
+    def build_snapshot(self, snapshot_path: Optional[str] = None) -> NetworkSnapshot:
+        """
+        Prepares the data once and freezes it into a snapshot that can be
+        shared by every travel request.
+
+        When the routes were loaded from a compiled data file holding the
+        snapshot of these same data files, the snapshot is read from that
+        file in place and nothing is prepared.
+
+        Args:
+            snapshot_path (Optional[str]): A snapshot file shared with other
+                worker processes. When it was written from the same data files,
+                the snapshot is attached from it instead of being prepared;
+                otherwise it is prepared and written there first.
+
+        Returns:
+            NetworkSnapshot: A new snapshot with a version greater than any
+                snapshot previously built in this process.
+        """
+        version = next(_snapshot_versions)
+        source_digest = self.source_digest()
+        compiled = self.route_repo.compiled
+        if compiled is not None and source_digest is not None:
+            try:
+                return read_snapshot(compiled.network, source_digest, version, compiled.path)
+            except ValueError:
+                pass
+        if snapshot_path and source_digest is not None:
+            return load_or_write_snapshot(snapshot_path, source_digest, version,
+                                          lambda: self._compile(version))
+        return self._compile(version)
+
+    def source_digest(self) -> Optional[bytes]:
+        """
+        Identifies the contents of the data files the repositories loaded.
+        Compiled files are identified by the JSON files they were compiled
+        from.
+
+        Returns:
+            Optional[bytes]: A SHA-256 digest of both files, or None if a
+                repository was not loaded from a file.
+        """
+        if self.route_repo.digest is None or self.station_repo.digest is None:
+            return None
+        return hashlib.sha256(self.route_repo.digest + self.station_repo.digest).digest()
+
+    def _compile(self, version: int) -> NetworkSnapshot:
+        """
+        Prepares the data and compiles it into a snapshot.
+
+        Args:
+            version (int): Number identifying the snapshot.
+
+        Returns:
+            NetworkSnapshot: The snapshot.
+        """
+        stations_data, schedules, route_stations, departures, run_times = self.prepare_data()
+        return NetworkSnapshot(stations_data, schedules, route_stations, version,
+                               departures, run_times)
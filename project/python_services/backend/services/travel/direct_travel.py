@@ -19,8 +19,11 @@ You should have received a copy of the GNU General Public License
 along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
 """
 
-from typing import List, Dict, Any
-from services.travel.base_travel import RouteStrategy # pylint: disable=import-error
+from typing import List
+from services.travel.compact_network import CompactNetwork # pylint: disable=import-error
+from services.travel.route_processor import TransferCandidate # pylint: disable=import-error
+from services.travel.base_travel import RouteStrategy, TravelQuery # pylint: disable=import-error
+from services.travel.selection import select_top # pylint: disable=import-error
 
 class MinimizeTransfersStrategy(RouteStrategy):
     """
@@ -30,62 +33,34 @@ class MinimizeTransfersStrategy(RouteStrategy):
 
     def select_routes(
         self,
-        direct_routes: List[str],
-        transfer_routes: List[Dict[str, Any]],
-        route_stations: Dict[str, List[str]],
-        origin: str,
-        destination: str
+        direct_routes: List[int],
+        transfer_routes: List[TransferCandidate],
+        network: CompactNetwork,
+        query: TravelQuery
     ) -> dict:
         """
         Selects routes based on minimizing transfers.
 
         Args:
-            direct_routes (List[str]): List of direct routes (routes with 0 transfers).
-            transfer_routes (List[Dict[str, Any]]): List of transfer routes (routes
+            direct_routes (List[int]): List of direct route IDs (routes with 0 transfers).
+            transfer_routes (List[TransferCandidate]): List of transfer journeys (routes
                 with at least 1 transfer).
-            route_stations (Dict[str, List[str]]): A dictionary mapping route names
-                to a list of stations for each route.
-            origin (str): The origin station.
-            destination (str): The destination station.
+            network (CompactNetwork): The network the IDs belong to, used to resolve
+                names for the response.
+            query (TravelQuery): The origin and destination of the search.
 
         Returns:
-            dict: A dictionary containing the top 5 selected routes with the least
-                transfers and stations traveled. If no routes are found, an error
-                message is returned.
+            dict: A dictionary containing the top `query.limit` selected routes with
+                the least transfers and stations traveled. If no routes are found, an
+                error message is returned.
         """
-        options = []
         if direct_routes:
-            for route in direct_routes:
-                try:
-                    distance = abs(route_stations[route].index(origin) - 
-                                   route_stations[route].index(destination))
-                except Exception:
-                    distance = float('inf')
-                options.append({
-                    "route": route,
-                    "type": "bidirectional" if route.strip().isdigit() else "unidirectional",
-                    "transfers": 0,
-                    "stations_traveled": distance,
-                    "details": {
-                        "from": origin,
-                        "to": destination,
-                        "total_stations": len(route_stations[route])
-                    }
-                })
-            options.sort(key=lambda x: x["stations_traveled"])
+            selected = select_top(self.direct_candidates(direct_routes, network, query),
+                                  query.limit, key=lambda x: x[0])
+            options = [self.direct_option(route, distance, network, query)
+                       for distance, route in selected]
         else:
-            for transfer in transfer_routes:
-                transfer_details = transfer["details"]
-                transfer_details["transfers"] = 1
-                options.append({
-                    "route": f"{transfer_details['first_segment']['route']} + "
-                             f"{transfer_details['second_segment']['route']}",
-                    "type": f"{transfer_details['first_segment']['type']} + "
-                            f"{transfer_details['second_segment']['type']}",
-                    "transfers": 1,
-                    "stations_traveled": transfer["score"],
-                    "details": transfer_details
-                })
-            options.sort(key=lambda x: (x["transfers"], x["stations_traveled"]))
+            selected = select_top(transfer_routes, query.limit, key=lambda x: x.score)
+            options = [self.transfer_option(transfer, network, query) for transfer in selected]
 
-        return {"routes": options[:5]} if options else {"error": "No available routes found"}
+        return {"routes": options} if options else {"error": "No available routes found"}
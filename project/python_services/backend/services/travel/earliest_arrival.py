@@ -0,0 +1,226 @@
+"""This module finds the journeys between Transmilenio stations that
+arrive earliest, following the departures of every route.
+
+Author: Juan Esteban Bedoya <jebedoyal@udistrital.edu.co>
+
+This file is part of SmartCommute project.
+
+SmartCommute is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+SmartCommute is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
+"""
+
+from typing import Dict, List, NamedTuple, Set, Tuple
+from services.travel.compact_network import CompactNetwork # pylint: disable=import-error
+from services.travel.raptor import MAX_TRANSFERS_LIMIT # pylint: disable=import-error
+from services.travel.timetable import Timetable # pylint: disable=import-error
+
+# Seconds needed to walk between two routes at a transfer station.
+MIN_TRANSFER_SECONDS = 60
+
+class TimedLeg(NamedTuple):
+    """A ride on a trip of a route, with the moments it leaves and arrives."""
+    route: int
+    board: int
+    alight: int
+    stations: int
+    departure: int
+    arrival: int
+
+
+class TimedJourney(NamedTuple):
+    """A sequence of timed legs from the origin to the destination."""
+    transfers: int
+    arrival: int
+    legs: Tuple[TimedLeg, ...]
+
+
+class EarliestArrivalRouter:
+    """
+    Finds Pareto-optimal journeys for (transfers, arrival time).
+
+    Like `RaptorRouter`, round k rides every route serving a station
+    improved in round k - 1, but labels hold the earliest arrival instead
+    of the stations traveled. A route is boarded on the first trip leaving
+    after the label, plus MIN_TRANSFER_SECONDS when the label comes from
+    another ride, so the wait at the origin and at every transfer counts.
+
+    Moments are seconds after midnight of the weekday the search starts on;
+    trips of the following day are later moments, not earlier ones.
+    """
+
+    def search( # pylint: disable=too-many-arguments,too-many-positional-arguments,too-many-locals
+        self,
+        network: CompactNetwork,
+        timetable: Timetable,
+        origin: int,
+        destination: int,
+        weekday: int,
+        start: int,
+        max_transfers: int
+    ) -> List[TimedJourney]:
+        """
+        Runs the round-based search between two stations.
+
+        Args:
+            network (CompactNetwork): The network to search.
+            timetable (Timetable): The departures and run times of its routes.
+            origin (int): The origin station ID.
+            destination (int): The destination station ID.
+            weekday (int): The weekday of the departure, 0 being Monday.
+            start (int): The departure, in seconds after midnight.
+            max_transfers (int): The maximum number of transfers allowed; it is
+                capped at MAX_TRANSFERS_LIMIT.
+
+        Returns:
+            List[TimedJourney]: The Pareto-optimal journeys, ordered by number
+                of transfers. Each one arrives strictly earlier than every
+                journey with fewer transfers.
+        """
+        max_transfers = max(0, min(max_transfers, MAX_TRANSFERS_LIMIT))
+        best: Dict[int, int] = {origin: start}
+        best_round: Dict[int, int] = {origin: -1}
+        parents: List[Dict[int, Tuple[int, int, int, int, int, int]]] = []
+        marked: Set[int] = {origin}
+        journeys: List[TimedJourney] = []
+
+        for round_ in range(max_transfers + 1):
+            if not marked:
+                break
+            improved: Dict[int, Tuple[int, int, int, int, int, int]] = {}
+            for route in self._collect_routes(network, marked):
+                self._scan_route(network, timetable, route, weekday, best, best_round,
+                                 improved, destination)
+                if network.bidirectional[route]:
+                    self._scan_route(network, timetable, route, weekday, best, best_round,
+                                     improved, destination, reverse=True)
+
+            for station, label in improved.items():
+                best[station] = label[0]
+                best_round[station] = round_
+            parents.append(improved)
+            marked = set(improved)
+
+            if destination in improved:
+                legs = self._reconstruct(parents, destination, round_)
+                journeys.append(TimedJourney(len(legs) - 1, improved[destination][0], legs))
+
+        return journeys
+
+    @staticmethod
+    def _collect_routes(network: CompactNetwork, marked: Set[int]) -> List[int]:
+        """
+        Lists the routes that stop at any of the marked stations.
+
+        Args:
+            network (CompactNetwork): The network to search.
+            marked (Set[int]): Stations improved in the previous round.
+
+        Returns:
+            List[int]: The route IDs to scan, in ascending order.
+        """
+        return sorted({
+            route for station in marked for route in network.boarding_at(station)
+        })
+
+    @staticmethod
+    # pylint: disable-next=too-many-arguments,too-many-positional-arguments,too-many-locals
+    def _scan_route(
+        network: CompactNetwork,
+        timetable: Timetable,
+        route: int,
+        weekday: int,
+        best: Dict[int, int],
+        best_round: Dict[int, int],
+        improved: Dict[int, Tuple[int, int, int, int, int, int]],
+        destination: int,
+        reverse: bool = False
+    ):
+        """
+        Rides a route once, staying on the earliest trip that can be caught
+        at the stations seen so far and recording every station whose
+        arrival improves.
+
+        Args:
+            network (CompactNetwork): The network to search.
+            timetable (Timetable): The departures and run times of its routes.
+            route (int): The route ID to scan.
+            weekday (int): The weekday of the departure.
+            best (Dict[int, int]): Arrivals from the previous rounds.
+            best_round (Dict[int, int]): Round in which each arrival was set.
+            improved (Dict[int, Tuple[int, int, int, int, int, int]]): Arrivals
+                improved in the current round with the route, boarding station,
+                boarding round, stations traveled and boarding moment; updated
+                in place.
+            destination (int): The destination station ID, used for pruning.
+            reverse (bool): Whether to ride the route against its stop order,
+                on trips leaving its last stop.
+        """
+        stops = network.route_stops(route)
+        first = network.stop_offsets[route]
+        times = timetable.stop_times[first:first + len(stops)]
+        total = times[-1]
+        order = range(len(stops) - 1, -1, -1) if reverse else range(len(stops))
+        no_label = float("inf")
+        # Arrivals no earlier than the destination's cannot lead to a better journey.
+        target = min(best.get(destination, no_label), improved.get(destination, (no_label,))[0])
+        trip = None
+        board = board_round = board_position = board_moment = -1
+
+        for position in order:
+            station = stops[position]
+            offset = total - times[position] if reverse else times[position]
+            if trip is not None:
+                arrival = trip + offset
+                if arrival < target and arrival < best.get(station, no_label) \
+                        and arrival < improved.get(station, (no_label,))[0]:
+                    improved[station] = (arrival, route, board, board_round,
+                                         abs(position - board_position), board_moment)
+                    if station == destination:
+                        target = arrival
+            label = best.get(station)
+            if label is None:
+                continue
+            ready = label + (MIN_TRANSFER_SECONDS if best_round[station] >= 0 else 0)
+            if trip is None or ready < trip + offset:
+                departure = timetable.next_departure(route, weekday, ready - offset)
+                if departure is not None and (trip is None or departure < trip):
+                    trip = departure
+                    board, board_round, board_position = station, best_round[station], position
+                    board_moment = departure + offset
+
+    @staticmethod
+    def _reconstruct(
+        parents: List[Dict[int, Tuple[int, int, int, int, int, int]]],
+        destination: int,
+        round_: int
+    ) -> Tuple[TimedLeg, ...]:
+        """
+        Follows the parent pointers back from the destination to the origin.
+
+        Args:
+            parents (List[Dict[int, Tuple[int, int, int, int, int, int]]]): Per
+                round, the arrival, route, boarding station, boarding round,
+                stations traveled and boarding moment of each label.
+            destination (int): The destination station ID.
+            round_ (int): The round in which the destination was reached.
+
+        Returns:
+            Tuple[TimedLeg, ...]: The legs of the journey in travel order.
+        """
+        legs = []
+        station = destination
+        while round_ >= 0:
+            arrival, route, board, board_round, distance, departure = parents[round_][station]
+            legs.append(TimedLeg(route, board, station, distance, departure, arrival))
+            station, round_ = board, board_round
+        return tuple(reversed(legs))
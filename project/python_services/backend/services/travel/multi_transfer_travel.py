@@ -0,0 +1,101 @@
+"""This module defines a route selection strategy that allows 
+several transfers for travel planning in Transmilenio.
+
+Author: Juan Esteban Bedoya <jebedoyal@udistrital.edu.co>
+
+This file is part of SmartCommute project.
+
+SmartCommute is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+SmartCommute is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
+"""
+
+from typing import List, Dict, Any
+from services.travel.compact_network import CompactNetwork # pylint: disable=import-error
+from services.travel.route_processor import TransferCandidate # pylint: disable=import-error
+from services.travel.route_validator import RouteValidator # pylint: disable=import-error
+from services.travel.raptor import RaptorRouter, Journey # pylint: disable=import-error
+from services.travel.base_travel import RouteStrategy, TravelQuery # pylint: disable=import-error
+
+class MultiTransferStrategy(RouteStrategy):
+    """
+    Strategy that runs a round-based search and returns every journey that is
+    Pareto-optimal for (transfers, stations traveled), allowing up to
+    `query.max_transfers` transfers.
+    """
+
+    uses_candidates = False
+
+    def __init__(self):
+        """Initializes the strategy with its routing engine."""
+        self.router = RaptorRouter()
+
+    def select_routes(
+        self,
+        direct_routes: List[int],
+        transfer_routes: List[TransferCandidate],
+        network: CompactNetwork,
+        query: TravelQuery
+    ) -> dict:
+        """
+        Selects the Pareto-optimal journeys between origin and destination.
+
+        Args:
+            direct_routes (List[int]): Ignored, this strategy runs its own search.
+            transfer_routes (List[TransferCandidate]): Ignored, this strategy runs
+                its own search.
+            network (CompactNetwork): The network to search.
+            query (TravelQuery): The parameters of the search.
+
+        Returns:
+            dict: A dictionary containing the journeys ordered by number of
+                transfers. If no routes are found, an error message is returned.
+        """
+        def is_active(route: int) -> bool:
+            return RouteValidator.check_route_availability(query.active_routes, route)
+
+        journeys = self.router.search(network, query.origin, query.destination,
+                                      is_active, query.max_transfers)
+        options = [self._build_option(journey, network) for journey in journeys]
+        return {"routes": options} if options else {"error": "No available routes found"}
+
+    @staticmethod
+    def _build_option(journey: Journey, network: CompactNetwork) -> Dict[str, Any]:
+        """
+        Resolves a journey into the response format.
+
+        Args:
+            journey (Journey): The journey to describe.
+            network (CompactNetwork): The network the IDs belong to.
+
+        Returns:
+            Dict[str, Any]: The journey with its route names, types and segments.
+        """
+        segments = [{
+            "route": network.route_names[leg.route],
+            "type": network.route_type(leg.route),
+            "from": network.station_names[leg.board],
+            "to": network.station_names[leg.alight],
+            "intermediate_stations": leg.stations
+        } for leg in journey.legs]
+        return {
+            "route": " + ".join(segment["route"] for segment in segments),
+            "type": " + ".join(segment["type"] for segment in segments),
+            "transfers": journey.transfers,
+            "stations_traveled": journey.stations,
+            "details": {
+                "segments": segments,
+                "total_stations": journey.stations,
+                "transfer_stations": [segment["from"] for segment in segments[1:]],
+                "transfers": journey.transfers
+            }
+        }
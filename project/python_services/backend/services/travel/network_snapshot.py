@@ -0,0 +1,148 @@
+"""This module defines an immutable snapshot of the Transmilenio 
+network used for travel planning.
+
+Author: Juan Esteban Bedoya <jebedoyal@udistrital.edu.co>
+
+This file is part of SmartCommute project.
+
+SmartCommute is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+SmartCommute is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
+"""
+
+from threading import Lock
+from typing import Dict, List, Optional, Set, Tuple
+from services.travel.compact_network import CompactNetwork # pylint: disable=import-error
+from services.travel.schedule import ScheduleIndex # pylint: disable=import-error
+from services.travel.timetable import Timetable # pylint: disable=import-error
+
+class NetworkSnapshot:
+    """
+    Read-only view of the routes and stations, built once and shared by
+    every travel request until the data changes.
+    """
+
+    __slots__ = ("network", "schedules", "timetable", "version", "pairs")
+
+    def __init__( # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        stations_data: Dict[str, Set[str]],
+        schedules: Dict[str, Dict[int, List[Tuple[int, int]]]],
+        route_stations: Dict[str, List[str]],
+        version: int = 0,
+        departures: Optional[Dict[str, Dict[int, List[int]]]] = None,
+        run_times: Optional[Dict[str, Optional[List[float]]]] = None
+    ):
+        """
+        Compiles the prepared data so it can be shared between requests.
+
+        Args:
+            stations_data (Dict[str, Set[str]]): A dictionary mapping station
+                names to sets of routes passing through them.
+            schedules (Dict[str, Dict[int, List[Tuple[int, int]]]]): A dictionary
+                mapping route IDs to their running minute ranges per weekday.
+            route_stations (Dict[str, List[str]]): A dictionary mapping route IDs
+                to lists of stations on each route.
+            version (int): Number identifying this snapshot.
+            departures (Optional[Dict[str, Dict[int, List[int]]]]): A dictionary
+                mapping route IDs to their departure minutes per weekday.
+            run_times (Optional[Dict[str, Optional[List[float]]]]): A dictionary
+                mapping route IDs to the minutes between consecutive stations.
+        """
+        self.network = CompactNetwork(stations_data, route_stations)
+        route_ids = self.network.route_ids
+        self.schedules = ScheduleIndex(len(self.network.route_names), {
+            route_ids[route]: ranges for route, ranges in schedules.items()
+            if route in route_ids
+        })
+        self.timetable = Timetable(self.network, {
+            route_ids[route]: minutes for route, minutes in (departures or {}).items()
+            if route in route_ids
+        }, {
+            route_ids[route]: minutes for route, minutes in (run_times or {}).items()
+            if route in route_ids
+        })
+        self.version = version
+        # Precomputed journeys (a PairTable), attached before the snapshot is served.
+        self.pairs = None
+
+    @classmethod
+    def from_parts(
+        cls,
+        network: CompactNetwork,
+        schedules: ScheduleIndex,
+        timetable: Timetable,
+        version: int = 0
+    ) -> "NetworkSnapshot":
+        """
+        Wraps a network, schedules and timetable that are already compiled,
+        such as the ones attached from a snapshot file.
+
+        Args:
+            network (CompactNetwork): The interned network.
+            schedules (ScheduleIndex): The schedules of its routes.
+            timetable (Timetable): The departures and run times of its routes.
+            version (int): Number identifying this snapshot.
+
+        Returns:
+            NetworkSnapshot: The snapshot.
+        """
+        snapshot = cls.__new__(cls)
+        snapshot.network = network
+        snapshot.schedules = schedules
+        snapshot.timetable = timetable
+        snapshot.version = version
+        snapshot.pairs = None
+        return snapshot
+
+
+class SnapshotHolder:
+    """
+    Keeps the current network snapshot and replaces it atomically.
+
+    Readers take a reference with `current()` and keep using it for the whole
+    request, so a swap never affects a request that is already running.
+    """
+
+    def __init__(self, snapshot: NetworkSnapshot):
+        """
+        Initializes the holder with the first snapshot.
+
+        Args:
+            snapshot (NetworkSnapshot): The snapshot to serve.
+        """
+        self._snapshot = snapshot
+        self._lock = Lock()
+
+    def current(self) -> NetworkSnapshot:
+        """
+        Returns the snapshot currently being served.
+
+        Returns:
+            NetworkSnapshot: The current snapshot.
+        """
+        return self._snapshot
+
+    def swap(self, snapshot: NetworkSnapshot) -> NetworkSnapshot:
+        """
+        Replaces the current snapshot.
+
+        Args:
+            snapshot (NetworkSnapshot): The new snapshot to serve.
+
+        Returns:
+            NetworkSnapshot: The snapshot that was replaced.
+        """
+        with self._lock:
+            previous = self._snapshot
+            self._snapshot = snapshot
+        return previous
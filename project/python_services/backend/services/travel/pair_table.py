@@ -0,0 +1,285 @@
+"""This module is used to precompute the direct and one-transfer 
+journeys of every station pair and keep them in a memory-mapped file.
+
+Author: Juan Esteban Bedoya <jebedoyal@udistrital.edu.co>
+
+This file is part of SmartCommute project.
+
+SmartCommute is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+SmartCommute is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Dict, List, Optional, Tuple
+from services.travel.network_snapshot import NetworkSnapshot # pylint: disable=import-error
+from services.travel.route_processor import RouteProcessor, TransferCandidate # pylint: disable=import-error
+from services.travel.snapshot_file import exclusive # pylint: disable=import-error
+
+MAGIC = b"SCPT"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHH32sIIIIII")
+ENTRY_FIELDS = 4
+TRANSFER_FIELDS = len(TransferCandidate._fields)
+# Listed stations above which no table is built.
+DEFAULT_MAX_STATIONS = 200
+
+def snapshot_fingerprint(snapshot: NetworkSnapshot) -> bytes:
+    """
+    Hashes everything the precomputed journeys depend on, so a table built
+    from other data is never used.
+
+    Args:
+        snapshot (NetworkSnapshot): The snapshot to hash.
+
+    Returns:
+        bytes: The SHA-256 digest of the network and its schedules.
+    """
+    network = snapshot.network
+    schedules = snapshot.schedules
+    digest = hashlib.sha256()
+    digest.update(f"{FORMAT_VERSION}:{sys.byteorder}:{network.listed_stations}".encode())
+    digest.update("\0".join(network.station_names).encode())
+    digest.update(b"\1")
+    digest.update("\0".join(network.route_names).encode())
+    for values in (network.bidirectional, network.stop_offsets, network.stops,
+                   network.station_route_offsets, network.station_routes,
+                   *schedules.starts, *schedules.ends, *schedules.routes):
+        digest.update(len(values).to_bytes(4, "little"))
+        digest.update(values.tobytes())
+    return digest.digest()
+
+
+class PairTable:
+    """
+    Memory-mapped table with the direct routes and the best transfer
+    journeys of every pair of listed stations, for the most common schedule
+    windows.
+
+    The file starts with a header, followed by the mask of each window and,
+    for each window and pair, the number of an entry. Entries point into the
+    pools of direct routes and transfer journeys. Identical results share an
+    entry, so pairs whose journeys do not change between windows cost one
+    number per window.
+    """
+
+    def __init__(self, path: str): # pylint: disable=too-many-locals
+        """
+        Maps a table file.
+
+        Args:
+            path (str): The path of the table file.
+
+        Raises:
+            ValueError: If the file is not a pair table of this format.
+        """
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        header = HEADER.unpack_from(self._mmap)
+        magic, version, _, self.fingerprint, self.stations, routes, windows, \
+            entries, directs, transfers = header
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a pair table of version {FORMAT_VERSION}.")
+
+        offset = HEADER.size
+        self.windows: Dict[bytes, int] = {}
+        for window in range(windows):
+            self.windows[self._mmap[offset:offset + routes]] = window
+            offset += routes
+        offset += -offset % 4
+
+        words = memoryview(self._mmap)[offset:].cast("I")
+        sizes = (windows * self.stations * self.stations, entries * ENTRY_FIELDS,
+                 directs, transfers * TRANSFER_FIELDS)
+        sections = []
+        start = 0
+        for size in sizes:
+            sections.append(words[start:start + size])
+            start += size
+        self.pair_entries, self.entries, self.directs, self.transfers = sections
+
+    def lookup(
+        self, active_routes: bytes, origin: int, destination: int
+    ) -> Optional[Tuple[List[int], List[TransferCandidate]]]:
+        """
+        Finds the precomputed journeys of a pair.
+
+        Args:
+            active_routes (bytes): The mask of routes running at the moment of
+                the query.
+            origin (int): The origin station ID.
+            destination (int): The destination station ID.
+
+        Returns:
+            Optional[Tuple[List[int], List[TransferCandidate]]]: The direct
+                route IDs and the transfer journeys, as `RouteProcessor` returns
+                them, or None if the window or the stations are not in the table.
+        """
+        window = self.windows.get(active_routes)
+        if window is None or origin >= self.stations or destination >= self.stations:
+            return None
+        entry = self.pair_entries[(window * self.stations + origin) * self.stations + destination]
+        direct_start, direct_count, transfer_start, transfer_count = \
+            self.entries[entry * ENTRY_FIELDS:(entry + 1) * ENTRY_FIELDS]
+        directs = self.directs[direct_start:direct_start + direct_count].tolist()
+        transfers = [
+            TransferCandidate(*self.transfers[index * TRANSFER_FIELDS:
+                                              (index + 1) * TRANSFER_FIELDS])
+            for index in range(transfer_start, transfer_start + transfer_count)
+        ]
+        return directs, transfers
+
+    @staticmethod
+    # pylint: disable-next=too-many-locals
+    def build(snapshot: NetworkSnapshot, path: str, max_windows: int,
+              max_stations: int = DEFAULT_MAX_STATIONS):
+        """
+        Computes the journeys of every listed station pair with
+        `RouteProcessor` and writes the table. The file is replaced
+        atomically.
+
+        The table holds windows × stations² entries and takes seconds per
+        hundred stations to build, so it is refused above `max_stations`.
+
+        Args:
+            snapshot (NetworkSnapshot): The snapshot to precompute.
+            path (str): The path of the table file.
+            max_windows (int): The number of schedule windows to precompute,
+                taking the ones covering most minutes of the week.
+            max_stations (int): The most listed stations a table is built for.
+
+        Raises:
+            ValueError: If the network has more than `max_stations` stations.
+        """
+        network = snapshot.network
+        stations = network.listed_stations
+        if stations > max_stations:
+            raise ValueError(f"The network has {stations} stations, more than the "
+                             f"{max_stations} a pair table is built for.")
+        windows = sorted(snapshot.schedules.windows().items(),
+                         key=lambda item: (-item[1], item[0]))[:max_windows]
+        processor = RouteProcessor()
+
+        entry_ids: Dict[Tuple[Tuple[int, ...], Tuple[TransferCandidate, ...]], int] = {}
+        entries = array("I")
+        directs = array("I")
+        transfers = array("I")
+        pair_entries = array("I")
+        for mask, _ in windows:
+            for origin in range(stations):
+                for destination in range(stations):
+                    result = (
+                        tuple(processor.process_direct_routes(
+                            origin, destination, network, mask)),
+                        tuple(processor.process_transfers(
+                            origin, destination, network, mask))
+                    )
+                    entry = entry_ids.get(result)
+                    if entry is None:
+                        entry = entry_ids[result] = len(entry_ids)
+                        entries.extend((len(directs), len(result[0]),
+                                        len(transfers) // TRANSFER_FIELDS, len(result[1])))
+                        directs.extend(result[0])
+                        for transfer in result[1]:
+                            transfers.extend(transfer)
+                    pair_entries.append(entry)
+
+        masks = b"".join(mask for mask, _ in windows)
+        header = HEADER.pack(
+            MAGIC, FORMAT_VERSION, 0, snapshot_fingerprint(snapshot), stations,
+            snapshot.schedules.route_count, len(windows), len(entry_ids), len(directs),
+            len(transfers) // TRANSFER_FIELDS
+        )
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as file:
+            file.write(header)
+            file.write(masks)
+            file.write(bytes(-(len(header) + len(masks)) % 4))
+            for values in (pair_entries, entries, directs, transfers):
+                values.tofile(file)
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, snapshot: NetworkSnapshot, path: str, max_windows: int) -> Optional["PairTable"]:
+        """
+        Maps the table at the given path if it was built from the same data.
+
+        Args:
+            snapshot (NetworkSnapshot): The snapshot the table must match.
+            path (str): The path of the table file.
+            max_windows (int): The number of schedule windows precomputed.
+
+        Returns:
+            Optional[PairTable]: The table matching the snapshot, or None if
+                it is missing or was built from other data.
+        """
+        try:
+            table = cls(path)
+        except (OSError, ValueError, struct.error):
+            return None
+        if table.fingerprint == snapshot_fingerprint(snapshot) and len(table.windows) == min(
+                max_windows, len(snapshot.schedules.windows())):
+            return table
+        return None
+
+    @classmethod
+    def load_or_build(cls, snapshot: NetworkSnapshot, path: str, max_windows: int,
+                      max_stations: int = DEFAULT_MAX_STATIONS) -> "PairTable":
+        """
+        Maps the table at the given path, building it first when it is
+        missing or was built from other data. Only the first process to get
+        here builds it; the others wait and then map the file it wrote.
+
+        Args:
+            snapshot (NetworkSnapshot): The snapshot the table must match.
+            path (str): The path of the table file.
+            max_windows (int): The number of schedule windows to precompute.
+            max_stations (int): The most listed stations a table is built for.
+
+        Returns:
+            PairTable: The table matching the snapshot.
+
+        Raises:
+            ValueError: If the table is missing and the network is too large
+                to build it.
+        """
+        table = cls.load(snapshot, path, max_windows)
+        if table is not None:
+            return table
+        with exclusive(path):
+            table = cls.load(snapshot, path, max_windows)
+            if table is not None:
+                return table
+            cls.build(snapshot, path, max_windows, max_stations)
+        return cls(path)
+
+
+if __name__ == "__main__":
+    # Builds the table offline: python -m services.travel.pair_table
+    from repositories.route import RouteRepository # pylint: disable=import-error,wrong-import-position
+    from repositories.station import StationRepository # pylint: disable=import-error,wrong-import-position
+    from services.travel.data_preparer import DataPreparer # pylint: disable=import-error,wrong-import-position
+    from environment_variables import EnvironmentVariables # pylint: disable=import-error,wrong-import-position
+
+    env = EnvironmentVariables()
+    if not env.pair_table_path:
+        sys.exit("PAIR_TABLE_PATH is not set.")
+    built = DataPreparer(RouteRepository(), StationRepository()).build_snapshot()
+    PairTable.build(built, env.pair_table_path, env.pair_table_windows,
+                    env.pair_table_max_stations)
+    print(f"Wrote {env.pair_table_path}")
@@ -0,0 +1,404 @@
+"""This module defines a round-based (RAPTOR style) routing engine 
+for travel planning in Transmilenio.
+
+Author: Juan Esteban Bedoya <jebedoyal@udistrital.edu.co>
+
+This file is part of SmartCommute project.
+
+SmartCommute is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+SmartCommute is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
+"""
+
+from typing import Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+from services.travel.compact_network import CompactNetwork # pylint: disable=import-error
+
+MAX_TRANSFERS_LIMIT = 5
+# Rounds run backward from the destination. Each one is as costly as a
+# forward round, and on a dense network two rides already reach most
+# stations, so only the stations one ride away are marked and only the
+# last forward round is pruned.
+BACKWARD_RIDES = 1
+
+class Leg(NamedTuple):
+    """A ride on a single route between two stations."""
+    route: int
+    board: int
+    alight: int
+    stations: int
+
+
+class Journey(NamedTuple):
+    """A sequence of legs from the origin to the destination."""
+    transfers: int
+    stations: int
+    legs: Tuple[Leg, ...]
+
+
+class Reach(NamedTuple):
+    """The stations traveled to reach a station with a number of transfers."""
+    transfers: int
+    stations: int
+
+
+class RaptorRouter:
+    """
+    Finds Pareto-optimal journeys for (transfers, stations traveled).
+
+    Round k relaxes every route that serves a station improved in round
+    k - 1, so after round k the labels hold the fewest stations needed to
+    reach each station with at most k transfers. Each round scans every
+    route at most once in each direction, which bounds a query to
+    O((max_transfers + 1) * total stops).
+
+    Searches meet in the middle: rounds run backward from the destination
+    first and mark how many rides each station needs to reach it. A forward
+    round with fewer rides left than the backward rounds run only rides
+    routes leading to marked stations and only labels the stations that
+    reach the destination within the rides left. With BACKWARD_RIDES at 1,
+    that is the last forward round alone: it rides the routes stopping at
+    the destination and only labels the destination, while every earlier
+    round labels stations as before. The journeys found are the same.
+    """
+
+    def __init__(self, meet_in_the_middle: bool = True):
+        """
+        Initializes the router.
+
+        Args:
+            meet_in_the_middle (bool): Whether searches mark the stations that
+                can reach the destination before expanding from the origin.
+        """
+        self.meet_in_the_middle = meet_in_the_middle
+        # The network the index was built for and the index, replaced together
+        # so concurrent searches never pair an index with the wrong network.
+        self._stops: Tuple[Optional[CompactNetwork], Tuple[Tuple[int, ...], ...]] = (None, ())
+
+    def search( # pylint: disable=too-many-arguments,too-many-positional-arguments,too-many-locals
+        self,
+        network: CompactNetwork,
+        origin: int,
+        destination: int,
+        is_active: Callable[[int], bool],
+        max_transfers: int
+    ) -> List[Journey]:
+        """
+        Runs the round-based search between two stations.
+
+        Args:
+            network (CompactNetwork): The network to search.
+            origin (int): The origin station ID.
+            destination (int): The destination station ID.
+            is_active (Callable[[int], bool]): Tells whether a route ID can be
+                used for this query.
+            max_transfers (int): The maximum number of transfers allowed; it is
+                capped at MAX_TRANSFERS_LIMIT.
+
+        Returns:
+            List[Journey]: The Pareto-optimal journeys, ordered by number of
+                transfers. Each one travels strictly fewer stations than every
+                journey with fewer transfers.
+        """
+        max_transfers = max(0, min(max_transfers, MAX_TRANSFERS_LIMIT))
+        rides: Dict[int, int] = {}
+        backward_rides = min(max_transfers + 1, BACKWARD_RIDES) if self.meet_in_the_middle else 0
+        if backward_rides:
+            rides = self.rides_to(network, destination, is_active, backward_rides)
+            if backward_rides == max_transfers + 1 and origin not in rides:
+                return []
+        best: Dict[int, int] = {origin: 0}
+        best_round: Dict[int, int] = {origin: -1}
+        parents: List[Dict[int, Tuple[int, int, int, int]]] = []
+        marked: Set[int] = {origin}
+        journeys: List[Journey] = []
+
+        for round_ in range(max_transfers + 1):
+            if not marked:
+                break
+            improved: Dict[int, Tuple[int, int, int, int, int]] = {}
+            routes = self._collect_routes(network, marked, is_active)
+            rides_left = max_transfers - round_
+            pruning = rides if rides_left < backward_rides else None
+            if pruning is not None:
+                # Only routes stopping at a station within the rides left can lead on.
+                stopping_routes = self._stops_index(network)
+                leading = {
+                    route for station, count in rides.items() if count <= rides_left
+                    for route in stopping_routes[station]
+                }
+                routes = [route for route in routes if route in leading]
+            for route in routes:
+                self._scan_route(network, route, best, best_round, improved, destination,
+                                 rides=pruning, rides_left=rides_left)
+                if network.bidirectional[route]:
+                    self._scan_route(network, route, best, best_round, improved,
+                                     destination, reverse=True,
+                                     rides=pruning, rides_left=rides_left)
+
+            round_parents: Dict[int, Tuple[int, int, int, int]] = {}
+            for station, (stations, route, board, board_round, distance) in improved.items():
+                best[station] = stations
+                best_round[station] = round_
+                round_parents[station] = (route, board, board_round, distance)
+            parents.append(round_parents)
+            marked = set(improved)
+
+            if destination in improved:
+                legs = self._reconstruct(parents, destination, round_)
+                journeys.append(Journey(len(legs) - 1, improved[destination][0], legs))
+
+        return self._pareto(journeys)
+
+    def reach( # pylint: disable=too-many-arguments,too-many-positional-arguments,too-many-locals
+        self,
+        network: CompactNetwork,
+        origin: int,
+        is_active: Callable[[int], bool],
+        max_transfers: int,
+        max_stations: Optional[int] = None
+    ) -> Dict[int, List[Reach]]:
+        """
+        Runs the rounds from one origin to every station at once.
+
+        Args:
+            network (CompactNetwork): The network to search.
+            origin (int): The origin station ID.
+            is_active (Callable[[int], bool]): Tells whether a route ID can be
+                used for this query.
+            max_transfers (int): The maximum number of transfers allowed; it is
+                capped at MAX_TRANSFERS_LIMIT.
+            max_stations (Optional[int]): The maximum number of stations
+                traveled, or None for no limit.
+
+        Returns:
+            Dict[int, List[Reach]]: For every station reached other than the
+                origin, its Pareto-optimal (transfers, stations traveled) pairs
+                ordered by transfers.
+        """
+        max_transfers = max(0, min(max_transfers, MAX_TRANSFERS_LIMIT))
+        best: Dict[int, int] = {origin: 0}
+        best_round: Dict[int, int] = {origin: -1}
+        legs: Dict[Tuple[int, int], int] = {(origin, -1): 0}
+        marked: Set[int] = {origin}
+        reached: Dict[int, List[Reach]] = {}
+
+        for round_ in range(max_transfers + 1):
+            if not marked:
+                break
+            improved: Dict[int, Tuple[int, int, int, int, int]] = {}
+            for route in self._collect_routes(network, marked, is_active):
+                self._scan_route(network, route, best, best_round, improved, -1)
+                if network.bidirectional[route]:
+                    self._scan_route(network, route, best, best_round, improved, -1,
+                                     reverse=True)
+
+            marked = set()
+            for station, (stations, _, board, board_round, _) in improved.items():
+                if max_stations is not None and stations > max_stations:
+                    continue
+                best[station] = stations
+                best_round[station] = round_
+                marked.add(station)
+                legs[(station, round_)] = legs[(board, board_round)] + 1
+                reached.setdefault(station, []).append(
+                    Reach(legs[(station, round_)] - 1, stations))
+
+        return reached
+
+    def rides_to(
+        self,
+        network: CompactNetwork,
+        destination: int,
+        is_active: Callable[[int], bool],
+        max_rides: int
+    ) -> Dict[int, int]:
+        """
+        Runs rounds backward from the destination, counting the fewest rides
+        each station needs to reach it. As in `RouteValidator.validate_direction`,
+        a ride leads to a marked station from the stops before it on a route,
+        or from any stop of a bidirectional route.
+
+        Args:
+            network (CompactNetwork): The network to search.
+            destination (int): The destination station ID.
+            is_active (Callable[[int], bool]): Tells whether a route ID can be
+                used for this query.
+            max_rides (int): The number of rounds to run.
+
+        Returns:
+            Dict[int, int]: The rides needed by each station that reaches the
+                destination in at most `max_rides` rides, 0 for the destination.
+        """
+        stopping_routes = self._stops_index(network)
+        rides: Dict[int, int] = {destination: 0}
+        marked = {destination}
+        for count in range(1, max_rides + 1):
+            routes = {
+                route for station in marked for route in stopping_routes[station]
+                if is_active(route)
+            }
+            marked = set()
+            for route in routes:
+                stops = network.route_stops(route).tolist()
+                if network.bidirectional[route]:
+                    boarding = stops
+                else:
+                    last = max(position for position, station in enumerate(stops)
+                               if station in rides)
+                    boarding = stops[:last]
+                for station in boarding:
+                    if station not in rides:
+                        rides[station] = count
+                        marked.add(station)
+            if not marked:
+                break
+        return rides
+
+    def _stops_index(self, network: CompactNetwork) -> Tuple[Tuple[int, ...], ...]:
+        """
+        Returns the routes stopping at each station, building the index when
+        the network changes. Unlike `CompactNetwork.routes_at`, it follows the
+        stop lists of the routes rather than the stations data.
+
+        Args:
+            network (CompactNetwork): The network being searched.
+
+        Returns:
+            Tuple[Tuple[int, ...], ...]: The route IDs stopping at each station ID.
+        """
+        indexed, stopping_routes = self._stops
+        if indexed is not network:
+            routes: List[List[int]] = [[] for _ in network.station_names]
+            for route, positions in enumerate(network.positions):
+                for station in positions:
+                    routes[station].append(route)
+            stopping_routes = tuple(tuple(station_routes) for station_routes in routes)
+            self._stops = (network, stopping_routes)
+        return stopping_routes
+
+    @staticmethod
+    def _collect_routes(
+        network: CompactNetwork, marked: Set[int], is_active: Callable[[int], bool]
+    ) -> List[int]:
+        """
+        Lists the active routes that stop at any of the marked stations.
+
+        Args:
+            network (CompactNetwork): The network to search.
+            marked (Set[int]): Stations improved in the previous round.
+            is_active (Callable[[int], bool]): Tells whether a route can be used.
+
+        Returns:
+            List[int]: The route IDs to scan, in ascending order.
+        """
+        routes = set()
+        for station in marked:
+            for route in network.boarding_at(station):
+                if route not in routes and is_active(route):
+                    routes.add(route)
+        return sorted(routes)
+
+    @staticmethod
+    # pylint: disable-next=too-many-arguments,too-many-positional-arguments,too-many-locals
+    def _scan_route(
+        network: CompactNetwork,
+        route: int,
+        best: Dict[int, int],
+        best_round: Dict[int, int],
+        improved: Dict[int, Tuple[int, int, int, int, int]],
+        destination: int,
+        reverse: bool = False,
+        rides: Optional[Dict[int, int]] = None,
+        rides_left: int = 0
+    ):
+        """
+        Rides a route once, boarding at the cheapest labeled station seen so far
+        and recording every station whose label improves.
+
+        Args:
+            network (CompactNetwork): The network to search.
+            route (int): The route ID to scan.
+            best (Dict[int, int]): Labels from the previous rounds.
+            best_round (Dict[int, int]): Round in which each label was set.
+            improved (Dict[int, Tuple[int, int, int, int, int]]): Labels improved in
+                the current round, updated in place.
+            destination (int): The destination station ID, used for pruning, or -1
+                to label every station.
+            reverse (bool): Whether to ride the route against its stop order.
+            rides (Optional[Dict[int, int]]): The rides each station needs to
+                reach the destination, as `rides_to` counts them, or None to
+                label every station.
+            rides_left (int): The rides left after this round; stations that
+                need more are not labeled.
+        """
+        stops = network.route_stops(route)
+        order = range(len(stops) - 1, -1, -1) if reverse else range(len(stops))
+        step = -1 if reverse else 1
+        no_label = float("inf")
+        board_value = no_label
+        board = board_round = board_position = -1
+
+        for position in order:
+            station = stops[position]
+            if board >= 0:
+                arrival = board_value + position * step
+                bound = min(best.get(station, no_label), best.get(destination, no_label),
+                            improved.get(destination, (no_label,))[0])
+                if arrival < bound and arrival < improved.get(station, (no_label,))[0] \
+                        and (rides is None or rides.get(station, rides_left + 1) <= rides_left):
+                    improved[station] = (arrival, route, board, board_round,
+                                         abs(position - board_position))
+            label = best.get(station)
+            if label is not None and label - position * step < board_value:
+                board_value = label - position * step
+                board, board_round, board_position = station, best_round[station], position
+
+    @staticmethod
+    def _reconstruct(
+        parents: List[Dict[int, Tuple[int, int, int, int]]], destination: int, round_: int
+    ) -> Tuple[Leg, ...]:
+        """
+        Follows the parent pointers back from the destination to the origin.
+
+        Args:
+            parents (List[Dict[int, Tuple[int, int, int, int]]]): Per round, the
+                route, boarding station, boarding round and distance of each label.
+            destination (int): The destination station ID.
+            round_ (int): The round in which the destination was reached.
+
+        Returns:
+            Tuple[Leg, ...]: The legs of the journey in travel order.
+        """
+        legs = []
+        station = destination
+        while round_ >= 0:
+            route, board, board_round, distance = parents[round_][station]
+            legs.append(Leg(route, board, station, distance))
+            station, round_ = board, board_round
+        return tuple(reversed(legs))
+
+    @staticmethod
+    def _pareto(journeys: List[Journey]) -> List[Journey]:
+        """
+        Keeps the journeys not dominated in (transfers, stations traveled).
+
+        Args:
+            journeys (List[Journey]): The journeys found by the rounds.
+
+        Returns:
+            List[Journey]: The non-dominated journeys ordered by transfers.
+        """
+        pareto = []
+        for journey in sorted(journeys, key=lambda x: (x.transfers, x.stations)):
+            if not pareto or journey.stations < pareto[-1].stations:
+                pareto.append(journey)
+        return pareto
@@ -0,0 +1,136 @@
+"""This module is used to cache the results of travel searches.
+
+Author: Juan Esteban Bedoya <jebedoyal@udistrital.edu.co>
+
+This file is part of SmartCommute project.
+
+SmartCommute is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+SmartCommute is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
+"""
+
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+class ResultCache(ABC):
+    """
+    Interface for the storage of travel search results.
+
+    Keys are tuples of plain values (numbers, strings and bytes), so a
+    backend shared between workers can serialize them. Cached results are
+    shared between requests and must not be modified.
+    """
+
+    @abstractmethod
+    def get(self, key: Hashable) -> Optional[dict]:
+        """
+        Looks up a result.
+
+        Args:
+            key (Hashable): The search key.
+
+        Returns:
+            Optional[dict]: The cached result, or None if it is missing or expired.
+        """
+        pass # pylint: disable=unnecessary-pass
+
+    @abstractmethod
+    def set(self, key: Hashable, result: dict):
+        """
+        Stores a result.
+
+        Args:
+            key (Hashable): The search key.
+            result (dict): The result to store.
+        """
+        pass # pylint: disable=unnecessary-pass
+
+    @abstractmethod
+    def clear(self):
+        """Removes every stored result."""
+        pass # pylint: disable=unnecessary-pass
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        """
+        Reports the usage of the cache.
+
+        Returns:
+            Dict[str, Any]: Counters and sizes of the cache.
+        """
+        pass # pylint: disable=unnecessary-pass
+
+
+class LRUResultCache(ResultCache):
+    """
+    In-process cache that keeps the most recently used results, each for a
+    limited time.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        """
+        Initializes an empty cache.
+
+        Args:
+            max_size (int): The maximum number of results kept.
+            ttl (float): Seconds a result stays valid; 0 keeps it until evicted.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries: "OrderedDict[Hashable, Tuple[float, dict]]" = OrderedDict()
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[dict]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and self.ttl and entry[0] <= time.monotonic():
+                del self.entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, result: dict):
+        expires = time.monotonic() + self.ttl if self.ttl else 0.0
+        with self.lock:
+            self.entries[key] = (expires, result)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": "memory",
+                "size": len(self.entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0
+            }
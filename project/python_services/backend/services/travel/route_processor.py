@@ -19,129 +19,283 @@ You should have received a copy of the GNU General Public License
 along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
 """
 
-from typing import Dict, List, Any, Set
+
+import heapq
+from bisect import bisect_left
+from typing import Dict, List, Any, NamedTuple, Optional, Sequence, Tuple
+from services.travel.compact_network import CompactNetwork # pylint: disable=import-error
 from services.travel.route_validator import RouteValidator # pylint: disable=import-error
+from services.travel.transfer_scoring import ( # pylint: disable=import-error
+    NetworkArrays, VECTORIZE_MIN_PAIRS, np
+)
+from services.travel.selection import DEFAULT_LIMIT # pylint: disable=import-error
+from services.travel.search_timings import SearchTimings # pylint: disable=import-error
+
+class TransferCandidate(NamedTuple):
+    """A one-transfer journey expressed with station and route IDs."""
+    score: int
+    first_route: int
+    transfer_station: int
+    second_route: int
+    first_distance: int
+    second_distance: int
+
+    def details(self, network: CompactNetwork, origin: int, destination: int) -> Dict[str, Any]:
+        """
+        Resolves the journey into the response format with station and route names.
+
+        Args:
+            network (CompactNetwork): The network the IDs belong to.
+            origin (int): The origin station ID.
+            destination (int): The destination station ID.
+
+        Returns:
+            Dict[str, Any]: The first and second segments, the total stations,
+                the transfer station and the number of transfers of the journey.
+        """
+        transfer_station = network.station_names[self.transfer_station]
+        return {
+            "first_segment": {
+                "route": network.route_names[self.first_route],
+                "type": network.route_type(self.first_route),
+                "from": network.station_names[origin],
+                "to": transfer_station,
+                "intermediate_stations": self.first_distance
+            },
+            "second_segment": {
+                "route": network.route_names[self.second_route],
+                "type": network.route_type(self.second_route),
+                "from": transfer_station,
+                "to": network.station_names[destination],
+                "intermediate_stations": self.second_distance
+            },
+            "total_stations": self.score,
+            "transfer_station": transfer_station,
+            "transfers": 1
+        }
+
 
 class RouteProcessor:
     """
     Processes routes to find direct and transfer routes between origin and destination.
+
+    When NumPy is installed, searches joining many pairs of routes run with
+    array operations over the transfer hubs of the network, wrapped on first use.
     """
 
+    def __init__(self):
+        """Initializes the processor without network matrices."""
+        self._arrays: Optional[NetworkArrays] = None
+
+    def _network_arrays(self, network: CompactNetwork) -> NetworkArrays:
+        """
+        Returns the NumPy arrays of a network, building them when the
+        network changes.
+
+        Args:
+            network (CompactNetwork): The network being searched.
+
+        Returns:
+            NetworkArrays: The arrays of the network.
+        """
+        arrays = self._arrays
+        if arrays is None or arrays.network is not network:
+            arrays = self._arrays = NetworkArrays(network)
+        return arrays
+
     def process_direct_routes(
         self,
-        origin: str,
-        destination: str,
-        common_routes: Set[str],
-        schedules: Dict[str, Dict[str, str]],
-        route_stations: Dict[str, List[str]]
-    ) -> List[str]:
+        origin: int,
+        destination: int,
+        network: CompactNetwork,
+        active_routes: Sequence[int]
+    ) -> List[int]:
         """
         Processes and returns direct routes between origin and destination.
 
         Args:
-            origin (str): The origin station.
-            destination (str): The destination station.
-            common_routes (Set[str]): A set of routes that are common between the origin
-                and destination.
-            schedules (Dict[str, Dict[str, str]]): A dictionary containing the schedule
-                data for the routes.
-            route_stations (Dict[str, List[str]]): A dictionary mapping routes to their
-                list of stations.
+            origin (int): The origin station ID.
+            destination (int): The destination station ID.
+            network (CompactNetwork): The compact network to search.
+            active_routes (Sequence[int]): The mask of routes running at the moment
+                of the query, one entry per route ID.
 
         Returns:
-            List[str]: A list of direct routes that are available and validated.
+            List[int]: A list of direct route IDs that are available and validated,
+                bidirectional routes first.
         """
+        destination_routes = set(network.routes_at(destination))
         direct_routes = [
-            route for route in common_routes
-            if RouteValidator.validate_direction(route, origin, destination, route_stations)
-            and RouteValidator.check_route_availability(schedules, route)
+            route for route in network.routes_at(origin)
+            if route in destination_routes
+            and RouteValidator.validate_direction(origin, destination, network.positions[route],
+                                                  network.bidirectional[route])
+            and RouteValidator.check_route_availability(active_routes, route)
         ]
-        direct_routes.sort(key=lambda x: (not RouteValidator.is_bidirectional_route(x), x))
+        direct_routes.sort(key=lambda x: (not network.bidirectional[x], x))
         return direct_routes
 
-    def process_transfers(
+    def process_transfers( # pylint: disable=too-many-arguments,too-many-positional-arguments
         self,
-        origin: str,
-        destination: str,
-        origin_routes: Set[str],
-        stations_data: Dict[str, Set[str]],
-        schedules: Dict[str, Dict[str, str]],
-        route_stations: Dict[str, List[str]]
-    ) -> List[Dict[str, Any]]:
+        origin: int,
+        destination: int,
+        network: CompactNetwork,
+        active_routes: Sequence[int],
+        limit: int = DEFAULT_LIMIT,
+        timings: Optional[SearchTimings] = None,
+        running: Optional[Dict[int, List[Tuple[int, int, int]]]] = None
+    ) -> List[TransferCandidate]:
         """
         Processes and returns transfer routes between origin and destination.
 
+        Each running route at the origin is joined with each running route at
+        the destination through the transfer hubs precomputed for the pair,
+        so only the stations where both routes meet are examined.
+
         Args:
-            origin (str): The origin station.
-            destination (str): The destination station.
-            origin_routes (Set[str]): A set of routes originating from the origin station.
-            stations_data (Dict[str, Set[str]]): A dictionary mapping stations to the set
-                of routes that pass through them.
-            schedules (Dict[str, Dict[str, str]]): A dictionary containing the schedule
-                data for the routes.
-            route_stations (Dict[str, List[str]]): A dictionary mapping routes to their
-                list of stations.
+            origin (int): The origin station ID.
+            destination (int): The destination station ID.
+            network (CompactNetwork): The compact network to search.
+            active_routes (Sequence[int]): The mask of routes running at the moment
+                of the query, one entry per route ID.
+            limit (int): The number of journeys to return.
+            timings (Optional[SearchTimings]): Where the first and second routes
+                joined are counted, if the search is timed.
+            running (Optional[Dict[int, List[Tuple[int, int, int]]]]): The running
+                routes of each station already listed with the same network and
+                mask, filled as stations are listed. Searches sharing an origin or
+                destination, such as the pairs of a batch, list them once.
 
         Returns:
-            List[Dict[str, Any]]: A list of transfer routes, each containing the routes
-                taken, the transfer stations, and the total stations traveled.
+            List[TransferCandidate]: The `limit` transfer journeys with the fewest
+                stations traveled.
         """
-        transfers = []
-        station_cache = {}
-
-        for first_route in origin_routes:
-            if not RouteValidator.check_route_availability(schedules, first_route):
-                continue
-
-            if first_route not in station_cache:
-                try:
-                    route_stops = route_stations[first_route]
-                    origin_index = route_stops.index(origin)
-                    possible_stations = route_stops[:origin_index] \
-                        + route_stops[origin_index + 1:] \
-                        if RouteValidator.is_bidirectional_route(first_route) \
-                            else route_stops[origin_index + 1:]
-                    station_cache[first_route] = possible_stations
-                except (ValueError, KeyError):
-                    continue
-            else:
-                possible_stations = station_cache[first_route]
+        if running is None:
+            running = {}
+        origin_routes = running.get(origin)
+        if origin_routes is None:
+            origin_routes = running[origin] = self._running_routes(
+                origin, network, active_routes)
+        destination_routes = running.get(destination)
+        if destination_routes is None:
+            destination_routes = running[destination] = self._running_routes(
+                destination, network, active_routes)
+        if timings is not None:
+            timings.count("first_routes", len(origin_routes))
+            timings.count("second_routes", len(destination_routes))
+        if limit <= 0:
+            return []
+        if np is not None and len(origin_routes) * len(destination_routes) >= VECTORIZE_MIN_PAIRS:
+            return [
+                TransferCandidate(*fields)
+                for fields in self._network_arrays(network).join_transfers(
+                    origin_routes, destination_routes, limit)
+            ]
+        return self._join_transfers(network, origin_routes, destination_routes, limit)
 
-            for transfer_station in possible_stations:
-                if transfer_station not in stations_data:
-                    continue
+    @staticmethod
+    def _running_routes(
+        station: int,
+        network: CompactNetwork,
+        active_routes: Sequence[int]
+    ) -> List[Tuple[int, int, int]]:
+        """
+        Lists the running routes listed at a station that stop there.
+
+        Args:
+            station (int): The station ID.
+            network (CompactNetwork): The compact network to search.
+            active_routes (Sequence[int]): The mask of routes running at the moment
+                of the query, one entry per route ID.
+
+        Returns:
+            List[Tuple[int, int, int]]: The route ID, the first position of the
+                station on the route and whether the route is bidirectional, by
+                ascending route ID.
+        """
+        positions = network.boarding_positions
+        bidirectional = network.bidirectional
+        return [
+            (route, positions[entry], bidirectional[route])
+            for entry, route in enumerate(network.boarding_at(station),
+                                          network.boarding_offsets[station])
+            if RouteValidator.check_route_availability(active_routes, route)
+        ]
+
+    @staticmethod
+    def _join_transfers( # pylint: disable=too-many-locals
+        network: CompactNetwork,
+        origin_routes: List[Tuple[int, int, int]],
+        destination_routes: List[Tuple[int, int, int]],
+        limit: int
+    ) -> List[TransferCandidate]:
+        """
+        Joins the origin and destination routes through their transfer hubs,
+        keeping the best journeys in a bounded heap.
+
+        Ties are ordered by first route, stop on the first route, then second
+        route. The heap holds negated keys, so its top is the worst journey
+        kept and worse entries are skipped without being pushed.
 
-                for second_route in stations_data[transfer_station].intersection(stations_data[destination]):
-                    if not RouteValidator.check_route_availability(schedules, second_route):
+        Args:
+            network (CompactNetwork): The compact network to search.
+            origin_routes (List[Tuple[int, int, int]]): The running routes at the
+                origin, as `_running_routes` lists them.
+            destination_routes (List[Tuple[int, int, int]]): The running routes
+                at the destination, as `_running_routes` lists them.
+            limit (int): The number of journeys to keep.
+
+        Returns:
+            List[TransferCandidate]: The best journeys, fewest stations first.
+        """
+        partners = network.hub_partners
+        route_offsets = network.hub_route_offsets
+        offsets = network.hub_offsets
+        occurrences = network.hub_occurrences
+        first_positions = network.hub_first_positions
+        second_positions = network.hub_second_positions
+        heap: List[Tuple[Tuple[int, int, int, int], int, int]] = []
+        worst = None
+
+        for first_route, origin_position, first_bidirectional in origin_routes:
+            low = route_offsets[first_route]
+            high = route_offsets[first_route + 1]
+            for second_route, destination_position, second_bidirectional in destination_routes:
+                # Destination routes ascend, so each search starts after the last match.
+                pair = bisect_left(partners, second_route, low, high)
+                if pair == high or partners[pair] != second_route:
+                    continue
+                low = pair + 1
+                for entry in range(offsets[pair], offsets[pair + 1]):
+                    occurrence = occurrences[entry]
+                    if occurrence == origin_position \
+                            or (occurrence < origin_position and not first_bidirectional):
+                        continue
+                    transfer_position = second_positions[entry]
+                    if transfer_position >= destination_position and not second_bidirectional:
+                        continue
+                    first_distance = abs(origin_position - first_positions[entry])
+                    second_distance = abs(transfer_position - destination_position)
+                    score = first_distance + second_distance
+                    if worst is not None and score > worst:
                         continue
-                    if RouteValidator.validate_direction(second_route, transfer_station,
-                                                         destination, route_stations):
-                        first_distance = abs(route_stations[first_route].index(origin)
-                                              - route_stations[first_route].index(transfer_station))
-                        second_distance = abs(route_stations[second_route].index(transfer_station)
-                                               - route_stations[second_route].index(destination))
-                        transfers.append({
-                            "score": first_distance + second_distance,
-                            "details": {
-                                "first_segment": {
-                                    "route": first_route,
-                                    "type": "bidirectional" if first_route.strip().isdigit() \
-                                        else "unidirectional",
-                                    "from": origin,
-                                    "to": transfer_station,
-                                    "intermediate_stations": first_distance
-                                },
-                                "second_segment": {
-                                    "route": second_route,
-                                    "type": "bidirectional" if second_route.strip().isdigit() \
-                                        else "unidirectional",
-                                    "from": transfer_station,
-                                    "to": destination,
-                                    "intermediate_stations": second_distance
-                                },
-                                "total_stations": first_distance + second_distance,
-                                "transfer_station": transfer_station
-                            }
-                        })
-
-        return sorted(transfers, key=lambda x: x["score"])[:5]
+                    key = (-score, -first_route, -occurrence, -second_route)
+                    if len(heap) < limit:
+                        heapq.heappush(heap, (key, first_distance, second_distance))
+                    elif key > heap[0][0]:
+                        heapq.heapreplace(heap, (key, first_distance, second_distance))
+                    else:
+                        continue
+                    if len(heap) == limit:
+                        worst = -heap[0][0][0]
+
+        stop_offsets = network.stop_offsets
+        stops = network.stops
+        journeys = []
+        for key, first_distance, second_distance in sorted(heap, reverse=True):
+            score, first_route, occurrence, second_route = (-value for value in key)
+            journeys.append(TransferCandidate(
+                score, first_route, stops[stop_offsets[first_route] + occurrence],
+                second_route, first_distance, second_distance
+            ))
+        return journeys
@@ -19,8 +19,7 @@ You should have received a copy of the GNU General Public License
 along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
 """
 
-from datetime import datetime
-from typing import Dict, List
+from typing import Mapping, Sequence
 
 class RouteValidator:
     """
@@ -43,57 +42,40 @@ class RouteValidator:
         return route_id.strip().isdigit()
 
     @staticmethod
-    def check_route_availability(
-        schedules: Dict[str, Dict[str, str]], route_id: str
-    ) -> bool:
+    def check_route_availability(active_routes: Sequence[int], route_id: int) -> bool:
         """
-        Checks if a route is available based on the current time and the route's schedule.
+        Checks if a route is running at the moment of the query.
 
         Args:
-            schedules (Dict[str, Dict[str, str]]): A dictionary of route schedules where
-                the key is the route ID and the value is another dictionary with the
-                days of the week as keys and schedule time ranges as values.
-            route_id (str): The ID of the route to check.
+            active_routes (Sequence[int]): The mask computed once per query by
+                `ScheduleIndex.active_routes`, with one entry per route ID.
+            route_id (int): The ID of the route to check.
 
         Returns:
-            bool: True if the route is available based on the current day and time,
+            bool: True if the route is running at the moment of the query,
                 otherwise False.
         """
-        now = datetime.now()
-        current_day = now.strftime("%A").lower()
-        current_time = now.strftime("%H:%M")
-        if route_id not in schedules or current_day not in schedules[route_id]:
-            return False
-        schedule = schedules[route_id][current_day]
-        try:
-            start, end = schedule.split(" - ", 1)
-            return start <= current_time <= end
-        except ValueError:
-            return False
+        return bool(active_routes[route_id])
 
     @staticmethod
     def validate_direction(
-        route_id: str, origin: str, destination: str, route_stations: Dict[str, List[str]]
+        origin: int, destination: int, positions: Mapping[int, int], bidirectional: bool
     ) -> bool:
         """
         Validates if a route is valid for travel from the origin station to the destination station.
 
         Args:
-            route_id (str): The ID of the route.
-            origin (str): The origin station.
-            destination (str): The destination station.
-            route_stations (Dict[str, List[str]]): A dictionary mapping route IDs to lists
-                of stations.
+            origin (int): The origin station ID.
+            destination (int): The destination station ID.
+            positions (Mapping[int, int]): A mapping from the station IDs of the
+                route to their position on it.
+            bidirectional (bool): Whether the route can be traveled in both directions.
 
         Returns:
             bool: True if the route is valid for the given origin and destination, otherwise False.
         """
-        try:
-            stations = route_stations[route_id]
-            if origin not in stations or destination not in stations:
-                return False
-            if RouteValidator.is_bidirectional_route(route_id):
-                return True
-            return stations.index(origin) < stations.index(destination)
-        except (KeyError, ValueError):
+        if origin not in positions or destination not in positions:
             return False
+        if bidirectional:
+            return True
+        return positions[origin] < positions[destination]
@@ -0,0 +1,251 @@
+"""This module defines the minute-based schedule model used to 
+decide which Transmilenio routes are running.
+
+Author: Juan Esteban Bedoya <jebedoyal@udistrital.edu.co>
+
+This file is part of SmartCommute project.
+
+SmartCommute is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+SmartCommute is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
+"""
+
+from array import array
+from datetime import datetime
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Set, Tuple
+
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+MINUTES_PER_DAY = 24 * 60
+ACTIVE_CACHE_SIZE = 64
+# Minutes between departures of schedule entries without a "headway".
+DEFAULT_HEADWAY_MINUTES = 10
+
+def parse_minutes(value: str) -> Optional[int]:
+    """
+    Parses a "HH:MM" (or "HH:MM:SS") time into minutes after midnight.
+
+    Args:
+        value (str): The time to parse.
+
+    Returns:
+        Optional[int]: The minutes after midnight, or None if the value is not
+            a valid time.
+    """
+    try:
+        hours, minutes = value.strip().split(":")[:2]
+        total = int(hours) * 60 + int(minutes)
+    except (AttributeError, ValueError):
+        return None
+    return total if 0 <= total <= MINUTES_PER_DAY else None
+
+
+def parse_schedule(schedule: Sequence[Mapping[str, Any]]) -> Dict[int, List[Tuple[int, int]]]:
+    """
+    Parses the schedule entries of a route into minute ranges per weekday.
+
+    A range whose end is earlier than its start crosses midnight; the part
+    after midnight is assigned to the following weekday.
+
+    Args:
+        schedule (Sequence[Mapping[str, Any]]): Entries with "day", "start_time"
+            and "end_time" keys.
+
+    Returns:
+        Dict[int, List[Tuple[int, int]]]: A dictionary mapping weekday numbers
+            (0 is Monday) to inclusive (start, end) minute ranges.
+    """
+    ranges: Dict[int, List[Tuple[int, int]]] = {}
+    for entry in schedule:
+        day = entry.get("day", "").strip().lower()
+        start = parse_minutes(entry.get("start_time", ""))
+        end = parse_minutes(entry.get("end_time", ""))
+        if day not in WEEKDAYS or start is None or end is None:
+            continue
+        weekday = WEEKDAYS.index(day)
+        if start <= end:
+            ranges.setdefault(weekday, []).append((start, end))
+        else:
+            ranges.setdefault(weekday, []).append((start, MINUTES_PER_DAY - 1))
+            ranges.setdefault((weekday + 1) % 7, []).append((0, end))
+    return ranges
+
+
+def parse_headway(value: Any) -> Optional[int]:
+    """
+    Parses the "headway" of a schedule entry: the whole minutes between two
+    departures, given as a number or a numeric string.
+
+    Args:
+        value (Any): The headway to parse.
+
+    Returns:
+        Optional[int]: The minutes between departures, or None if the value is
+            not a positive whole number of minutes.
+    """
+    if isinstance(value, str) and value.strip().isdigit():
+        value = int(value)
+    if isinstance(value, bool) or not isinstance(value, int):
+        return None
+    return value if 0 < value <= MINUTES_PER_DAY else None
+
+
+def parse_departures(schedule: Sequence[Mapping[str, Any]]) -> Dict[int, List[int]]:
+    """
+    Expands the schedule entries of a route into its departures from the
+    first stop: one every "headway" minutes, or DEFAULT_HEADWAY_MINUTES when
+    it is missing or invalid, from the start time to the end time.
+
+    Departures after midnight of a range that crosses it belong to the
+    following weekday.
+
+    Args:
+        schedule (Sequence[Mapping[str, Any]]): Entries with "day", "start_time",
+            "end_time" and optionally "headway" keys.
+
+    Returns:
+        Dict[int, List[int]]: A dictionary mapping weekday numbers (0 is
+            Monday) to the ascending, distinct departure minutes after midnight.
+    """
+    departures: Dict[int, Set[int]] = {}
+    for entry in schedule:
+        day = entry.get("day", "").strip().lower()
+        start = parse_minutes(entry.get("start_time", ""))
+        end = parse_minutes(entry.get("end_time", ""))
+        if day not in WEEKDAYS or start is None or end is None:
+            continue
+        headway = parse_headway(entry.get("headway")) or DEFAULT_HEADWAY_MINUTES
+        if end < start:
+            end += MINUTES_PER_DAY
+        weekday = WEEKDAYS.index(day)
+        for minute in range(start, end + 1, headway):
+            departures.setdefault((weekday + minute // MINUTES_PER_DAY) % 7, set()).add(
+                minute % MINUTES_PER_DAY)
+    return {weekday: sorted(minutes) for weekday, minutes in departures.items()}
+
+
+class ScheduleIndex:
+    """
+    Minute ranges of every route, grouped by weekday, that answers "which
+    routes are running at this moment" with a single pass per query.
+    """
+
+    __slots__ = ("route_count", "starts", "ends", "routes", "_active_cache")
+
+    def __init__(self, route_count: int, schedules: Dict[int, Dict[int, List[Tuple[int, int]]]]):
+        """
+        Flattens the parsed schedules into per-weekday arrays.
+
+        Args:
+            route_count (int): The number of routes in the network.
+            schedules (Dict[int, Dict[int, List[Tuple[int, int]]]]): A dictionary
+                mapping route IDs to their minute ranges per weekday.
+        """
+        self.route_count = route_count
+        self.starts = tuple(array("H") for _ in WEEKDAYS)
+        self.ends = tuple(array("H") for _ in WEEKDAYS)
+        self.routes = tuple(array("I") for _ in WEEKDAYS)
+        for route in sorted(schedules):
+            for weekday, ranges in schedules[route].items():
+                for start, end in ranges:
+                    self.starts[weekday].append(start)
+                    self.ends[weekday].append(end)
+                    self.routes[weekday].append(route)
+        self._active_cache: Dict[Tuple[int, int], bytes] = {}
+
+    @classmethod
+    def from_arrays(
+        cls,
+        route_count: int,
+        starts: Sequence[Sequence[int]],
+        ends: Sequence[Sequence[int]],
+        routes: Sequence[Sequence[int]]
+    ) -> "ScheduleIndex":
+        """
+        Rebuilds an index from per-weekday arrays that were already
+        flattened, without copying them.
+
+        Args:
+            route_count (int): The number of routes in the network.
+            starts (Sequence[Sequence[int]]): The start minutes of the ranges of
+                each weekday.
+            ends (Sequence[Sequence[int]]): The end minutes of the ranges of
+                each weekday.
+            routes (Sequence[Sequence[int]]): The route ID of the ranges of each
+                weekday.
+
+        Returns:
+            ScheduleIndex: The index.
+        """
+        index = cls.__new__(cls)
+        index.route_count = route_count
+        index.starts = tuple(starts)
+        index.ends = tuple(ends)
+        index.routes = tuple(routes)
+        index._active_cache = {} # pylint: disable=protected-access
+        return index
+
+    def active_routes(self, moment: datetime) -> bytes:
+        """
+        Computes which routes are running at a given moment.
+
+        Args:
+            moment (datetime): The local date and time to check.
+
+        Returns:
+            bytes: One byte per route ID, 1 when the route is running and 0
+                otherwise.
+        """
+        key = (moment.weekday(), moment.hour * 60 + moment.minute)
+        active = self._active_cache.get(key)
+        if active is None:
+            active = self._mask(*key)
+            if len(self._active_cache) >= ACTIVE_CACHE_SIZE:
+                self._active_cache.clear()
+            self._active_cache[key] = active
+        return active
+
+    def windows(self) -> Dict[bytes, int]:
+        """
+        Lists the distinct sets of running routes over the week. Each set is
+        a schedule window, such as weekday peak or Sunday.
+
+        Returns:
+            Dict[bytes, int]: A dictionary mapping each mask, in the format of
+                `active_routes`, to the minutes per week it applies.
+        """
+        windows: Dict[bytes, int] = {}
+        for weekday in range(len(WEEKDAYS)):
+            bounds = sorted({0, *self.starts[weekday], *(
+                end + 1 for end in self.ends[weekday] if end + 1 < MINUTES_PER_DAY
+            )})
+            for minute, following in zip(bounds, bounds[1:] + [MINUTES_PER_DAY]):
+                mask = self._mask(weekday, minute)
+                windows[mask] = windows.get(mask, 0) + following - minute
+        return windows
+
+    def _mask(self, weekday: int, minute: int) -> bytes:
+        """
+        Computes the routes running at a minute of a weekday.
+
+        Args:
+            weekday (int): The weekday number, 0 being Monday.
+            minute (int): The minutes after midnight.
+
+        Returns:
+            bytes: One byte per route ID, 1 when the route is running.
+        """
+        mask = bytearray(self.route_count)
+        for start, end, route in zip(self.starts[weekday], self.ends[weekday],
+                                     self.routes[weekday]):
+            if start <= minute <= end:
+                mask[route] = 1
+        return bytes(mask)
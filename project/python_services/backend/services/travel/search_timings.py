@@ -0,0 +1,101 @@
+"""This module is used to time the stages of a travel search and 
+count the candidates it examines.
+
+Author: Juan Esteban Bedoya <jebedoyal@udistrital.edu.co>
+
+This file is part of SmartCommute project.
+
+SmartCommute is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+SmartCommute is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
+"""
+
+from time import perf_counter
+from typing import Dict
+
+class SearchTimings:
+    """
+    Durations of the stages of one travel search, and counts of the
+    candidates it examined.
+
+    Stages are timed as laps: each `lap` charges the time since the
+    previous one to a stage. Searches run without timings when
+    instrumentation is disabled, so its only cost is a None check per stage.
+    """
+
+    __slots__ = ("stages", "counts", "_last")
+
+    def __init__(self):
+        """Initializes empty timings and starts the first lap."""
+        self.stages: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self._last = perf_counter()
+
+    def restart(self):
+        """Starts a new lap without charging the elapsed time to any stage."""
+        self._last = perf_counter()
+
+    def lap(self, stage: str):
+        """
+        Charges the time since the previous lap to a stage.
+
+        Args:
+            stage (str): The name of the stage.
+        """
+        now = perf_counter()
+        self.record(stage, now - self._last)
+        self._last = now
+
+    def record(self, stage: str, seconds: float):
+        """
+        Adds time measured elsewhere to a stage.
+
+        Args:
+            stage (str): The name of the stage.
+            seconds (float): The time to add.
+        """
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def count(self, name: str, amount: int):
+        """
+        Adds to a counter of examined candidates.
+
+        Args:
+            name (str): The name of the counter.
+            amount (int): The number to add.
+        """
+        self.counts[name] = self.counts.get(name, 0) + amount
+
+    def merge(self, other: "SearchTimings"):
+        """
+        Adds the stages and counters of another search, such as the part of
+        this one that ran in a worker process.
+
+        Args:
+            other (SearchTimings): The timings to add.
+        """
+        for stage, seconds in other.stages.items():
+            self.record(stage, seconds)
+        for name, amount in other.counts.items():
+            self.count(name, amount)
+
+    def server_timing(self) -> str:
+        """
+        Formats the stages as the value of a Server-Timing header.
+
+        Returns:
+            str: One "stage;dur=milliseconds" metric per stage, in the order
+                they first ran.
+        """
+        return ", ".join(
+            f"{stage};dur={seconds * 1000:.3f}" for stage, seconds in self.stages.items()
+        )
@@ -0,0 +1,48 @@
+"""This module is used to keep the best items of a stream without 
+sorting all of them.
+
+Author: Juan Esteban Bedoya <jebedoyal@udistrital.edu.co>
+
+This file is part of SmartCommute project.
+
+SmartCommute is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+SmartCommute is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
+"""
+
+import heapq
+from typing import Any, Callable, Iterable, List, TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_LIMIT = 5
+MAX_LIMIT = 20
+
+def select_top(items: Iterable[T], limit: int, key: Callable[[T], Any]) -> List[T]:
+    """
+    Keeps the `limit` smallest items of a stream with a bounded heap, so
+    memory and comparisons grow with `limit` instead of the stream length.
+
+    The result equals `sorted(items, key=key)[:limit]`: items with equal
+    keys keep the order in which they were produced.
+
+    Args:
+        items (Iterable[T]): The items, usually produced lazily by a generator.
+        limit (int): The number of items to keep.
+        key (Callable[[T], Any]): The value to order the items by.
+
+    Returns:
+        List[T]: The selected items, smallest first.
+    """
+    if limit <= 0:
+        return []
+    return heapq.nsmallest(limit, items, key=key)
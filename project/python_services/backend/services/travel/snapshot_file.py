@@ -0,0 +1,321 @@
+"""This module is used to share a network snapshot between worker 
+processes through a memory-mapped file.
+
+Author: Juan Esteban Bedoya <jebedoyal@udistrital.edu.co>
+
+This file is part of SmartCommute project.
+
+SmartCommute is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+SmartCommute is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
+"""
+
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+from services.travel.compact_network import ARRAYS, CompactNetwork # pylint: disable=import-error
+from services.travel.network_snapshot import NetworkSnapshot # pylint: disable=import-error
+from services.travel.schedule import WEEKDAYS, ScheduleIndex # pylint: disable=import-error
+from services.travel.timetable import Timetable # pylint: disable=import-error
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+MAGIC = b"SCNS"
+FORMAT_VERSION = 4
+BYTE_ORDERS = ("little", "big")
+HEADER = struct.Struct("<4sHHII32sI")
+SECTION = struct.Struct("<QQ")
+ALIGNMENT = 8
+
+# Sections of the file and the type of their items, in file order.
+SECTIONS: Tuple[Tuple[str, str], ...] = (
+    ("station_name_offsets", "I"), ("station_name_bytes", "B"),
+    ("route_name_offsets", "I"), ("route_name_bytes", "B"),
+    *((name, "B" if name == "bidirectional" else "I") for name in ARRAYS),
+    ("schedule_offsets", "I"), ("schedule_starts", "H"),
+    ("schedule_ends", "H"), ("schedule_routes", "I"),
+    ("departure_bounds", "I"), ("departure_offsets", "I"),
+    ("departures", "H"), ("stop_times", "I")
+)
+
+def _string_table(names: Sequence[str]) -> Tuple[array, bytes]:
+    """
+    Packs strings into one UTF-8 blob.
+
+    Args:
+        names (Sequence[str]): The strings to pack.
+
+    Returns:
+        Tuple[array, bytes]: The offset of each string in the blob, plus the
+            end of the last one, and the blob.
+    """
+    offsets = array("I", [0])
+    blob = bytearray()
+    for name in names:
+        blob += name.encode("utf-8")
+        offsets.append(len(blob))
+    return offsets, bytes(blob)
+
+
+def _strings(offsets: Sequence[int], blob: memoryview) -> Tuple[str, ...]:
+    """
+    Unpacks the strings of a string table.
+
+    Args:
+        offsets (Sequence[int]): The offsets written by `_string_table`.
+        blob (memoryview): The UTF-8 blob.
+
+    Returns:
+        Tuple[str, ...]: The strings, in order.
+    """
+    return tuple(
+        str(blob[start:end], "utf-8") for start, end in zip(offsets, offsets[1:])
+    )
+
+
+def _flatten(per_weekday: Sequence[array], typecode: str) -> array:
+    """
+    Concatenates the arrays of every weekday.
+
+    Args:
+        per_weekday (Sequence[array]): One array per weekday.
+        typecode (str): The type of the items.
+
+    Returns:
+        array: The items of Monday, then Tuesday, and so on.
+    """
+    values = array(typecode)
+    for weekday in per_weekday:
+        values.extend(weekday)
+    return values
+
+
+# pylint: disable-next=too-many-locals
+def snapshot_bytes(snapshot: NetworkSnapshot, source_digest: bytes) -> bytes:
+    """
+    Packs the network, schedules and timetable of a snapshot as flat
+    arrays. Section offsets are relative to the start of the returned
+    bytes, so they can be stored on their own or inside a larger file at an
+    8-byte aligned offset.
+
+    Args:
+        snapshot (NetworkSnapshot): The snapshot to pack.
+        source_digest (bytes): A 32-byte digest of the data files the
+            snapshot was built from.
+
+    Returns:
+        bytes: The header and body of the snapshot.
+    """
+    network = snapshot.network
+    schedules = snapshot.schedules
+    timetable = snapshot.timetable
+    schedule_offsets = array("I", [0])
+    for starts in schedules.starts:
+        schedule_offsets.append(schedule_offsets[-1] + len(starts))
+    departure_bounds = array("I", [0])
+    for departures in timetable.departures:
+        departure_bounds.append(departure_bounds[-1] + len(departures))
+    sections = (
+        *_string_table(network.station_names), *_string_table(network.route_names),
+        *(getattr(network, name) for name in ARRAYS),
+        schedule_offsets, _flatten(schedules.starts, "H"),
+        _flatten(schedules.ends, "H"), _flatten(schedules.routes, "I"),
+        departure_bounds, _flatten(timetable.departure_offsets, "I"),
+        _flatten(timetable.departures, "H"), timetable.stop_times
+    )
+
+    body = bytearray(SECTION.size * len(SECTIONS))
+    for index, ((_, typecode), values) in enumerate(zip(SECTIONS, sections)):
+        data = memoryview(values).cast("B")
+        body += bytes(-(HEADER.size + len(body)) % ALIGNMENT)
+        SECTION.pack_into(body, index * SECTION.size, HEADER.size + len(body),
+                          len(data) // array(typecode).itemsize)
+        body += data
+    header = HEADER.pack(
+        MAGIC, FORMAT_VERSION, BYTE_ORDERS.index(sys.byteorder), network.listed_stations,
+        schedules.route_count, source_digest, zlib.crc32(body)
+    )
+    return header + body
+
+
+def write_snapshot(snapshot: NetworkSnapshot, path: str, source_digest: bytes):
+    """
+    Writes the network, schedules and timetable of a snapshot as flat
+    arrays. The file is replaced atomically, so processes that attached the
+    previous file keep a consistent view of it.
+
+    Args:
+        snapshot (NetworkSnapshot): The snapshot to write.
+        path (str): The path of the snapshot file.
+        source_digest (bytes): A 32-byte digest of the data files the
+            snapshot was built from.
+    """
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as file:
+        file.write(snapshot_bytes(snapshot, source_digest))
+    os.replace(temporary, path)
+
+
+def attach_snapshot(path: str, source_digest: bytes, version: int = 0) -> NetworkSnapshot:
+    """
+    Maps a snapshot file. Stop sequences, adjacency, schedules and
+    timetables are used in place, so every process attached to the same
+    file shares a single copy of them; only the names and lookup
+    dictionaries are rebuilt.
+
+    Args:
+        path (str): The path of the snapshot file.
+        source_digest (bytes): The digest the file must have been written with.
+        version (int): Number identifying the new snapshot.
+
+    Returns:
+        NetworkSnapshot: The snapshot stored in the file.
+
+    Raises:
+        OSError: If the file cannot be read.
+        ValueError: If the file is not a snapshot of this format, is
+            corrupted or was built from other data.
+    """
+    with open(path, "rb") as file:
+        data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    return read_snapshot(memoryview(data), source_digest, version, path)
+
+
+def read_snapshot( # pylint: disable=too-many-locals
+    view: memoryview, source_digest: bytes, version: int = 0, name: str = "snapshot"
+) -> NetworkSnapshot:
+    """
+    Reads a snapshot packed by `snapshot_bytes` without copying its arrays.
+
+    Args:
+        view (memoryview): The bytes of the snapshot, starting at its header.
+        source_digest (bytes): The digest the snapshot must have been packed with.
+        version (int): Number identifying the new snapshot.
+        name (str): Where the snapshot comes from, for error messages.
+
+    Returns:
+        NetworkSnapshot: The snapshot.
+
+    Raises:
+        ValueError: If the bytes are not a snapshot of this format, are
+            corrupted or were built from other data.
+    """
+    try:
+        magic, file_version, byte_order, listed_stations, route_count, digest, checksum = \
+            HEADER.unpack_from(view)
+    except struct.error as e:
+        raise ValueError(f"{name} is not a network snapshot.") from e
+    if magic != MAGIC or file_version != FORMAT_VERSION \
+            or byte_order != BYTE_ORDERS.index(sys.byteorder):
+        raise ValueError(f"{name} is not a network snapshot of version {FORMAT_VERSION}.")
+    if digest != source_digest:
+        raise ValueError(f"{name} was built from other data.")
+    if zlib.crc32(view[HEADER.size:]) != checksum:
+        raise ValueError(f"{name} is corrupted.")
+
+    sections: Dict[str, memoryview] = {}
+    for index, (section, typecode) in enumerate(SECTIONS):
+        offset, items = SECTION.unpack_from(view, HEADER.size + index * SECTION.size)
+        size = items * array(typecode).itemsize
+        if offset + size > len(view):
+            raise ValueError(f"{name} is truncated.")
+        sections[section] = view[offset:offset + size].cast(typecode)
+
+    network = CompactNetwork.from_arrays(
+        _strings(sections["station_name_offsets"], sections["station_name_bytes"]),
+        listed_stations,
+        _strings(sections["route_name_offsets"], sections["route_name_bytes"]),
+        {array_name: sections[array_name] for array_name in ARRAYS}
+    )
+    bounds = list(zip(sections["schedule_offsets"], sections["schedule_offsets"][1:]))
+    if len(bounds) != len(WEEKDAYS):
+        raise ValueError(f"{name} is corrupted.")
+    per_weekday: List[List[memoryview]] = [
+        [sections[section][start:end] for start, end in bounds]
+        for section in ("schedule_starts", "schedule_ends", "schedule_routes")
+    ]
+    departure_bounds = list(zip(sections["departure_bounds"],
+                                sections["departure_bounds"][1:]))
+    offsets = sections["departure_offsets"]
+    if len(departure_bounds) != len(WEEKDAYS) \
+            or len(offsets) != len(WEEKDAYS) * (route_count + 1):
+        raise ValueError(f"{name} is corrupted.")
+    timetable = Timetable.from_arrays(
+        route_count,
+        [offsets[weekday * (route_count + 1):(weekday + 1) * (route_count + 1)]
+         for weekday in range(len(WEEKDAYS))],
+        [sections["departures"][start:end] for start, end in departure_bounds],
+        sections["stop_times"]
+    )
+    return NetworkSnapshot.from_parts(
+        network, ScheduleIndex.from_arrays(route_count, *per_weekday), timetable, version
+    )
+
+
+@contextmanager
+def exclusive(path: str) -> Iterator[None]:
+    """
+    Holds a lock shared by every process using a file, so only one of them
+    writes it. Without `fcntl` the lock is skipped; processes
+    may then write the file concurrently, which is wasteful but safe.
+
+    Args:
+        path (str): The path of the file.
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(f"{path}.lock", "a", encoding="utf-8") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def load_or_write_snapshot(
+    path: str, source_digest: bytes, version: int, build: Callable[[], NetworkSnapshot]
+) -> NetworkSnapshot:
+    """
+    Attaches the snapshot file when it matches the data files. Otherwise
+    the first process to get here builds the snapshot and writes it, while
+    the others wait and then attach the file it wrote.
+
+    Args:
+        path (str): The path of the snapshot file.
+        source_digest (bytes): The digest of the current data files.
+        version (int): Number identifying the new snapshot.
+        build (Callable[[], NetworkSnapshot]): Builds the snapshot from the
+            data files.
+
+    Returns:
+        NetworkSnapshot: The snapshot, attached from the file.
+    """
+    try:
+        return attach_snapshot(path, source_digest, version)
+    except (OSError, ValueError):
+        pass
+    with exclusive(path):
+        try:
+            return attach_snapshot(path, source_digest, version)
+        except (OSError, ValueError):
+            pass
+        write_snapshot(build(), path, source_digest)
+    return attach_snapshot(path, source_digest, version)
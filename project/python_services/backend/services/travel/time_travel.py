@@ -0,0 +1,127 @@
+"""This module defines the strategy for travel planning in Transmilenio
+that minimizes the travel time, waits included.
+
+Author: Juan Esteban Bedoya <jebedoyal@udistrital.edu.co>
+
+This file is part of SmartCommute project.
+
+SmartCommute is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+SmartCommute is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+from services.travel.compact_network import CompactNetwork # pylint: disable=import-error
+from services.travel.route_processor import TransferCandidate # pylint: disable=import-error
+from services.travel.earliest_arrival import ( # pylint: disable=import-error
+    EarliestArrivalRouter, TimedJourney
+)
+from services.travel.base_travel import RouteStrategy, TravelQuery # pylint: disable=import-error
+
+class MinimizeTimeStrategy(RouteStrategy):
+    """
+    Strategy that follows the departures and run times of the routes and
+    returns every journey that is Pareto-optimal for (transfers, arrival
+    time), allowing up to `query.max_transfers` transfers.
+    """
+
+    uses_candidates = False
+    time_dependent = True
+
+    def __init__(self):
+        """Initializes the strategy with its routing engine."""
+        self.router = EarliestArrivalRouter()
+
+    def select_routes(
+        self,
+        direct_routes: List[int],
+        transfer_routes: List[TransferCandidate],
+        network: CompactNetwork,
+        query: TravelQuery
+    ) -> dict:
+        """
+        Selects the journeys arriving earliest after the departure of the query.
+
+        Args:
+            direct_routes (List[int]): Ignored, this strategy runs its own search.
+            transfer_routes (List[TransferCandidate]): Ignored, this strategy runs
+                its own search.
+            network (CompactNetwork): The network to search.
+            query (TravelQuery): The parameters of the search, with its
+                departure and the timetable of the network.
+
+        Returns:
+            dict: A dictionary containing the journeys ordered by number of
+                transfers. If no routes are found, an error message is returned.
+        """
+        departure = query.departure or datetime.now()
+        midnight = departure.replace(hour=0, minute=0, second=0, microsecond=0)
+        start = int((departure - midnight).total_seconds())
+        journeys = self.router.search(network, query.timetable, query.origin,
+                                      query.destination, departure.weekday(), start,
+                                      query.max_transfers)
+        options = [self._build_option(journey, network, midnight, start)
+                   for journey in journeys]
+        return {"routes": options} if options else {"error": "No available routes found"}
+
+    @staticmethod
+    def _build_option(
+        journey: TimedJourney, network: CompactNetwork, midnight: datetime, start: int
+    ) -> Dict[str, Any]:
+        """
+        Resolves a journey into the response format.
+
+        Args:
+            journey (TimedJourney): The journey to describe.
+            network (CompactNetwork): The network the IDs belong to.
+            midnight (datetime): The midnight the moments of the journey count from.
+            start (int): The departure of the query, in seconds after midnight.
+
+        Returns:
+            Dict[str, Any]: The journey with its route names, types, times and
+                segments.
+        """
+        def moment(seconds: int) -> str:
+            return (midnight + timedelta(seconds=seconds)).isoformat(timespec="seconds")
+
+        segments = []
+        ready = start
+        for leg in journey.legs:
+            segments.append({
+                "route": network.route_names[leg.route],
+                "type": network.route_type(leg.route),
+                "from": network.station_names[leg.board],
+                "to": network.station_names[leg.alight],
+                "intermediate_stations": leg.stations,
+                "departure_time": moment(leg.departure),
+                "arrival_time": moment(leg.arrival),
+                "wait_minutes": round((leg.departure - ready) / 60, 1)
+            })
+            ready = leg.arrival
+        stations = sum(leg.stations for leg in journey.legs)
+        return {
+            "route": " + ".join(segment["route"] for segment in segments),
+            "type": " + ".join(segment["type"] for segment in segments),
+            "transfers": journey.transfers,
+            "stations_traveled": stations,
+            "departure_time": segments[0]["departure_time"],
+            "arrival_time": moment(journey.arrival),
+            "travel_minutes": round((journey.arrival - start) / 60, 1),
+            "wait_minutes": round(sum(segment["wait_minutes"] for segment in segments), 1),
+            "details": {
+                "segments": segments,
+                "total_stations": stations,
+                "transfer_stations": [segment["from"] for segment in segments[1:]],
+                "transfers": journey.transfers
+            }
+        }
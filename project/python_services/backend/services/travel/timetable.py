@@ -0,0 +1,143 @@
+"""This module defines the departures and run times of Transmilenio 
+routes used by time-dependent travel planning.
+
+Author: Juan Esteban Bedoya <jebedoyal@udistrital.edu.co>
+
+This file is part of SmartCommute project.
+
+SmartCommute is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+SmartCommute is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
+"""
+
+from array import array
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence
+from services.travel.compact_network import CompactNetwork # pylint: disable=import-error
+from services.travel.schedule import WEEKDAYS, MINUTES_PER_DAY # pylint: disable=import-error
+
+# Minutes between two stops of routes without valid "run_times".
+DEFAULT_RUN_MINUTES = 2
+
+class Timetable:
+    """
+    Departures and run times of every route, for time-dependent searches.
+
+    Departures are the minutes at which trips leave the first stop of a
+    route, stored CSR style per weekday: `departures[weekday]` holds the
+    sorted minutes of each route one after another, split by
+    `departure_offsets[weekday]`. The next departure after a moment is then
+    a binary search. Bidirectional routes also leave their last stop at the
+    same minutes.
+
+    `stop_times` is aligned with `CompactNetwork.stops`: the seconds from
+    the first stop of the route to each of its stops.
+    """
+
+    __slots__ = ("route_count", "departure_offsets", "departures", "stop_times")
+
+    def __init__(
+        self,
+        network: CompactNetwork,
+        departures: Dict[int, Dict[int, List[int]]],
+        run_times: Dict[int, Optional[Sequence[float]]]
+    ):
+        """
+        Flattens the departures and run times of the routes.
+
+        Args:
+            network (CompactNetwork): The network the route IDs belong to.
+            departures (Dict[int, Dict[int, List[int]]]): A dictionary mapping
+                route IDs to their sorted departure minutes per weekday.
+            run_times (Dict[int, Optional[Sequence[float]]]): A dictionary
+                mapping route IDs to the minutes between each stop and the
+                next. Routes without one value per pair of consecutive stops
+                take DEFAULT_RUN_MINUTES between stops.
+        """
+        self.route_count = len(network.route_names)
+        self.departure_offsets = tuple(array("I", [0]) for _ in WEEKDAYS)
+        self.departures = tuple(array("H") for _ in WEEKDAYS)
+        for weekday, (offsets, minutes) in enumerate(zip(self.departure_offsets,
+                                                         self.departures)):
+            for route in range(self.route_count):
+                minutes.extend(departures.get(route, {}).get(weekday, ()))
+                offsets.append(len(minutes))
+
+        self.stop_times = array("I")
+        for route in range(self.route_count):
+            segments = network.route_length(route) - 1
+            minutes = run_times.get(route)
+            if minutes is None or len(minutes) != segments \
+                    or any(not 0 <= value < MINUTES_PER_DAY for value in minutes):
+                minutes = [DEFAULT_RUN_MINUTES] * segments
+            elapsed = 0
+            self.stop_times.append(0)
+            for value in minutes:
+                elapsed += round(value * 60)
+                self.stop_times.append(elapsed)
+
+    @classmethod
+    def from_arrays(
+        cls,
+        route_count: int,
+        departure_offsets: Sequence[Sequence[int]],
+        departures: Sequence[Sequence[int]],
+        stop_times: Sequence[int]
+    ) -> "Timetable":
+        """
+        Rebuilds a timetable from arrays that were already flattened, without
+        copying them.
+
+        Args:
+            route_count (int): The number of routes in the network.
+            departure_offsets (Sequence[Sequence[int]]): The offsets of the
+                departures of each route, per weekday.
+            departures (Sequence[Sequence[int]]): The departure minutes, per weekday.
+            stop_times (Sequence[int]): The seconds from the first stop of the
+                route to each stop.
+
+        Returns:
+            Timetable: The timetable.
+        """
+        timetable = cls.__new__(cls)
+        timetable.route_count = route_count
+        timetable.departure_offsets = tuple(departure_offsets)
+        timetable.departures = tuple(departures)
+        timetable.stop_times = stop_times
+        return timetable
+
+    def next_departure(self, route: int, weekday: int, second: int) -> Optional[int]:
+        """
+        Finds the first trip of a route leaving its first stop at or after a
+        moment, looking at most into the following day.
+
+        Args:
+            route (int): The route ID.
+            weekday (int): The weekday the moment is counted from, 0 being Monday.
+            second (int): The seconds after midnight of that weekday; it may be
+                negative or beyond the end of the day.
+
+        Returns:
+            Optional[int]: The departure, in seconds after midnight of `weekday`,
+                or None if the route does not leave before the end of the
+                following day.
+        """
+        day, minute = divmod(-(-second // 60), MINUTES_PER_DAY)
+        for ahead in (0, 1):
+            current = (weekday + day + ahead) % len(WEEKDAYS)
+            minutes = self.departures[current]
+            start = self.departure_offsets[current][route]
+            end = self.departure_offsets[current][route + 1]
+            index = bisect_left(minutes, minute if ahead == 0 else 0, start, end)
+            if index < end:
+                return ((day + ahead) * MINUTES_PER_DAY + minutes[index]) * 60
+        return None
@@ -0,0 +1,170 @@
+"""This module is used to score transfer candidates with NumPy 
+array operations.
+
+Author: Juan Esteban Bedoya <jebedoyal@udistrital.edu.co>
+
+This file is part of SmartCommute project.
+
+SmartCommute is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+SmartCommute is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
+"""
+
+from typing import List, Sequence, Tuple
+from services.travel.compact_network import CompactNetwork # pylint: disable=import-error
+
+try:
+    import numpy as np # pylint: disable=import-error
+except ImportError:
+    np = None
+
+# Below this many (first route, second route) pairs the plain loop is faster
+# than building the arrays.
+VECTORIZE_MIN_PAIRS = 128
+
+class NetworkArrays:
+    """
+    The transfer hub arrays of a network as NumPy arrays, with the key of
+    every pair of routes, `first * routes + second`, in ascending order so
+    the pairs of a search are found with a single sorted search.
+    """
+
+    def __init__(self, network: CompactNetwork):
+        """
+        Builds the arrays.
+
+        Args:
+            network (CompactNetwork): The network to describe.
+        """
+        self.network = network
+        self.routes = len(network.route_names)
+        route_offsets = np.frombuffer(network.hub_route_offsets, dtype=np.uint32)
+        first_routes = np.repeat(np.arange(self.routes, dtype=np.int64), np.diff(route_offsets))
+        self.pair_keys = first_routes * self.routes \
+            + np.frombuffer(network.hub_partners, dtype=np.uint32)
+        self.offsets = np.frombuffer(network.hub_offsets, dtype=np.uint32).astype(np.int64)
+        self.occurrences = np.frombuffer(network.hub_occurrences, dtype=np.uint32).astype(np.int64)
+        self.first_positions = np.frombuffer(network.hub_first_positions,
+                                             dtype=np.uint32).astype(np.int64)
+        self.second_positions = np.frombuffer(network.hub_second_positions,
+                                              dtype=np.uint32).astype(np.int64)
+        self.stop_offsets = np.frombuffer(network.stop_offsets, dtype=np.uint32).astype(np.int64)
+        self.stops = np.frombuffer(network.stops, dtype=np.uint32)
+
+    def join_transfers( # pylint: disable=too-many-locals
+        self,
+        origin_routes: Sequence[Tuple[int, int, int]],
+        destination_routes: Sequence[Tuple[int, int, int]],
+        limit: int
+    ) -> List[Tuple[int, int, int, int, int, int]]:
+        """
+        Joins every pair of an origin and a destination route through their
+        transfer hubs at once and keeps the best journeys, selected with
+        `argpartition` so only they are sorted.
+
+        Ties keep the order of the plain loop: first route, stop on the first
+        route, then second route.
+
+        Args:
+            origin_routes (Sequence[Tuple[int, int, int]]): The route ID, origin
+                position and bidirectional flag of each running origin route.
+            destination_routes (Sequence[Tuple[int, int, int]]): The route ID,
+                destination position and bidirectional flag of each running
+                destination route.
+            limit (int): The number of journeys to keep.
+
+        Returns:
+            List[Tuple[int, int, int, int, int, int]]: The fields of the best
+                transfer journeys, in the order of `TransferCandidate`.
+        """
+        if not origin_routes or not destination_routes:
+            return []
+        first = np.array(origin_routes, dtype=np.int64)
+        second = np.array(destination_routes, dtype=np.int64)
+        keys = (first[:, 0, None] * self.routes + second[None, :, 0]).ravel()
+        pairs = np.searchsorted(self.pair_keys, keys)
+        found = pairs < len(self.pair_keys)
+        found[found] = self.pair_keys[pairs[found]] == keys[found]
+        combinations = np.flatnonzero(found)
+        pairs = pairs[combinations]
+        counts = self.offsets[pairs + 1] - self.offsets[pairs]
+        total = int(counts.sum())
+        if total == 0:
+            return []
+
+        # Entries of every pair found, laid out pair after pair.
+        ends = np.cumsum(counts)
+        entries = np.arange(total) + np.repeat(self.offsets[pairs] - (ends - counts), counts)
+        combinations = np.repeat(combinations, counts)
+        rows, columns = np.divmod(combinations, len(second))
+        occurrences = self.occurrences[entries]
+        origin_positions = first[rows, 1]
+        transfer_positions = self.second_positions[entries]
+        destination_positions = second[columns, 1]
+        valid = (occurrences != origin_positions) \
+            & ((occurrences > origin_positions) | (first[rows, 2] != 0)) \
+            & ((transfer_positions < destination_positions) | (second[columns, 2] != 0))
+        entries, rows, columns = entries[valid], rows[valid], columns[valid]
+        if entries.size == 0:
+            return []
+        occurrences = occurrences[valid]
+        first_distances = np.abs(origin_positions[valid] - self.first_positions[entries])
+        second_distances = np.abs(transfer_positions[valid] - destination_positions[valid])
+        scores = first_distances + second_distances
+
+        order = self._best(scores, rows, occurrences, columns, len(first), len(second), limit)
+        first_routes = first[rows[order], 0]
+        return list(zip(
+            scores[order].tolist(), first_routes.tolist(),
+            self.stops[self.stop_offsets[first_routes] + occurrences[order]].tolist(),
+            second[columns[order], 0].tolist(),
+            first_distances[order].tolist(), second_distances[order].tolist()
+        ))
+
+    @staticmethod
+    def _best( # pylint: disable=too-many-arguments,too-many-positional-arguments
+        scores, rows, occurrences, columns, origin_count: int, destination_count: int,
+        limit: int
+    ):
+        """
+        Selects the best journeys by score, then origin route, stop on the
+        first route and destination route, as the plain loop orders them.
+
+        The four fields are packed into one key per journey, so the best
+        `limit` are found with `argpartition` and only those are sorted. A
+        pair of routes has one hub entry per stop of the first route, so the
+        keys are unique and the selection is the one of a full sort. Keys
+        that would not fit in 64 bits fall back to sorting every journey.
+
+        Args:
+            scores (np.ndarray): The score of each journey.
+            rows (np.ndarray): The index of its origin route.
+            occurrences (np.ndarray): The stop of its transfer on the first route.
+            columns (np.ndarray): The index of its destination route.
+            origin_count (int): The number of origin routes.
+            destination_count (int): The number of destination routes.
+            limit (int): The number of journeys to keep.
+
+        Returns:
+            np.ndarray: The indexes of the best journeys, best first.
+        """
+        occurrence_count = int(occurrences.max()) + 1
+        tie_count = origin_count * occurrence_count * destination_count
+        if (int(scores.max()) + 1) * tie_count >= 2 ** 63:
+            return np.lexsort((columns, occurrences, rows, scores))[:limit]
+        keys = ((scores * origin_count + rows) * occurrence_count + occurrences) \
+            * destination_count + columns
+        if len(keys) > limit:
+            top = np.argpartition(keys, limit - 1)[:limit]
+        else:
+            top = np.arange(len(keys))
+        return top[np.argsort(keys[top])]
@@ -19,8 +19,12 @@ You should have received a copy of the GNU General Public License
 along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
 """
 
-from typing import List, Dict, Any
-from services.travel.base_travel import RouteStrategy  # pylint: disable=import-error
+from itertools import chain
+from typing import List
+from services.travel.compact_network import CompactNetwork # pylint: disable=import-error
+from services.travel.route_processor import TransferCandidate # pylint: disable=import-error
+from services.travel.base_travel import RouteStrategy, TravelQuery  # pylint: disable=import-error
+from services.travel.selection import select_top # pylint: disable=import-error
 
 class MinimizeStationsStrategy(RouteStrategy):
     """
@@ -30,55 +34,32 @@ class MinimizeStationsStrategy(RouteStrategy):
 
     def select_routes(
         self,
-        direct_routes: List[str],
-        transfer_routes: List[Dict[str, Any]],
-        route_stations: Dict[str, List[str]],
-        origin: str,
-        destination: str
+        direct_routes: List[int],
+        transfer_routes: List[TransferCandidate],
+        network: CompactNetwork,
+        query: TravelQuery
     ) -> dict:
         """
         Select the optimal routes based on the least number of stations traveled.
         
         Args:
-            direct_routes (List[str]): List of direct routes.
-            transfer_routes (List[Dict[str, Any]]): List of transfer routes.
-            route_stations (Dict[str, List[str]]): Dictionary mapping routes to station lists.
-            origin (str): Origin station.
-            destination (str): Destination station.
+            direct_routes (List[int]): List of direct route IDs.
+            transfer_routes (List[TransferCandidate]): List of transfer journeys.
+            network (CompactNetwork): Network used to resolve names for the response.
+            query (TravelQuery): Origin and destination of the search.
         
         Returns:
-            dict: A dictionary containing the best routes based on the least stations traveled.
+            dict: A dictionary containing the `query.limit` routes with the least
+                stations traveled, direct routes first among ties.
         """
-        options = []
-
-        for route in direct_routes:
-            try:
-                distance = abs(route_stations[route].index(origin) 
-                               - route_stations[route].index(destination))
-            except Exception:
-                distance = float('inf')
-            options.append({
-                "route": route,
-                "type": "bidirectional" if route.strip().isdigit() else "unidirectional",
-                "transfers": 0,
-                "stations_traveled": distance,
-                "details": {
-                    "from": origin,
-                    "to": destination,
-                    "total_stations": len(route_stations[route])
-                }
-            })
-
-        for transfer in transfer_routes:
-            transfer_details = transfer["details"]
-            transfer_details["transfers"] = 1
-            options.append({
-                "route": f"{transfer_details['first_segment']['route']} + {transfer_details['second_segment']['route']}",
-                "type": f"{transfer_details['first_segment']['type']} + {transfer_details['second_segment']['type']}",
-                "transfers": 1,
-                "stations_traveled": transfer["score"],
-                "details": transfer_details
-            })
-
-        options.sort(key=lambda x: x["stations_traveled"])
-        return {"routes": options[:5]} if options else {"error": "No available routes found"}
+        candidates = chain(
+            ((distance, 0, route) for distance, route in
+             self.direct_candidates(direct_routes, network, query)),
+            ((transfer.score, 1, transfer) for transfer in transfer_routes)
+        )
+        options = [
+            self.direct_option(item, distance, network, query) if kind == 0
+            else self.transfer_option(item, network, query)
+            for distance, kind, item in select_top(candidates, query.limit, key=lambda x: x[0])
+        ]
+        return {"routes": options} if options else {"error": "No available routes found"}
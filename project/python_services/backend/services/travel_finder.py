@@ -18,12 +18,49 @@ You should have received a copy of the GNU General Public License
 along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
 """
 
+from datetime import datetime
+from threading import Lock, Thread
+from time import perf_counter
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from pydantic import BaseModel, Field
+from environment_variables import EnvironmentVariables  # pylint: disable=import-error
 from repositories.route import RouteRepository  # pylint: disable=import-error
 from repositories.station import StationRepository  # pylint: disable=import-error
 from .travel.direct_travel import MinimizeTransfersStrategy  # pylint: disable=import-error
 from .travel.transfer_travel import MinimizeStationsStrategy  # pylint: disable=import-error
+from .travel.multi_transfer_travel import MultiTransferStrategy  # pylint: disable=import-error
+from .travel.time_travel import MinimizeTimeStrategy  # pylint: disable=import-error
+from .travel.base_travel import TravelQuery  # pylint: disable=import-error
 from .travel.route_processor import RouteProcessor  # pylint: disable=import-error
 from .travel.data_preparer import DataPreparer  # pylint: disable=import-error
+from .travel.network_snapshot import NetworkSnapshot, SnapshotHolder  # pylint: disable=import-error
+from .travel.result_cache import ResultCache, LRUResultCache  # pylint: disable=import-error
+from .travel.pair_table import DEFAULT_MAX_STATIONS, PairTable  # pylint: disable=import-error
+from .travel.raptor import RaptorRouter  # pylint: disable=import-error
+from .travel.route_validator import RouteValidator  # pylint: disable=import-error
+from .travel.selection import DEFAULT_LIMIT, MAX_LIMIT  # pylint: disable=import-error
+from .travel.search_timings import SearchTimings  # pylint: disable=import-error
+
+MAX_BATCH_PAIRS = 1000
+
+class TravelPairDTO(BaseModel):
+    """
+    Represents a Data Transfer Object (DTO) for one search of a batch.
+    """
+
+    origin: str
+    destination: str
+    optimization: str = "min_stations"
+
+class TravelBatchDTO(BaseModel):
+    """
+    Represents a Data Transfer Object (DTO) for a batch of travel searches.
+    """
+
+    pairs: List[TravelPairDTO] = Field(..., min_length=1, max_length=MAX_BATCH_PAIRS)
+    max_transfers: int = Field(3, ge=0)
+    limit: int = Field(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT)
+    departure: Optional[datetime] = None
 
 class TravelFinder:
     """
@@ -31,25 +68,163 @@ class TravelFinder:
     based on the selected optimization strategy (e.g., minimizing stations or transfers).
     """
 
-    def __init__(self):
+    def __init__( # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        route_repo: RouteRepository,
+        station_repo: StationRepository,
+        result_cache: Optional[ResultCache] = None,
+        pair_table_path: Optional[str] = None,
+        pair_table_windows: int = 8,
+        snapshot_path: Optional[str] = None,
+        pair_table_max_stations: int = DEFAULT_MAX_STATIONS
+    ):
         """
         Initializes the TravelFinder with required repositories, data preparer, 
-        route processor, and strategies for optimization.
+        route processor, and strategies for optimization. The network snapshot
+        is built here once and shared by every request.
+
+        Args:
+            route_repo (RouteRepository): The shared route repository.
+            station_repo (StationRepository): The shared station repository.
+            result_cache (Optional[ResultCache]): Where search results are kept
+                for repeated queries. Results are not cached when omitted.
+            pair_table_path (Optional[str]): File with the precomputed journeys
+                of every station pair. When it is missing or outdated it is
+                built in a background thread and used once it is ready.
+                Nothing is precomputed when omitted.
+            pair_table_windows (int): The number of schedule windows precomputed.
+            snapshot_path (Optional[str]): File through which worker processes
+                share the network snapshot instead of each building its own.
+            pair_table_max_stations (int): The most listed stations a pair
+                table is built for.
         """
-        self.route_repo = RouteRepository()
-        self.station_repo = StationRepository()
+        self.result_cache = result_cache
+        self.snapshot_path = snapshot_path
+        self.pair_table_path = pair_table_path
+        self.pair_table_windows = pair_table_windows
+        self.pair_table_max_stations = pair_table_max_stations
+        # The thread building the pair table of the latest snapshot, if any.
+        self.pair_table_build: Optional[Thread] = None
+        self._pair_table_lock = Lock()
+        self.route_repo = route_repo
+        self.station_repo = station_repo
         self.data_preparer = DataPreparer(self.route_repo, self.station_repo)
+        self.snapshots = SnapshotHolder(self._attach_pairs(
+            self.data_preparer.build_snapshot(self.snapshot_path)
+        ))
         self.route_processor = RouteProcessor()
+        self.router = RaptorRouter()
         self.strategies = {
             "min_stations": MinimizeStationsStrategy(),
-            "min_transfers": MinimizeTransfersStrategy()
+            "min_transfers": MinimizeTransfersStrategy(),
+            "multi_transfer": MultiTransferStrategy(),
+            "min_time": MinimizeTimeStrategy()
         }
 
-    def find_routes(
+    @classmethod
+    def from_environment(
+        cls, route_repo: RouteRepository, station_repo: StationRepository
+    ) -> "TravelFinder":
+        """
+        Creates a travel finder configured by the environment variables: a
+        result cache when ROUTE_CACHE_SIZE is above 0, precomputed journeys
+        when PAIR_TABLE_PATH is set and a shared snapshot file when
+        SNAPSHOT_PATH is set.
+
+        Args:
+            route_repo (RouteRepository): The route repository.
+            station_repo (StationRepository): The station repository.
+
+        Returns:
+            TravelFinder: The configured travel finder.
+        """
+        env = EnvironmentVariables()
+        result_cache = None
+        if env.route_cache_size > 0:
+            result_cache = LRUResultCache(env.route_cache_size, env.route_cache_ttl)
+        return cls(route_repo, station_repo, result_cache,
+                   env.pair_table_path, env.pair_table_windows, env.snapshot_path,
+                   env.pair_table_max_stations)
+
+    def reload(
+        self,
+        route_repo: RouteRepository,
+        station_repo: StationRepository,
+        publish: Optional[Callable[[NetworkSnapshot], None]] = None
+    ) -> NetworkSnapshot:
+        """
+        Builds a snapshot from new repositories and swaps it in. If building
+        fails, the current data keeps being served. Requests already running
+        keep the snapshot they started with.
+
+        Args:
+            route_repo (RouteRepository): The new route repository.
+            station_repo (StationRepository): The new station repository.
+            publish (Optional[Callable[[NetworkSnapshot], None]]): Makes the new
+                snapshot current, together with anything published with it.
+                Defaults to swapping it into `snapshots`.
+
+        Returns:
+            NetworkSnapshot: The snapshot now being served.
+        """
+        data_preparer = DataPreparer(route_repo, station_repo)
+        snapshot = self._attach_pairs(data_preparer.build_snapshot(self.snapshot_path))
+        self.route_repo = route_repo
+        self.station_repo = station_repo
+        self.data_preparer = data_preparer
+        (publish or self.snapshots.swap)(snapshot)
+        if self.result_cache is not None:
+            self.result_cache.clear()
+        return snapshot
+
+    def _attach_pairs(self, snapshot: NetworkSnapshot) -> NetworkSnapshot:
+        """
+        Attaches the precomputed journeys to a snapshot that is not served yet
+        when the table file matches it. Otherwise the table is built in a
+        background thread, and the snapshot is searched without it until the
+        thread attaches it.
+
+        Args:
+            snapshot (NetworkSnapshot): The new snapshot.
+
+        Returns:
+            NetworkSnapshot: The same snapshot.
+        """
+        if not self.pair_table_path:
+            return snapshot
+        snapshot.pairs = PairTable.load(snapshot, self.pair_table_path, self.pair_table_windows)
+        if snapshot.pairs is None:
+            self.pair_table_build = Thread(target=self._build_pairs, args=(snapshot,),
+                                           name="pair-table", daemon=True)
+            self.pair_table_build.start()
+        return snapshot
+
+    def _build_pairs(self, snapshot: NetworkSnapshot):
+        """
+        Builds the pair table of a snapshot and attaches it. Builds run one at
+        a time, so the table of a reloaded snapshot is written last.
+
+        Args:
+            snapshot (NetworkSnapshot): The snapshot to precompute.
+        """
+        with self._pair_table_lock:
+            try:
+                snapshot.pairs = PairTable.load_or_build(
+                    snapshot, self.pair_table_path, self.pair_table_windows,
+                    self.pair_table_max_stations
+                )
+            except (OSError, ValueError) as e:
+                print(f"Pair table not built: {e}")
+
+    def find_routes( # pylint: disable=too-many-arguments,too-many-positional-arguments
         self,
         origin: str,
         destination: str,
-        optimization: str = "min_stations"
+        optimization: str = "min_stations",
+        max_transfers: int = 3,
+        departure: Optional[datetime] = None,
+        limit: int = DEFAULT_LIMIT,
+        timings: Optional[SearchTimings] = None
     ) -> dict:
         """
         Finds the optimal routes between the origin and destination based on 
@@ -58,26 +233,246 @@ class TravelFinder:
         Args:
             origin (str): The starting station.
             destination (str): The destination station.
-            optimization (str): The optimization strategy (e.g., "min_stations" or "min_transfers").
+            optimization (str): The optimization strategy (e.g., "min_stations",
+                "min_transfers", "multi_transfer" or "min_time").
+            max_transfers (int): The maximum number of transfers for strategies that
+                search journeys with several transfers.
+            departure (Optional[datetime]): The local departure time used to decide
+                which routes are running, and from which "min_time" follows the
+                departures. Defaults to now.
+            limit (int): The number of routes returned by "min_stations" and
+                "min_transfers".
+            timings (Optional[SearchTimings]): Where the duration of each stage
+                and the candidates examined are recorded. Nothing is measured
+                when omitted.
         
         Returns:
             dict: A dictionary containing the selected routes or an error message.
+                It may be shared with other requests through the result cache and
+                must not be modified.
+        """
+
+        if timings is not None:
+            timings.restart()
+        snapshot = self.snapshots.current()
+        departure = departure or datetime.now()
+        active_routes = snapshot.schedules.active_routes(departure)
+        return self._find(snapshot, active_routes, departure, origin, destination,
+                          optimization, max_transfers, limit, timings=timings)
+
+    def find_routes_batch( # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        pairs: Iterable[Tuple[str, str, str]],
+        max_transfers: int = 3,
+        departure: Optional[datetime] = None,
+        limit: int = DEFAULT_LIMIT,
+        timed: bool = False
+    ) -> Iterator[Tuple[dict, Optional[SearchTimings]]]:
         """
+        Finds the routes of many origin and destination pairs. Every pair is
+        searched on the same snapshot and at the same departure time, so the
+        running routes of each origin and destination are listed once for
+        the whole batch.
 
-        stations_data, schedules, route_stations = self.data_preparer.prepare_data()
+        Args:
+            pairs (Iterable[Tuple[str, str, str]]): The origin, destination and
+                optimization of each search.
+            max_transfers (int): The maximum number of transfers for strategies that
+                search journeys with several transfers.
+            departure (Optional[datetime]): The local departure time used to decide
+                which routes are running, and from which "min_time" follows the
+                departures. Defaults to now.
+            limit (int): The number of routes returned by "min_stations" and
+                "min_transfers".
+            timed (bool): Whether the stages of each search are timed.
+
+        Yields:
+            Tuple[dict, Optional[SearchTimings]]: The result of each pair, in the
+                order given, as `find_routes` returns it, and, if timed, the
+                timings of its search.
+        """
+        snapshot = self.snapshots.current()
+        departure = departure or datetime.now()
+        active_routes = snapshot.schedules.active_routes(departure)
+        # The running routes of each station, listed once for the whole batch.
+        running: Dict[int, List[Tuple[int, int, int]]] = {}
+        for origin, destination, optimization in pairs:
+            start = perf_counter()
+            timings = SearchTimings() if timed else None
+            result = self._find(snapshot, active_routes, departure, origin, destination,
+                                optimization, max_transfers, limit, timings=timings,
+                                running=running)
+            if timings is not None:
+                timings.record("total", perf_counter() - start)
+            yield result, timings
 
-        if origin not in stations_data or destination not in stations_data:
+    def find_reachable( # pylint: disable=too-many-locals
+        self,
+        origin: str,
+        max_stations: Optional[int] = None,
+        max_transfers: int = 1,
+        departure: Optional[datetime] = None
+    ) -> dict:
+        """
+        Finds every station reachable from the origin in a single search.
+
+        Args:
+            origin (str): The starting station.
+            max_stations (Optional[int]): The maximum number of stations traveled,
+                or None for no limit.
+            max_transfers (int): The maximum number of transfers.
+            departure (Optional[datetime]): The local departure time used to decide
+                which routes are running. Defaults to now.
+
+        Returns:
+            dict: The origin and, under "reachable", one entry per station with the
+                fewest stations traveled, the transfers it takes, and every other
+                trade-off with fewer transfers under "options"; or an error message.
+                It may be shared through the result cache and must not be modified.
+        """
+        snapshot = self.snapshots.current()
+        network = snapshot.network
+        origin_id = network.find_station(origin)
+        if origin_id is None:
             return {"error": "Station not found"}
 
-        common_routes = stations_data[origin].intersection(stations_data[destination])
+        active_routes = snapshot.schedules.active_routes(departure or datetime.now())
+        cache_key = (snapshot.version, origin_id, "reachable", max_stations, max_transfers,
+                     active_routes)
+        if self.result_cache is not None:
+            cached = self.result_cache.get(cache_key)
+            if cached is not None:
+                return cached
 
-        direct_routes = self.route_processor.process_direct_routes(
-            origin, destination, common_routes, schedules, route_stations
+        reached = self.router.reach(
+            network, origin_id,
+            lambda route: RouteValidator.check_route_availability(active_routes, route),
+            max_transfers, max_stations
         )
-        transfer_routes = self.route_processor.process_transfers(
-            origin, destination, stations_data[origin], stations_data, schedules, route_stations
+        reachable = []
+        for station, options in reached.items():
+            if station >= network.listed_stations:
+                continue
+            fastest = options[-1]
+            reachable.append({
+                "station": network.station_names[station],
+                "stations": fastest.stations,
+                "transfers": fastest.transfers,
+                "options": [option._asdict() for option in options]
+            })
+        reachable.sort(key=lambda x: (x["stations"], x["transfers"], x["station"]))
+        result = {
+            "origin": network.station_names[origin_id],
+            "max_stations": max_stations,
+            "max_transfers": max_transfers,
+            "reachable": reachable
+        }
+
+        if self.result_cache is not None:
+            self.result_cache.set(cache_key, result)
+        return result
+
+    def _find( # pylint: disable=too-many-arguments,too-many-positional-arguments,too-many-locals
+        self,
+        snapshot: NetworkSnapshot,
+        active_routes: Sequence[int],
+        departure: datetime,
+        origin: str,
+        destination: str,
+        optimization: str,
+        max_transfers: int,
+        limit: int,
+        timings: Optional[SearchTimings] = None,
+        running: Optional[Dict[int, List[Tuple[int, int, int]]]] = None
+    ) -> dict:
+        """
+        Runs a search on a given snapshot.
+
+        Args:
+            snapshot (NetworkSnapshot): The snapshot to search.
+            active_routes (Sequence[int]): The mask of routes running at departure.
+            departure (datetime): The local departure time.
+            origin (str): The starting station.
+            destination (str): The destination station.
+            optimization (str): The optimization strategy.
+            max_transfers (int): The maximum number of transfers.
+            limit (int): The number of routes returned by candidate strategies.
+            timings (Optional[SearchTimings]): Where the stages of the search
+                are timed, if at all.
+            running (Optional[Dict[int, List[Tuple[int, int, int]]]]): The running
+                routes of the stations searched before with the same snapshot
+                and running routes, shared by the pairs of a batch.
+
+        Returns:
+            dict: A dictionary containing the selected routes or an error message.
+        """
+        network = snapshot.network
+        origin_id = network.find_station(origin)
+        destination_id = network.find_station(destination)
+        if origin_id is None or destination_id is None:
+            return {"error": "Station not found"}
+
+        if optimization not in self.strategies:
+            optimization = "min_stations"
+        strategy = self.strategies[optimization]
+
+        # The set of running routes stands for the time of the query, so every
+        # minute with the same routes running shares the entry, and an entry is
+        # no longer found once the schedule window changes. Time-dependent
+        # strategies search from the departure minute, which the entry keeps.
+        if strategy.time_dependent:
+            departure = departure.replace(second=0, microsecond=0)
+        cache_key = (
+            snapshot.version, origin_id, destination_id, optimization,
+            max_transfers if not strategy.uses_candidates else None,
+            limit if strategy.uses_candidates else None,
+            departure if strategy.time_dependent else active_routes
         )
+        if timings is not None:
+            timings.lap("prepare")
+        if self.result_cache is not None:
+            cached = self.result_cache.get(cache_key)
+            if timings is not None:
+                timings.lap("cache")
+            if cached is not None:
+                if timings is not None:
+                    timings.count("cache_hits", 1)
+                return cached
+
+        query = TravelQuery(origin_id, destination_id, active_routes, max_transfers, limit,
+                            departure, snapshot.timetable)
+        if strategy.uses_candidates:
+            precomputed = None
+            # The table keeps the best DEFAULT_LIMIT transfers of each pair.
+            if snapshot.pairs is not None and limit <= DEFAULT_LIMIT:
+                precomputed = snapshot.pairs.lookup(active_routes, origin_id, destination_id)
+                if timings is not None:
+                    timings.lap("precomputed")
+            if precomputed is not None:
+                direct_routes, transfer_routes = precomputed
+            else:
+                direct_routes = self.route_processor.process_direct_routes(
+                    origin_id, destination_id, network, active_routes
+                )
+                if timings is not None:
+                    timings.lap("direct")
+                transfer_routes = self.route_processor.process_transfers(
+                    origin_id, destination_id, network, active_routes, limit, timings,
+                    running
+                )
+                if timings is not None:
+                    timings.lap("transfers")
+            if timings is not None:
+                timings.count("direct_routes", len(direct_routes))
+                timings.count("transfer_journeys", len(transfer_routes))
+            result = strategy.select_routes(direct_routes, transfer_routes, network, query)
+        else:
+            result = strategy.select_routes([], [], network, query)
+        if timings is not None:
+            timings.lap("select")
 
-        strategy = self.strategies.get(optimization, MinimizeStationsStrategy())
-        return strategy.select_routes(direct_routes, transfer_routes,
-                                      route_stations, origin, destination)
+        if self.result_cache is not None:
+            self.result_cache.set(cache_key, result)
+            if timings is not None:
+                timings.lap("cache")
+        return result
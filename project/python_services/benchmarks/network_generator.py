@@ -0,0 +1,150 @@
+"""This module generates synthetic Transmilenio-like networks for 
+benchmarking the travel planner.
+
+Author: Juan Esteban Bedoya <jebedoyal@udistrital.edu.co>
+
+This file is part of SmartCommute project.
+
+SmartCommute is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+SmartCommute is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
+"""
+
+import json
+import os
+import random
+from itertools import accumulate
+from typing import Dict, List, NamedTuple, Tuple
+
+DAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+class NetworkSpec(NamedTuple):
+    """Parameters of a synthetic network. The defaults match the sample data."""
+    stations: int = 150
+    routes: int = 120
+    min_stops: int = 8
+    max_stops: int = 30
+    bidirectional_share: float = 0.3
+    hub_share: float = 0.05
+    hub_weight: float = 8.0
+    seed: int = 0
+
+    def scaled(self, factor: float) -> "NetworkSpec":
+        """
+        Multiplies the number of stations and routes.
+
+        Args:
+            factor (float): The scale factor.
+
+        Returns:
+            NetworkSpec: The scaled parameters.
+        """
+        # The stations and routes are the first two fields.
+        return NetworkSpec(max(2, round(self.stations * factor)),
+                           max(1, round(self.routes * factor)), *self[2:])
+
+
+def _schedule(rng: random.Random) -> List[Dict[str, str]]:
+    """
+    Draws the schedule of a route: all day, peak hours only or overnight.
+
+    Args:
+        rng (random.Random): The random generator.
+
+    Returns:
+        List[Dict[str, str]]: The schedule entries.
+    """
+    kind = rng.random()
+    days = DAYS if rng.random() < 0.6 else DAYS[:6]
+    if kind < 0.7:
+        return [{"day": day, "start_time": "04:30" if day in DAYS[:5] else "05:30",
+                 "end_time": "23:00" if day in DAYS[:5] else "22:00"} for day in days]
+    if kind < 0.9:
+        return [entry for day in DAYS[:5] for entry in (
+            {"day": day, "start_time": "05:00", "end_time": "09:00"},
+            {"day": day, "start_time": "16:00", "end_time": "20:00"}
+        )]
+    return [{"day": day, "start_time": "22:00", "end_time": "04:00"} for day in days]
+
+
+# pylint: disable-next=too-many-locals
+def generate_network(spec: NetworkSpec = NetworkSpec()) -> Tuple[dict, dict]:
+    """
+    Generates routes and stations in the schema of the data files. The same
+    parameters always produce the same network.
+
+    Hub stations are picked as stops `hub_weight` times more often than the
+    others, so transfers concentrate on them as they do at portals. The IDs
+    of bidirectional routes are numeric, as `RouteValidator` expects.
+    Headways and run times are drawn from a separate generator, so the
+    stations and schedules are the same as without them.
+
+    Args:
+        spec (NetworkSpec): The parameters of the network.
+
+    Returns:
+        Tuple[dict, dict]: The contents of the routes and stations files.
+    """
+    rng = random.Random(spec.seed)
+    timing = random.Random(spec.seed + 1)
+    names = [f"Estación {number:05d}" for number in range(spec.stations)]
+    hubs = set(rng.sample(range(spec.stations), round(spec.stations * spec.hub_share)))
+    population = range(spec.stations)
+    cumulative = list(accumulate(spec.hub_weight if station in hubs else 1.0
+                                 for station in population))
+    serving: List[List[str]] = [[] for _ in range(spec.stations)]
+
+    routes = []
+    for number in range(spec.routes):
+        if rng.random() < spec.bidirectional_share:
+            route_id = str(number + 1)
+        else:
+            route_id = f"{chr(ord('A') + number % 26)}{number + 1}"
+        length = min(spec.stations, rng.randint(spec.min_stops, spec.max_stops))
+        stops: Dict[int, None] = {}
+        while len(stops) < length:
+            stops[rng.choices(population, cum_weights=cumulative)[0]] = None
+        for station in stops:
+            serving[station].append(route_id)
+        headway = timing.choice((3, 5, 8, 10, 15, 20))
+        routes.append({
+            "id": route_id,
+            "name": f"Ruta {route_id}",
+            "schedule": [{**entry, "headway": headway} for entry in _schedule(rng)],
+            "stations": [names[station] for station in stops],
+            "run_times": [timing.randint(2, 8) / 2 for _ in range(len(stops) - 1)]
+        })
+
+    stations = [
+        {"id": str(station + 1), "name": name, "routes": sorted(serving[station])}
+        for station, name in enumerate(names)
+    ]
+    return {"routes": routes}, {"stations": stations}
+
+
+def write_network(directory: str, spec: NetworkSpec = NetworkSpec()) -> Tuple[str, str]:
+    """
+    Generates a network and writes its routes and stations files.
+
+    Args:
+        directory (str): The directory to write the files to.
+        spec (NetworkSpec): The parameters of the network.
+
+    Returns:
+        Tuple[str, str]: The paths of the routes and stations files.
+    """
+    routes, stations = generate_network(spec)
+    paths = (os.path.join(directory, "routes.json"), os.path.join(directory, "stations.json"))
+    for path, data in zip(paths, (routes, stations)):
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(data, file, ensure_ascii=False)
+    return paths
@@ -0,0 +1,451 @@
+"""This module benchmarks the travel planner on a synthetic network 
+and writes the results as JSON.
+
+Usage, from the python_services directory:
+
+    python -m benchmarks.run [--scale 10] [--output results.json]
+                             [--baseline previous.json]
+
+Every benchmark reports the distribution of its call times. With
+--baseline, the median of each benchmark is compared with a previous run
+and the exit status is 1 if any got slower than --threshold.
+
+Author: Juan Esteban Bedoya <jebedoyal@udistrital.edu.co>
+
+This file is part of SmartCommute project.
+
+SmartCommute is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+SmartCommute is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from time import perf_counter, perf_counter_ns
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from benchmarks.network_generator import NetworkSpec, write_network
+
+BACKEND = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend")
+# A Monday morning, so the same routes run on every run.
+DEPARTURE = datetime(2025, 3, 3, 8, 0)
+OPTIMIZATIONS = ("min_stations", "min_transfers", "multi_transfer", "min_time")
+
+def measure(function: Callable, arguments: Sequence[tuple], repeat: int = 1) -> Dict[str, Any]:
+    """
+    Times every call of a function.
+
+    Args:
+        function (Callable): The function to time.
+        arguments (Sequence[tuple]): The arguments of each call.
+        repeat (int): How many times the calls are repeated.
+
+    Returns:
+        Dict[str, Any]: The number of calls and their total, mean, median,
+            95th percentile, minimum and maximum times.
+    """
+    samples = []
+    for _ in range(repeat):
+        for args in arguments:
+            start = perf_counter_ns()
+            function(*args)
+            samples.append(perf_counter_ns() - start)
+    return summarize(samples)
+
+
+def summarize(samples: List[int]) -> Dict[str, Any]:
+    """
+    Describes a list of call times.
+
+    Args:
+        samples (List[int]): The call times, in nanoseconds.
+
+    Returns:
+        Dict[str, Any]: The statistics, with times in microseconds.
+    """
+    samples = sorted(samples)
+    count = len(samples)
+    return {
+        "calls": count,
+        "total_ms": round(sum(samples) / 1e6, 3),
+        "mean_us": round(sum(samples) / count / 1e3, 3),
+        "median_us": round(samples[count // 2] / 1e3, 3),
+        "p95_us": round(samples[min(count - 1, int(count * 0.95))] / 1e3, 3),
+        "min_us": round(samples[0] / 1e3, 3),
+        "max_us": round(samples[-1] / 1e3, 3)
+    }
+
+
+def sample_pairs(names: Sequence[str], count: int, seed: int) -> List[Tuple[str, str]]:
+    """
+    Draws distinct origin and destination pairs.
+
+    Args:
+        names (Sequence[str]): The station names.
+        count (int): The number of pairs.
+        seed (int): The seed of the draw.
+
+    Returns:
+        List[Tuple[str, str]]: The pairs.
+    """
+    rng = random.Random(seed)
+    return [tuple(rng.sample(names, 2)) for _ in range(count)]
+
+
+# pylint: disable-next=too-many-locals
+def micro_benchmarks(pairs: List[Tuple[str, str]], repeat: int, seed: int) -> Dict[str, Any]:
+    """
+    Times data preparation, the route processor and every strategy on the
+    data files the environment points to.
+
+    Transfers are also searched between the stations served by the most
+    routes, and with the per-stop scan the transfer hub join replaced, to
+    compare both where transfers are most expensive.
+
+    Args:
+        pairs (List[Tuple[str, str]]): The searches to run.
+        repeat (int): How many times data preparation is repeated.
+        seed (int): The seed of the draw of hub pairs.
+
+    Returns:
+        Dict[str, Any]: The statistics of each benchmark.
+    """
+    # pylint: disable=import-error,import-outside-toplevel
+    from repositories.route import RouteRepository
+    from repositories.station import StationRepository
+    from services.travel.base_travel import TravelQuery
+    from services.travel.data_preparer import DataPreparer
+    from services.travel.route_processor import RouteProcessor
+    from services.travel.direct_travel import MinimizeTransfersStrategy
+    from services.travel.transfer_travel import MinimizeStationsStrategy
+    from services.travel.multi_transfer_travel import MultiTransferStrategy
+    from services.travel.time_travel import MinimizeTimeStrategy
+    from benchmarks.transfer_scan import scan_transfers
+
+    results: Dict[str, Any] = {}
+    results["load_repositories"] = measure(
+        lambda: (RouteRepository(), StationRepository()), [()], repeat)
+    data_preparer = DataPreparer(RouteRepository(), StationRepository())
+    results["prepare_data"] = measure(data_preparer.prepare_data, [()], repeat)
+    results["build_snapshot"] = measure(data_preparer.build_snapshot, [()], repeat)
+
+    snapshot = data_preparer.build_snapshot()
+    network = snapshot.network
+    active_routes = snapshot.schedules.active_routes(DEPARTURE)
+    ids = [(network.find_station(origin), network.find_station(destination))
+           for origin, destination in pairs]
+    processor = RouteProcessor()
+    arguments = [(origin, destination, network, active_routes) for origin, destination in ids]
+    results["process_direct_routes"] = measure(processor.process_direct_routes, arguments)
+    results["process_transfers"] = measure(processor.process_transfers, arguments)
+    results["scan_transfers"] = measure(scan_transfers, arguments)
+
+    # The busiest 5% of the stations, where the most routes meet.
+    hubs = sorted(range(network.listed_stations),
+                  key=lambda station: (-len(network.routes_at(station)), station))
+    hubs = hubs[:max(2, len(hubs) // 20)]
+    hub_arguments = [(origin, destination, network, active_routes)
+                     for origin, destination in sample_pairs(hubs, len(pairs), seed)]
+    results["process_transfers.hub_pairs"] = measure(processor.process_transfers, hub_arguments)
+    results["scan_transfers.hub_pairs"] = measure(scan_transfers, hub_arguments)
+
+    strategies = {
+        "min_stations": MinimizeStationsStrategy(),
+        "min_transfers": MinimizeTransfersStrategy(),
+        "multi_transfer": MultiTransferStrategy(),
+        "min_time": MinimizeTimeStrategy()
+    }
+    for name, strategy in strategies.items():
+        arguments = []
+        for origin, destination in ids:
+            query = TravelQuery(origin, destination, active_routes, 3,
+                                departure=DEPARTURE, timetable=snapshot.timetable)
+            if strategy.uses_candidates:
+                arguments.append((
+                    processor.process_direct_routes(origin, destination, network, active_routes),
+                    processor.process_transfers(origin, destination, network, active_routes),
+                    network, query
+                ))
+            else:
+                arguments.append(([], [], network, query))
+        results[f"strategy.{name}"] = measure(strategy.select_routes, arguments)
+    return results
+
+
+def load_scenario(pairs: List[Tuple[str, str]], concurrency: int) -> Dict[str, Any]:
+    """
+    Sends /route/find requests to the FastAPI app through a local test
+    client, cycling through the optimizations.
+
+    Args:
+        pairs (List[Tuple[str, str]]): The searches to run.
+        concurrency (int): The number of clients sending requests at once.
+
+    Returns:
+        Dict[str, Any]: The statistics of the requests of each optimization
+            and of the whole scenario, with the throughput and status codes.
+    """
+    # pylint: disable=import-error,import-outside-toplevel
+    from fastapi.testclient import TestClient
+    from main import app
+
+    requests = [
+        {"origin": origin, "destination": destination, "optimization": optimization,
+         "departure": DEPARTURE.isoformat()}
+        for origin, destination in pairs for optimization in OPTIMIZATIONS
+    ]
+    with TestClient(app) as client:
+        def send(params: Dict[str, str]) -> Tuple[str, int, int]:
+            start = perf_counter_ns()
+            response = client.get("/route/find", params=params)
+            return params["optimization"], response.status_code, perf_counter_ns() - start
+
+        start = perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            responses = list(executor.map(send, requests))
+        elapsed = perf_counter() - start
+
+    results: Dict[str, Any] = {}
+    for optimization in OPTIMIZATIONS:
+        results[f"endpoint.route_find.{optimization}"] = summarize(
+            [duration for name, _, duration in responses if name == optimization])
+    scenario = summarize([duration for *_, duration in responses])
+    scenario["concurrency"] = concurrency
+    scenario["requests_per_second"] = round(len(responses) / elapsed, 1)
+    scenario["status_codes"] = {}
+    for _, status, _ in responses:
+        scenario["status_codes"][str(status)] = scenario["status_codes"].get(str(status), 0) + 1
+    results["endpoint.route_find"] = scenario
+    return results
+
+
+# Loads the data files in a fresh process, then builds the network
+# snapshot, and prints the memory used by each step. Peaks are the process
+# high-water mark; steady RSS is measured after each step with its data
+# still referenced.
+MEMORY_SCRIPT = """
+import gc, json, resource, sys, time
+from repositories.data_store import DataStore
+from repositories.route import RouteRepository
+from repositories.station import StationRepository
+from services.travel.data_preparer import DataPreparer
+
+def rss_kb():
+    try:
+        with open("/proc/self/statm", encoding="utf-8") as statm:
+            return int(statm.read().split()[1]) * resource.getpagesize() // 1024
+    except OSError:
+        return None
+
+def peak_kb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+results = {"baseline_rss_kb": rss_kb()}
+stream_min_bytes = int(sys.argv[1])
+start = time.perf_counter()
+routes = RouteRepository(stream_min_bytes=stream_min_bytes)
+stations = StationRepository(stream_min_bytes=stream_min_bytes)
+results["load_ms"] = round((time.perf_counter() - start) * 1e3, 3)
+gc.collect()
+results.update(peak_rss_kb=peak_kb(), steady_rss_kb=rss_kb())
+start = time.perf_counter()
+snapshot = DataPreparer(routes, stations).build_snapshot()
+results["snapshot_ms"] = round((time.perf_counter() - start) * 1e3, 3)
+gc.collect()
+results.update(snapshot_peak_rss_kb=peak_kb(), snapshot_steady_rss_kb=rss_kb())
+start = time.perf_counter()
+store = DataStore(routes, stations)
+store.snapshot = snapshot
+store.warm()
+results["warm_ms"] = round((time.perf_counter() - start) * 1e3, 3)
+gc.collect()
+results.update(warm_peak_rss_kb=peak_kb(), warm_steady_rss_kb=rss_kb())
+print(json.dumps(results))
+"""
+
+def memory_scenario() -> Dict[str, Any]:
+    """
+    Measures the memory used to load the data files the environment points
+    to, build the network snapshot and warm the data store as the server
+    does, parsing the files whole and reading them one record at a time.
+    Each load runs in a fresh process, so its peak RSS is not hidden by
+    earlier allocations, and the RSS after warming is that of a serving
+    process.
+
+    Returns:
+        Dict[str, Any]: For each way of reading, the RSS before loading and
+            the time, peak RSS and steady RSS of the load, of the snapshot
+            built after it and of the warmed store.
+    """
+    results: Dict[str, Any] = {}
+    for name, stream_min_bytes in (("parsed", 0), ("streamed", 1)):
+        output = subprocess.run(
+            [sys.executable, "-c", MEMORY_SCRIPT, str(stream_min_bytes)],
+            cwd=BACKEND, check=True, capture_output=True, text=True
+        ).stdout
+        results[f"memory.load.{name}"] = json.loads(output.splitlines()[-1])
+    return results
+
+
+def compare(
+    results: Dict[str, Any], baseline: Dict[str, Any], threshold: float
+) -> Iterable[Tuple[str, float, bool]]:
+    """
+    Compares the median times of two runs.
+
+    Args:
+        results (Dict[str, Any]): The benchmarks of this run.
+        baseline (Dict[str, Any]): The benchmarks of the previous run.
+        threshold (float): The ratio above which a benchmark is a regression.
+
+    Yields:
+        Tuple[str, float, bool]: The name of each benchmark present in both
+            runs, the ratio of its medians and whether it regressed.
+    """
+    for name, stats in results.items():
+        previous = baseline.get(name)
+        if previous is None or not previous.get("median_us"):
+            continue
+        ratio = stats["median_us"] / previous["median_us"]
+        yield name, ratio, ratio > threshold
+
+
+def _git_commit() -> Optional[str]:
+    """
+    Identifies the commit being benchmarked.
+
+    Returns:
+        Optional[str]: The commit hash, or None outside a git checkout.
+    """
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=BACKEND, check=True,
+                              capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv: Optional[List[str]] = None) -> int: # pylint: disable=too-many-locals
+    """
+    Runs the benchmarks from the command line.
+
+    Args:
+        argv (Optional[List[str]]): The arguments. Defaults to `sys.argv`.
+
+    Returns:
+        int: The exit status.
+    """
+    defaults = NetworkSpec()
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run",
+                                     description="Benchmark the travel planner.")
+    parser.add_argument("--scale", type=float, default=10.0,
+                        help="size of the network relative to the sample data (default: 10)")
+    parser.add_argument("--stations", type=int, help="number of stations, overrides --scale")
+    parser.add_argument("--routes", type=int, help="number of routes, overrides --scale")
+    parser.add_argument("--min-stops", type=int, default=defaults.min_stops)
+    parser.add_argument("--max-stops", type=int, default=defaults.max_stops)
+    parser.add_argument("--bidirectional-share", type=float, default=defaults.bidirectional_share)
+    parser.add_argument("--hub-share", type=float, default=defaults.hub_share,
+                        help="share of stations that are transfer hubs")
+    parser.add_argument("--hub-weight", type=float, default=defaults.hub_weight,
+                        help="how much more often hubs are picked as stops")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--pairs", type=int, default=200,
+                        help="number of origin and destination pairs searched")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="repetitions of the data loading benchmarks")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="clients sending requests at once in the load scenario")
+    parser.add_argument("--skip-endpoint", action="store_true",
+                        help="skip the load scenario against the FastAPI app")
+    parser.add_argument("--skip-memory", action="store_true",
+                        help="skip measuring the memory used to load the data files")
+    parser.add_argument("--output", help="file to write the results to (default: stdout)")
+    parser.add_argument("--baseline", help="results of a previous run to compare with")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="median ratio above which a benchmark regressed (default: 1.2)")
+    args = parser.parse_args(argv)
+
+    spec = defaults.scaled(args.scale)._replace(
+        min_stops=args.min_stops, max_stops=args.max_stops,
+        bidirectional_share=args.bidirectional_share, hub_share=args.hub_share,
+        hub_weight=args.hub_weight, seed=args.seed
+    )
+    spec = spec._replace(stations=args.stations or spec.stations,
+                         routes=args.routes or spec.routes)
+
+    with tempfile.TemporaryDirectory() as directory:
+        routes_path, stations_path = write_network(directory, spec)
+        # Read when the repositories and the travel finder are created.
+        os.environ.update({
+            "PATH_ROUTES_DATA": routes_path, "PATH_STATIONS_DATA": stations_path,
+            "ROUTE_CACHE_SIZE": "0", "ROUTING_WORKERS": "0"
+        })
+        for name in ("PAIR_TABLE_PATH", "SNAPSHOT_PATH", "RELOAD_WATCH_INTERVAL"):
+            os.environ.pop(name, None)
+        sys.path.insert(0, BACKEND)
+
+        with open(stations_path, encoding="utf-8") as file:
+            names = [station["name"] for station in json.load(file)["stations"]]
+        pairs = sample_pairs(names, args.pairs, args.seed + 1)
+        benchmarks = micro_benchmarks(pairs, args.repeat, args.seed + 2)
+        if not args.skip_endpoint:
+            benchmarks.update(load_scenario(pairs, args.concurrency))
+        if not args.skip_memory:
+            benchmarks.update(memory_scenario())
+
+    try:
+        import numpy # pylint: disable=import-outside-toplevel
+        numpy_version = numpy.__version__
+    except ImportError:
+        numpy_version = None
+    results = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": numpy_version,
+            "network": spec._asdict(),
+            "pairs": args.pairs,
+            "departure": DEPARTURE.isoformat()
+        },
+        "benchmarks": benchmarks
+    }
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)["benchmarks"]
+        regressed = False
+        for name, ratio, slower in compare(benchmarks, baseline, args.threshold):
+            regressed |= slower
+            print(f"{name:40} {ratio:6.2f}x{'  REGRESSION' if slower else ''}",
+                  file=sys.stderr)
+        return 1 if regressed else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""This module keeps the per-stop transfer scan that the transfer hub 
+join replaced, as a reference for benchmarking the join.
+
+Author: Juan Esteban Bedoya <jebedoyal@udistrital.edu.co>
+
+This file is part of SmartCommute project.
+
+SmartCommute is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+SmartCommute is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
+"""
+
+from typing import List, Sequence
+
+# pylint: disable=import-error
+from services.travel.compact_network import CompactNetwork
+from services.travel.route_processor import TransferCandidate
+from services.travel.route_validator import RouteValidator
+from services.travel.selection import select_top, DEFAULT_LIMIT
+
+def scan_transfers(
+    origin: int,
+    destination: int,
+    network: CompactNetwork,
+    active_routes: Sequence[int],
+    limit: int = DEFAULT_LIMIT
+) -> List[TransferCandidate]:
+    """
+    Finds the best one-transfer journeys by walking every stop reachable
+    from the origin and checking each running route at the destination.
+    It returns the same journeys as `RouteProcessor.process_transfers`.
+
+    Args:
+        origin (int): The origin station ID.
+        destination (int): The destination station ID.
+        network (CompactNetwork): The compact network to search.
+        active_routes (Sequence[int]): The mask of routes running at the moment
+            of the query, one entry per route ID.
+        limit (int): The number of journeys to return.
+
+    Returns:
+        List[TransferCandidate]: The `limit` transfer journeys with the fewest
+            stations traveled.
+    """
+    positions = network.positions
+    bidirectional = network.bidirectional
+    destination_routes = [
+        route for route in network.routes_at(destination)
+        if RouteValidator.check_route_availability(active_routes, route)
+    ]
+    shared_routes = {}
+
+    def candidates():
+        for first_route in network.routes_at(origin):
+            first_positions = positions[first_route]
+            if not RouteValidator.check_route_availability(active_routes, first_route) \
+                    or origin not in first_positions:
+                continue
+            origin_index = first_positions[origin]
+            route_stops = network.route_stops(first_route).tolist()
+            reachable = route_stops[:origin_index] + route_stops[origin_index + 1:] \
+                if bidirectional[first_route] else route_stops[origin_index + 1:]
+
+            for transfer_station in reachable:
+                first_distance = abs(origin_index - first_positions[transfer_station])
+                if transfer_station not in shared_routes:
+                    station_routes = set(network.routes_at(transfer_station))
+                    shared_routes[transfer_station] = [
+                        route for route in destination_routes if route in station_routes
+                    ]
+                for second_route in shared_routes[transfer_station]:
+                    second_positions = positions[second_route]
+                    if RouteValidator.validate_direction(transfer_station, destination,
+                                                         second_positions,
+                                                         bidirectional[second_route]):
+                        second_distance = abs(second_positions[transfer_station]
+                                              - second_positions[destination])
+                        yield TransferCandidate(
+                            first_distance + second_distance, first_route, transfer_station,
+                            second_route, first_distance, second_distance
+                        )
+
+    return select_top(candidates(), limit, key=lambda x: x.score)
@@ -0,0 +1,129 @@
+"""This module defines the fixtures shared by the SmartCommute
+tests.
+
+Author: Juan Esteban Bedoya <jebedoyal@udistrital.edu.co>
+
+This file is part of SmartCommute project.
+
+SmartCommute is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+SmartCommute is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
+"""
+
+import json
+import os
+import shutil
+from typing import Iterator, Tuple
+import pytest
+from fastapi.testclient import TestClient
+from controllers import dependencies # pylint: disable=import-error
+from main import app # pylint: disable=import-error
+from repositories.data_store import set_data_store # pylint: disable=import-error
+from repositories.route import RouteRepository # pylint: disable=import-error
+from repositories.station import StationRepository # pylint: disable=import-error
+from services.travel.data_preparer import DataPreparer # pylint: disable=import-error
+from services.travel.network_snapshot import NetworkSnapshot # pylint: disable=import-error
+from benchmarks.network_generator import NetworkSpec, write_network
+
+# pylint: disable=redefined-outer-name
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+ADMIN_TOKEN = "test-admin-token"
+
+# A synthetic network small enough to be searched exhaustively.
+SMALL_NETWORK = NetworkSpec(stations=60, routes=20, min_stops=5, max_stops=12, seed=3)
+
+def remove_stop(routes_path: str, route: int, station: str):
+    """
+    Rewrites a routes file without one stop of a route.
+
+    Args:
+        routes_path (str): The path of the routes file.
+        route (int): The position of the route in the file.
+        station (str): The name of the station to remove.
+    """
+    with open(routes_path, encoding="utf-8") as routes_file:
+        data = json.load(routes_file)
+    data["routes"][route]["stations"].remove(station)
+    with open(routes_path, "w", encoding="utf-8") as routes_file:
+        json.dump(data, routes_file)
+
+
+@pytest.fixture
+def data_files(tmp_path) -> Tuple[str, str]:
+    """
+    Copies the sample routes and stations files to a temporary directory,
+    so tests can rewrite them.
+
+    Returns:
+        Tuple[str, str]: The paths of the routes and stations files.
+    """
+    paths = []
+    for name in ("routes.json", "stations.json"):
+        paths.append(shutil.copy(os.path.join(DATA_DIR, name), tmp_path / name))
+    return str(paths[0]), str(paths[1])
+
+
+@pytest.fixture(scope="session")
+def network_files(tmp_path_factory) -> Tuple[str, str]:
+    """
+    Writes the routes and stations files of SMALL_NETWORK.
+
+    Returns:
+        Tuple[str, str]: The paths of the routes and stations files.
+    """
+    return write_network(str(tmp_path_factory.mktemp("network")), SMALL_NETWORK)
+
+
+@pytest.fixture(scope="session")
+def network_snapshot(network_files) -> NetworkSnapshot:
+    """
+    Builds the snapshot of SMALL_NETWORK.
+
+    Returns:
+        NetworkSnapshot: The snapshot.
+    """
+    routes_path, stations_path = network_files
+    return DataPreparer(RouteRepository(routes_path, 0),
+                        StationRepository(stations_path, 0)).build_snapshot()
+
+
+def _reset_dependencies():
+    """Forgets the data store and every dependency built from it."""
+    for provider in (dependencies.get_travel_finder, dependencies.get_data_reloader,
+                     dependencies.get_routing_pool, dependencies.get_metrics):
+        provider.cache_clear()
+    set_data_store(None)
+
+
+@pytest.fixture
+def client(data_files, monkeypatch) -> Iterator[TestClient]:
+    """
+    Runs the application on copies of the sample data files, with the
+    admin endpoints enabled by ADMIN_TOKEN.
+
+    Yields:
+        TestClient: A client of the started application.
+    """
+    routes_path, stations_path = data_files
+    monkeypatch.setenv("PATH_ROUTES_DATA", routes_path)
+    monkeypatch.setenv("PATH_STATIONS_DATA", stations_path)
+    monkeypatch.setenv("ADMIN_TOKEN", ADMIN_TOKEN)
+    for name in ("ROUTING_WORKERS", "RELOAD_WATCH_INTERVAL", "PAIR_TABLE_PATH",
+                 "SNAPSHOT_PATH", "LISTING_MAX_AGE", "METRICS_ENABLED", "STREAM_MIN_BYTES"):
+        monkeypatch.delenv(name, raising=False)
+    _reset_dependencies()
+    try:
+        with TestClient(app) as test_client:
+            yield test_client
+    finally:
+        _reset_dependencies()
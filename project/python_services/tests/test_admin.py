@@ -0,0 +1,140 @@
+"""This module checks the admin token and the reload of the data files
+through the admin endpoints.
+
+Author: Juan Esteban Bedoya <jebedoyal@udistrital.edu.co>
+
+This file is part of SmartCommute project.
+
+SmartCommute is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+SmartCommute is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
+"""
+
+import os
+import pytest
+from controllers.dependencies import get_data_reloader # pylint: disable=import-error
+from tests.conftest import ADMIN_TOKEN, remove_stop
+
+HEADERS = {"X-Admin-Token": ADMIN_TOKEN}
+SEARCH = {"origin": "Station 19", "destination": "Station 14",
+          "departure": "2026-10-19T08:00:00"}
+
+@pytest.mark.parametrize("method", ["GET", "POST"])
+def test_admin_token_is_required(client, method):
+    """Admin requests without the configured token are rejected."""
+    for headers in ({}, {"X-Admin-Token": "wrong"}, {"X-Admin-Token": ""}):
+        response = client.request(method, "/admin/reload", headers=headers)
+        assert response.status_code == 403
+        assert response.json()["detail"] == "Invalid admin token."
+    assert client.request(method, "/admin/reload", headers=HEADERS).status_code == 200
+
+
+def test_admin_endpoints_are_disabled_without_a_token(client, monkeypatch):
+    """When ADMIN_TOKEN is not set, no token is accepted."""
+    monkeypatch.delenv("ADMIN_TOKEN")
+    for headers in ({}, HEADERS, {"X-Admin-Token": ""}):
+        response = client.post("/admin/reload", headers=headers)
+        assert response.status_code == 403
+        assert response.json()["detail"] == "Admin endpoints are disabled."
+
+
+def test_reload_serves_the_new_data(client, data_files):
+    """A successful reload swaps the listings and the network."""
+    version = client.get("/admin/reload", headers=HEADERS).json()["data_version"]
+    before = client.get("/route/find", params=SEARCH).json()
+    # Route 2 no longer reaches Station 14.
+    remove_stop(data_files[0], 1, "Station 14")
+
+    response = client.post("/admin/reload", headers=HEADERS)
+    assert response.status_code == 200
+    metrics = response.json()
+    assert metrics["reload_success_total"] == 1
+    assert metrics["last_reload_outcome"] == "success"
+    assert metrics["data_version"] != version
+    assert client.get("/admin/reload", headers=HEADERS).json() == metrics
+    assert client.get("/route/find", params=SEARCH).json() != before
+    stations = client.get("/route/all", params={"fields": "stations", "limit": 2}).json()
+    assert "Station 14" not in stations[1]["stations"]
+
+
+@pytest.mark.parametrize("content, error", [
+    ('{"routes": [', "Cannot load"),
+    ('{"routes": []}', "No data found in"),
+    ('{"routes": [{"id": "1", "name": "Route 1"}]}', "Cannot load"),
+    ('{"routes": [{"id": "1", "name": "Route 1", "stations": ["A"], "schedule": '
+     '[{"day": "Monday", "headway": "often"}]}]}', "Cannot load")
+])
+def test_failed_reload_keeps_the_current_data(client, data_files, content, error):
+    """Invalid or empty data is rejected and the old data keeps being served."""
+    version = client.get("/admin/reload", headers=HEADERS).json()["data_version"]
+    before = client.get("/route/find", params=SEARCH).json()
+    listing = client.get("/route/all")
+    routes_path, _ = data_files
+    with open(routes_path, "w", encoding="utf-8") as routes_file:
+        routes_file.write(content)
+
+    response = client.post("/admin/reload", headers=HEADERS)
+    assert response.status_code == 422
+    assert response.json()["detail"].startswith(error)
+    assert routes_path in response.json()["detail"]
+    metrics = client.get("/admin/reload", headers=HEADERS).json()
+    assert metrics["reload_failure_total"] == 1
+    assert metrics["reload_success_total"] == 0
+    assert metrics["last_reload_outcome"] == "failure"
+    assert metrics["last_reload_error"] == response.json()["detail"]
+    assert metrics["data_version"] == version
+    assert client.get("/route/find", params=SEARCH).json() == before
+    assert client.get("/route/all").content == listing.content
+
+
+def test_data_file_without_an_object_fails_the_reload(client, data_files):
+    """A data file whose top level is not an object is reported as a load error."""
+    _, stations_path = data_files
+    with open(stations_path, "w", encoding="utf-8") as stations_file:
+        stations_file.write("[]")
+    response = client.post("/admin/reload", headers=HEADERS)
+    assert response.status_code == 422
+    assert response.json()["detail"].startswith(f"Cannot load {stations_path}")
+
+
+def test_missing_file_fails_the_reload(client, data_files):
+    """A data file that disappeared is reported as a load error."""
+    routes_path, _ = data_files
+    os.remove(routes_path)
+    response = client.post("/admin/reload", headers=HEADERS)
+    assert response.status_code == 422
+    assert response.json()["detail"].startswith(f"Cannot load {routes_path}")
+
+
+def test_concurrent_reload_is_rejected(client):
+    """A reload requested while another one runs gets a conflict."""
+    reloader = get_data_reloader()
+    with reloader._lock: # pylint: disable=protected-access
+        assert client.post("/admin/reload", headers=HEADERS).status_code == 409
+    assert client.post("/admin/reload", headers=HEADERS).status_code == 200
+
+
+def test_reloads_are_exported_as_metrics(client, data_files):
+    """The outcome, duration and data version of the reloads are in /metrics."""
+    assert client.post("/admin/reload", headers=HEADERS).status_code == 200
+    routes_path, _ = data_files
+    with open(routes_path, "w", encoding="utf-8") as routes_file:
+        routes_file.write("{")
+    assert client.post("/admin/reload", headers=HEADERS).status_code == 422
+    version = client.get("/admin/reload", headers=HEADERS).json()["data_version"]
+    lines = client.get("/metrics").text.splitlines()
+    assert 'smartcommute_data_reloads_total{outcome="success"} 1' in lines
+    assert 'smartcommute_data_reloads_total{outcome="failure"} 1' in lines
+    assert "smartcommute_data_reload_duration_seconds_count 2" in lines
+    assert f"smartcommute_data_version {version}" in lines
+    assert any(line.startswith("smartcommute_data_last_reload_success_timestamp_seconds ")
+               for line in lines)
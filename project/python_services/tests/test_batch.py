@@ -0,0 +1,199 @@
+"""This module checks the batch search endpoint: its NDJSON stream, its
+summary line, its metrics and its use of the routing workers.
+
+Author: Juan Esteban Bedoya <jebedoyal@udistrital.edu.co>
+
+This file is part of SmartCommute project.
+
+SmartCommute is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+SmartCommute is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
+"""
+
+import asyncio
+import json
+from typing import Iterator, List, Sequence, Tuple
+import pytest
+from controllers import travel # pylint: disable=import-error
+from controllers.dependencies import get_routing_pool # pylint: disable=import-error
+from main import app # pylint: disable=import-error
+from services.routing_pool import RoutingPool # pylint: disable=import-error
+from services.travel.raptor import MAX_TRANSFERS_LIMIT # pylint: disable=import-error
+
+# pylint: disable=redefined-outer-name
+
+DEPARTURE = "2026-10-19T08:00:00"
+PAIRS = (
+    ("Station 19", "Station 14", "min_stations"),
+    ("Station 01", "Station 24", "min_transfers"),
+    ("Station 05", "Station 17", "multi_transfer"),
+    ("Station 19", "Station 14", "min_time"),
+    ("Station 03", "Station 03", "min_stations"),
+    ("Station 02", "Station 22", "unknown")
+)
+
+def batch_body(pairs: Sequence[Tuple[str, str, str]] = PAIRS, **parameters) -> dict:
+    """
+    Builds the body of a batch request.
+
+    Args:
+        pairs (Sequence[Tuple[str, str, str]]): The origin, destination and
+            optimization of each search.
+        **parameters: The shared parameters of the batch.
+
+    Returns:
+        dict: The request body.
+    """
+    return {
+        "pairs": [{"origin": origin, "destination": destination, "optimization": optimization}
+                  for origin, destination, optimization in pairs],
+        "departure": DEPARTURE, "max_transfers": 2, "limit": 3, **parameters
+    }
+
+
+def post_batch(client, body: dict) -> List[dict]:
+    """
+    Posts a batch and parses its NDJSON lines.
+
+    Args:
+        client (TestClient): The application client.
+        body (dict): The request body.
+
+    Returns:
+        List[dict]: The parsed lines.
+    """
+    response = client.post("/route/find/batch", json=body)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def single_result(client, origin: str, destination: str, optimization: str) -> dict:
+    """
+    Searches one pair through /route/find, with the parameters of `batch_body`.
+
+    Returns:
+        dict: The search result, or the error it answered as a result holds it.
+    """
+    response = client.get("/route/find", params={
+        "origin": origin, "destination": destination, "optimization": optimization,
+        "departure": DEPARTURE, "max_transfers": 2, "limit": 3
+    })
+    if response.status_code == 404:
+        return {"error": response.json()["detail"]}
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.fixture
+def routing_pool(client, monkeypatch) -> Iterator[RoutingPool]: # pylint: disable=unused-argument
+    """
+    Starts two routing workers over the data files of the application,
+    which are sent batches two pairs at a time.
+
+    Yields:
+        RoutingPool: The started pool.
+    """
+    monkeypatch.setattr(travel, "BATCH_CHUNK_PAIRS", 2)
+    pool = RoutingPool(2, 4)
+    asyncio.run(pool.start())
+    try:
+        yield pool
+    finally:
+        app.dependency_overrides.pop(get_routing_pool, None)
+        pool.shutdown()
+
+
+def test_lines_match_single_searches(client):
+    """Each line holds the pair, in order, and what /route/find answers for it."""
+    lines = post_batch(client, batch_body())
+    assert len(lines) == len(PAIRS) + 1
+    for index, (line, (origin, destination, optimization)) in enumerate(zip(lines, PAIRS)):
+        assert line == {
+            "index": index, "origin": origin, "destination": destination,
+            "optimization": optimization,
+            "result": single_result(client, origin, destination, optimization)
+        }
+
+
+def test_summary_line(client):
+    """The last line counts the pairs and their throughput."""
+    summary = post_batch(client, batch_body())[-1]["summary"]
+    assert summary["pairs"] == len(PAIRS)
+    assert summary["seconds"] > 0
+    assert summary["pairs_per_second"] == pytest.approx(len(PAIRS) / summary["seconds"],
+                                                        rel=0.01)
+
+
+def test_unknown_stations_give_an_error_result(client):
+    """A pair whose stations do not exist answers an error without stopping the batch."""
+    pairs = [("Nowhere", "Station 14", "min_stations"), ("Station 19", "Station 14",
+                                                          "min_stations")]
+    first, second, summary = post_batch(client, batch_body(pairs))
+    assert "error" in first["result"]
+    assert "routes" in second["result"]
+    assert summary["summary"]["pairs"] == 2
+
+
+@pytest.mark.parametrize("body", [
+    {"pairs": []},
+    {"pairs": [{"origin": "Station 19"}]},
+    batch_body(limit=0),
+    batch_body(max_transfers=-1),
+    batch_body(max_transfers=MAX_TRANSFERS_LIMIT + 1)
+])
+def test_invalid_batches_are_rejected(client, body):
+    """Empty batches, incomplete pairs and out of range parameters answer 422."""
+    assert client.post("/route/find/batch", json=body).status_code == 422
+
+
+def test_searches_are_recorded_in_metrics(client):
+    """The stages of every search of a batch are recorded like those of /route/find."""
+    post_batch(client, batch_body())
+    text = client.get("/metrics").text
+    searches = [optimization if optimization != "unknown" else "min_stations"
+                for _, _, optimization in PAIRS]
+    for optimization in set(searches):
+        assert (f'smartcommute_search_stage_duration_seconds_count{{optimization='
+                f'"{optimization}",stage="total"}} {searches.count(optimization)}') in text
+
+
+def test_workers_answer_as_the_web_process(client, routing_pool, monkeypatch):
+    """Batches sent to the routing workers in parts answer the same lines."""
+    expected = post_batch(client, batch_body())
+    parts = []
+    send = routing_pool.find_routes_batch
+
+    async def find_routes_batch(pairs, *args, admit=True):
+        parts.append((len(pairs), admit))
+        return await send(pairs, *args, admit=admit)
+
+    monkeypatch.setattr(routing_pool, "find_routes_batch", find_routes_batch)
+    app.dependency_overrides[get_routing_pool] = lambda: routing_pool
+    assert post_batch(client, batch_body())[:-1] == expected[:-1]
+    assert parts == [(2, True), (2, False), (2, False)]
+    assert routing_pool.stats()["pending"] == 0
+
+
+def test_saturated_workers_answer_503(client):
+    """A batch is refused with 503 and Retry-After while the workers are full."""
+    saturated = RoutingPool(1, 1)
+    saturated.pending = 1
+    app.dependency_overrides[get_routing_pool] = lambda: saturated
+    try:
+        response = client.post("/route/find/batch", json=batch_body())
+    finally:
+        del app.dependency_overrides[get_routing_pool]
+        saturated.shutdown()
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert saturated.stats()["rejected_total"] == 1
@@ -0,0 +1,286 @@
+"""This module checks the compiled data files, the network snapshot files
+and the data files read one record at a time.
+
+Author: Juan Esteban Bedoya <jebedoyal@udistrital.edu.co>
+
+This file is part of SmartCommute project.
+
+SmartCommute is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+SmartCommute is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
+"""
+
+import gc
+import json
+import os
+from datetime import datetime
+from itertools import permutations
+import pytest
+from compile_data import CompileError, compile_data # pylint: disable=import-error
+from repositories import compiled_data # pylint: disable=import-error
+from repositories.compiled_data import CompiledRecords # pylint: disable=import-error
+from repositories.data_store import DataStore # pylint: disable=import-error
+from repositories.route import RouteDAO, RouteRepository, validate_route # pylint: disable=import-error
+from repositories.station import StationDAO, StationRepository # pylint: disable=import-error
+from services.travel import snapshot_file # pylint: disable=import-error
+from services.travel.compact_network import ARRAYS # pylint: disable=import-error
+from services.travel.data_preparer import DataPreparer # pylint: disable=import-error
+from services.travel.network_snapshot import NetworkSnapshot # pylint: disable=import-error
+from services.travel.snapshot_file import ( # pylint: disable=import-error
+    attach_snapshot, load_or_write_snapshot, write_snapshot
+)
+from services.travel_finder import TravelFinder # pylint: disable=import-error
+
+# pylint: disable=redefined-outer-name
+
+DEPARTURES = (datetime(2026, 10, 19, 8, 0), datetime(2026, 10, 24, 11, 0))
+OPTIMIZATIONS = ("min_stations", "min_transfers", "multi_transfer", "min_time")
+
+def snapshot_contents(snapshot: NetworkSnapshot) -> tuple:
+    """
+    Lists everything a snapshot file stores, as plain values.
+
+    Args:
+        snapshot (NetworkSnapshot): The snapshot.
+
+    Returns:
+        tuple: The names, network arrays, schedules and timetable.
+    """
+    network = snapshot.network
+    schedules = snapshot.schedules
+    timetable = snapshot.timetable
+    return (
+        tuple(network.station_names), network.listed_stations, tuple(network.route_names),
+        {name: list(getattr(network, name)) for name in ARRAYS},
+        [[list(values) for values in per_weekday]
+         for per_weekday in (schedules.starts, schedules.ends, schedules.routes)],
+        [list(values) for values in timetable.departure_offsets],
+        [list(values) for values in timetable.departures],
+        list(timetable.stop_times)
+    )
+
+
+def search_all(finder: TravelFinder) -> list:
+    """
+    Runs every optimization between the sample stations with routes.
+
+    Args:
+        finder (TravelFinder): The travel finder.
+
+    Returns:
+        list: The results, in search order.
+    """
+    stations = ["Station 02", "Station 05", "Station 11", "Station 16", "Station 19",
+                "Station 22", "Station 24"]
+    return [
+        finder.find_routes(origin, destination, optimization, departure=departure)
+        for origin, destination in permutations(stations, 2)
+        for optimization in OPTIMIZATIONS
+        for departure in DEPARTURES
+    ]
+
+
+@pytest.fixture
+def compiled_file(data_files, tmp_path) -> str:
+    """
+    Compiles the sample data files.
+
+    Returns:
+        str: The path of the compiled file.
+    """
+    output = str(tmp_path / "data.scdb")
+    compile_data(*data_files, output)
+    return output
+
+
+def test_compiled_records_match_the_json_files(data_files, compiled_file):
+    """The records of the compiled file are the validated JSON records."""
+    routes_path, stations_path = data_files
+    routes = RouteRepository(compiled_file, 0)
+    stations = StationRepository(compiled_file, 0)
+    assert isinstance(routes.data, CompiledRecords)
+    with open(routes_path, encoding="utf-8") as routes_file:
+        expected_routes = [validate_route(route).model_dump()
+                           for route in json.load(routes_file)["routes"]]
+    with open(stations_path, encoding="utf-8") as stations_file:
+        expected_stations = json.load(stations_file)["stations"]
+    assert list(routes.data) == expected_routes
+    assert list(stations.data) == expected_stations
+    assert routes.data[-1] == expected_routes[-1]
+    assert routes.project(3, {"stations", "id"}) \
+        == {"id": expected_routes[3]["id"], "stations": expected_routes[3]["stations"]}
+    # The compiled file is identified by the JSON files it was compiled from.
+    assert routes.digest == RouteRepository(routes_path, 0).digest
+    assert stations.digest == StationRepository(stations_path, 0).digest
+
+
+def test_compiled_snapshot_is_read_in_place(data_files, compiled_file, monkeypatch):
+    """The network stored in a compiled file gives the results of the JSON files."""
+    expected = search_all(TravelFinder(RouteRepository(data_files[0], 0),
+                                       StationRepository(data_files[1], 0)))
+
+    def prepare_data(_):
+        raise AssertionError("The data was prepared again.")
+
+    monkeypatch.setattr(DataPreparer, "prepare_data", prepare_data)
+    finder = TravelFinder(RouteRepository(compiled_file, 0),
+                          StationRepository(compiled_file, 0))
+    assert search_all(finder) == expected
+
+
+@pytest.mark.parametrize("offset, error", [
+    (-1, "is corrupted"),
+    (4, "is not compiled data of version"),
+    # Without the magic number the file is read as JSON.
+    (0, "")
+])
+def test_damaged_compiled_file_is_rejected(compiled_file, offset, error):
+    """Files with another magic number, version or checksum are not loaded."""
+    with open(compiled_file, "r+b") as file:
+        file.seek(offset, os.SEEK_END if offset < 0 else os.SEEK_SET)
+        byte = file.read(1)
+        file.seek(-1, os.SEEK_CUR)
+        file.write(bytes([byte[0] ^ 0xFF]))
+    repository = RouteRepository(compiled_file, 0)
+    assert not repository.data
+    assert repository.load_error is not None
+    assert error in str(repository.load_error)
+
+
+def test_compiled_file_versions_are_checked(compiled_file, monkeypatch):
+    """A file written by another version of the format is not loaded."""
+    monkeypatch.setattr(compiled_data, "FORMAT_VERSION", compiled_data.FORMAT_VERSION + 1)
+    repository = RouteRepository(compiled_file, 0)
+    assert "is not compiled data of version" in str(repository.load_error)
+
+
+def test_compile_errors(data_files, compiled_file, tmp_path):
+    """Missing, empty and already compiled files are not compiled."""
+    routes_path, stations_path = data_files
+    output = str(tmp_path / "other.scdb")
+    with pytest.raises(CompileError, match="Cannot load"):
+        compile_data(str(tmp_path / "missing.json"), stations_path, output)
+    with pytest.raises(CompileError, match="already compiled"):
+        compile_data(compiled_file, stations_path, output)
+    with open(routes_path, "w", encoding="utf-8") as routes_file:
+        json.dump({"routes": []}, routes_file)
+    with pytest.raises(CompileError, match="No data found"):
+        compile_data(routes_path, stations_path, output)
+    assert not os.path.exists(output)
+
+
+def test_snapshot_file_round_trip(network_snapshot, tmp_path):
+    """An attached snapshot file holds the network it was written from."""
+    path = str(tmp_path / "network.snapshot")
+    digest = bytes(range(32))
+    write_snapshot(network_snapshot, path, digest)
+    attached = attach_snapshot(path, digest, 7)
+    assert attached.version == 7
+    assert snapshot_contents(attached) == snapshot_contents(network_snapshot)
+    assert attached.schedules.windows() == network_snapshot.schedules.windows()
+    network = attached.network
+    for station in range(0, network.listed_stations, 7):
+        assert network.find_station(network.station_names[station]) == station
+        assert list(network.routes_at(station)) \
+            == list(network_snapshot.network.routes_at(station))
+
+
+@pytest.mark.parametrize("damage, error", [
+    (lambda data: data[:-1] + bytes([data[-1] ^ 1]), "is corrupted"),
+    (lambda data: data[:40] + bytes([data[40] ^ 1]) + data[41:], "was built from other data"),
+    (lambda data: b"XXXX" + data[4:], "is not a network snapshot"),
+    (lambda data: data[:10], "is not a network snapshot")
+])
+def test_damaged_snapshot_file_is_rejected(network_snapshot, tmp_path, damage, error):
+    """Snapshot files with a wrong checksum, digest or header are not attached."""
+    path = str(tmp_path / "network.snapshot")
+    digest = bytes(range(32))
+    write_snapshot(network_snapshot, path, digest)
+    with open(path, "rb") as file:
+        data = file.read()
+    with open(path, "wb") as file:
+        file.write(damage(data))
+    with pytest.raises(ValueError, match=error):
+        attach_snapshot(path, digest)
+
+
+def test_snapshot_of_other_data_is_rejected(network_snapshot, tmp_path):
+    """A snapshot file is only attached for the data it was built from."""
+    path = str(tmp_path / "network.snapshot")
+    write_snapshot(network_snapshot, path, bytes(32))
+    with pytest.raises(ValueError, match="was built from other data"):
+        attach_snapshot(path, bytes(range(32)))
+
+
+def test_snapshot_format_version_is_checked(network_snapshot, tmp_path, monkeypatch):
+    """A snapshot file written by another version of the format is not attached."""
+    path = str(tmp_path / "network.snapshot")
+    write_snapshot(network_snapshot, path, bytes(32))
+    monkeypatch.setattr(snapshot_file, "FORMAT_VERSION", snapshot_file.FORMAT_VERSION + 1)
+    with pytest.raises(ValueError, match="is not a network snapshot of version"):
+        attach_snapshot(path, bytes(32))
+
+
+def test_stale_snapshot_file_is_rewritten(network_snapshot, tmp_path):
+    """The snapshot is built once per data digest and attached afterwards."""
+    path = str(tmp_path / "network.snapshot")
+    built = []
+
+    def build() -> NetworkSnapshot:
+        built.append(True)
+        return network_snapshot
+
+    for digest in (bytes(32), bytes(32), bytes(range(32)), bytes(range(32))):
+        attached = load_or_write_snapshot(path, digest, 1, build)
+        assert snapshot_contents(attached) == snapshot_contents(network_snapshot)
+    assert len(built) == 2
+    attach_snapshot(path, bytes(range(32)))
+
+
+def test_shared_snapshot_file_gives_the_same_results(data_files, tmp_path):
+    """Travel finders sharing a snapshot file find what a finder of its own does."""
+    routes_path, stations_path = data_files
+    expected = search_all(TravelFinder(RouteRepository(routes_path, 0),
+                                       StationRepository(stations_path, 0)))
+    path = str(tmp_path / "network.snapshot")
+    for _ in range(2):
+        finder = TravelFinder(RouteRepository(routes_path, 0),
+                              StationRepository(stations_path, 0), snapshot_path=path)
+        assert search_all(finder) == expected
+    assert os.path.exists(path)
+
+
+@pytest.mark.parametrize("files", ["data_files", "network_files"])
+def test_streamed_files_match_parsed_files(request, files):
+    """Files read one record at a time give the records and network of parsed files."""
+    routes_path, stations_path = request.getfixturevalue(files)
+    parsed = (RouteRepository(routes_path, 0), StationRepository(stations_path, 0))
+    streamed = (RouteRepository(routes_path, 1), StationRepository(stations_path, 1))
+    for parsed_repository, streamed_repository in zip(parsed, streamed):
+        assert isinstance(streamed_repository.data, CompiledRecords)
+        assert list(streamed_repository.data) == parsed_repository.data
+        assert streamed_repository.digest == parsed_repository.digest
+    assert snapshot_contents(DataPreparer(*streamed).build_snapshot()) \
+        == snapshot_contents(DataPreparer(*parsed).build_snapshot())
+
+
+@pytest.mark.parametrize("stream_min_bytes", [0, 1])
+def test_warmed_store_keeps_no_records_as_objects(data_files, stream_min_bytes):
+    """The name indexes and payloads of a warmed store hold no route or station objects."""
+    routes_path, stations_path = data_files
+    store = DataStore(RouteRepository(routes_path, stream_min_bytes),
+                      StationRepository(stations_path, stream_min_bytes)).warm()
+    gc.collect()
+    assert not [item for item in gc.get_objects() if isinstance(item, (RouteDAO, StationDAO))]
+    assert [route.name for route in store.route_names.search("F23", 1)] == ["Route F23"]
+    assert json.loads(store.route_payload.body) \
+        == [route.model_dump(mode="json") for route in store.routes.get_routes()]
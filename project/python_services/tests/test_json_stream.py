@@ -0,0 +1,151 @@
+"""This module checks the incremental reader of JSON arrays against the
+standard JSON parser.
+
+Author: Juan Esteban Bedoya <jebedoyal@udistrital.edu.co>
+
+This file is part of SmartCommute project.
+
+SmartCommute is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+SmartCommute is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
+"""
+
+import hashlib
+import io
+import json
+import random
+from typing import Any
+import pytest
+from repositories.json_stream import CHUNK_SIZE, iter_json_array # pylint: disable=import-error
+
+DOCUMENTS = [
+    '{"routes": []}',
+    '{"routes": [ ] }',
+    '  {\n\t"routes" :\r\n[1 , 2,3]\n}\n',
+    '{"other": {"routes": [9]}, "routes": [{"routes": [1]}], "after": [[], {}]}',
+    '{"routes": ["\\u00e1\\u00e9", "\\ud83d\\ude8c", "Calle 26 \\"Norte\\"", "a\\\\b\\/c\\n"]}',
+    '{"routes": ["Ñuñoa", "Portal Américas", "🚌 ⇄ 🚉"]}',
+    '{"routes": [0, -0, 1e3, -2.5E-3, 12345678901234567890, 0.1, 1.7976931348623157e308]}',
+    '{"routes": [true, false, null, [null], {"a": {"b": [true]}}]}',
+    '{"routes": [{"id": "1", "stations": ["A", "B"], "schedule": [{"day": "Monday"}]}]}',
+    '{"\\u0072outes": [1, 2]}',
+    '{"routes": [1], "extra": "' + "x" * 5000 + '"}',
+    '{"routes": ["' + "é" * 3000 + '", ' + ", ".join(str(n) for n in range(500)) + "]}"
+]
+
+def random_value(rng: random.Random, depth: int = 0) -> Any:
+    """
+    Builds a random JSON value.
+
+    Args:
+        rng (random.Random): The random generator.
+        depth (int): How deep the value is nested.
+
+    Returns:
+        Any: The value.
+    """
+    kind = rng.randrange(7 if depth < 3 else 5)
+    if kind == 0:
+        return rng.choice([None, True, False])
+    if kind == 1:
+        return rng.randint(-10 ** 12, 10 ** 12)
+    if kind == 2:
+        return rng.uniform(-1e6, 1e6)
+    if kind in (3, 4):
+        return "".join(rng.choice('aZ09 "\\/\n\té€😀') for _ in range(rng.randrange(12)))
+    if kind == 5:
+        return [random_value(rng, depth + 1) for _ in range(rng.randrange(5))]
+    return {f"k{index}": random_value(rng, depth + 1) for index in range(rng.randrange(5))}
+
+
+def read_all(document: bytes, key: str = "routes", chunk_size: int = CHUNK_SIZE) -> list:
+    """
+    Reads an array of a document with `iter_json_array`.
+
+    Args:
+        document (bytes): The JSON document.
+        key (str): The key of the array.
+        chunk_size (int): The bytes read at a time.
+
+    Returns:
+        list: The items of the array.
+    """
+    return list(iter_json_array(io.BytesIO(document), key, chunk_size=chunk_size))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, CHUNK_SIZE])
+@pytest.mark.parametrize("document", DOCUMENTS)
+def test_documents_match_json_load(document, chunk_size):
+    """The items are the ones the standard parser finds."""
+    data = document.encode("utf-8")
+    assert read_all(data, chunk_size=chunk_size) == json.loads(data)["routes"]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, CHUNK_SIZE])
+def test_random_documents_match_json_load(chunk_size):
+    """Random documents, written compactly or indented, are read alike."""
+    rng = random.Random(chunk_size)
+    for _ in range(60):
+        value = {"routes": [random_value(rng) for _ in range(rng.randrange(8))],
+                 "stations": random_value(rng)}
+        for options in ({}, {"indent": 2}, {"ensure_ascii": False, "separators": (",", ":")}):
+            data = json.dumps(value, **options).encode("utf-8")
+            assert read_all(data, chunk_size=chunk_size) == json.loads(data)["routes"]
+            assert not read_all(data, "missing", chunk_size)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, CHUNK_SIZE])
+def test_every_chunk_is_consumed(chunk_size):
+    """The consumer receives the whole file, so it can hash the file as read."""
+    data = ('{"routes": [' + ", ".join(json.dumps({"id": str(n)}) for n in range(300))
+            + '], "tail": "end"}\n').encode("utf-8")
+    digest = hashlib.sha256()
+    items = list(iter_json_array(io.BytesIO(data), "routes", digest.update, chunk_size))
+    assert len(items) == 300
+    assert digest.digest() == hashlib.sha256(data).digest()
+
+
+@pytest.mark.parametrize("document", ['{}', '{"stations": [1]}', ' { "route": [1] } '])
+def test_missing_key_yields_nothing(document):
+    """A document without the key has no items."""
+    assert not read_all(document.encode("utf-8"))
+
+
+@pytest.mark.parametrize("document", [
+    '[{"routes": [1]}]',
+    '"routes"',
+    '',
+    '{"routes": {"a": 1}}',
+    '{"routes": "[1, 2]"}',
+    '{"routes": [1], "routes": [2]}',
+    '{"routes": [1, 2',
+    '{"routes": [1, 2]',
+    '{"routes": [1 2]}',
+    '{"routes": [1,]}',
+    '{"routes": [1]} {}',
+    '{"routes": [1]}]',
+    '{routes: [1]}',
+    '{"routes": [1], "other": [}',
+    '{"routes": ["\\x"]}',
+    '{"routes": [NaN1]}'
+])
+@pytest.mark.parametrize("chunk_size", [1, CHUNK_SIZE])
+def test_invalid_documents_are_rejected(document, chunk_size):
+    """Documents that are not an object holding an array are rejected."""
+    with pytest.raises(ValueError):
+        read_all(document.encode("utf-8"), chunk_size=chunk_size)
+
+
+def test_invalid_utf8_is_rejected():
+    """Files are read as UTF-8."""
+    with pytest.raises(ValueError):
+        read_all(b'{"routes": ["\xff"]}')
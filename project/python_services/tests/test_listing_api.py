@@ -0,0 +1,199 @@
+"""This module checks the /route/all and /station/all endpoints: the
+cached full listing and the paginated, filtered listing.
+
+Author: Juan Esteban Bedoya <jebedoyal@udistrital.edu.co>
+
+This file is part of SmartCommute project.
+
+SmartCommute is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+SmartCommute is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
+"""
+
+import gzip
+import json
+import os
+from typing import List
+from urllib.parse import parse_qs, urlsplit
+import pytest
+from tests.conftest import ADMIN_TOKEN, DATA_DIR
+
+with open(os.path.join(DATA_DIR, "routes.json"), encoding="utf-8") as routes_file:
+    ROUTES = json.load(routes_file)["routes"]
+with open(os.path.join(DATA_DIR, "stations.json"), encoding="utf-8") as stations_file:
+    STATIONS = json.load(stations_file)["stations"]
+
+def read_pages(client, url: str, **params) -> List[dict]:
+    """
+    Follows the cursors of a listing until its last page.
+
+    Args:
+        client (TestClient): The application client.
+        url (str): The listing URL.
+        **params: The query parameters of the first page.
+
+    Returns:
+        List[dict]: The records of every page, in order.
+    """
+    records = []
+    while True:
+        response = client.get(url, params=params)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        assert len(page) <= params.get("limit", len(page))
+        records += page
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            assert "Link" not in response.headers
+            return records
+        link, rel = response.headers["Link"].split("; ")
+        assert rel == 'rel="next"'
+        assert parse_qs(urlsplit(link.strip("<>")).query)["cursor"] == [cursor]
+        params["cursor"] = cursor
+
+
+@pytest.mark.parametrize("url", ["/route/all", "/station/all"])
+@pytest.mark.parametrize("limit", [1, 5, 1000])
+def test_pages_add_up_to_the_full_listing(client, url, limit):
+    """Following the cursors lists every record once, in file order."""
+    full = client.get(url).json()
+    assert read_pages(client, url, limit=limit) == full
+    ids = [record["id"] for record in full]
+    assert ids == [record["id"] for record in (ROUTES if url == "/route/all" else STATIONS)]
+
+
+@pytest.mark.parametrize("url", ["/route/all", "/station/all"])
+def test_fields_are_projected(client, url):
+    """Only the requested fields are returned, in the order of the records."""
+    full = client.get(url).json()
+    assert read_pages(client, url, fields="name, id", limit=4) == [
+        {"id": record["id"], "name": record["name"]} for record in full
+    ]
+
+
+@pytest.mark.parametrize("station", ["Station 03", "station 19", "Station 01", "Nowhere"])
+def test_routes_are_filtered_by_station(client, station):
+    """Routes stopping at the station are listed, matching names loosely."""
+    expected = [route["id"] for route in ROUTES
+                if station.lower() in (stop.lower() for stop in route["stations"])]
+    listed = read_pages(client, "/route/all", station=station, fields="id", limit=2)
+    assert [route["id"] for route in listed] == expected
+
+
+def test_routes_are_filtered_by_day(client):
+    """Routes are filtered by the weekdays of their schedule, with the station."""
+    weekend = read_pages(client, "/route/all", day="Saturday", fields="id")
+    assert len(weekend) == len(ROUTES)
+    weekday = read_pages(client, "/route/all", day="monday", fields="id", limit=3)
+    assert "M80" not in [route["id"] for route in weekday]
+    assert len(weekday) == len(ROUTES) - 1
+    both = read_pages(client, "/route/all", day="Monday", station="Station 16", fields="id")
+    assert [route["id"] for route in both] == ["H75", "K16"]
+
+
+@pytest.mark.parametrize("route", ["H75", "M80", "Z99"])
+def test_stations_are_filtered_by_route(client, route):
+    """Stations listing the route are returned."""
+    listed = read_pages(client, "/station/all", route=route, fields="id", limit=2)
+    assert [station["id"] for station in listed] \
+        == [station["id"] for station in STATIONS if route in station["routes"]]
+
+
+@pytest.mark.parametrize("url, params", [
+    ("/route/all", {"fields": "id,color"}),
+    ("/route/all", {"fields": " , "}),
+    ("/route/all", {"day": "Someday"}),
+    ("/route/all", {"cursor": "not a cursor"}),
+    ("/route/all", {"cursor": "bm90OmEgbnVtYmVy"}),
+    ("/station/all", {"fields": "routes,lines"}),
+    ("/station/all", {"cursor": "%%%"})
+])
+def test_invalid_listing_parameters(client, url, params):
+    """Unknown fields, days and malformed cursors are rejected."""
+    assert client.get(url, params=params).status_code == 400
+
+
+@pytest.mark.parametrize("url, limit", [("/route/all", 0), ("/station/all", 1001)])
+def test_page_size_is_bounded(client, url, limit):
+    """Pages hold from 1 to 1000 records."""
+    assert client.get(url, params={"limit": limit}).status_code == 422
+
+
+def test_cursor_is_rejected_after_the_data_changes(client, data_files):
+    """A cursor belongs to the data it was made from."""
+    cursor = client.get("/route/all", params={"limit": 2}).headers["X-Next-Cursor"]
+    assert client.get("/route/all", params={"limit": 2, "cursor": cursor}).status_code == 200
+    routes_path, _ = data_files
+    with open(routes_path, "w", encoding="utf-8") as file:
+        json.dump({"routes": ROUTES[:-1]}, file)
+    assert client.post("/admin/reload", headers={"X-Admin-Token": ADMIN_TOKEN}).status_code \
+        == 200
+    response = client.get("/route/all", params={"limit": 2, "cursor": cursor})
+    assert response.status_code == 400
+    assert "current data" in response.json()["detail"]
+
+
+@pytest.mark.parametrize("url", ["/route/all", "/station/all"])
+def test_entity_tag(client, url):
+    """Clients holding the current entity tag get an empty 304 response."""
+    response = client.get(url)
+    etag = response.headers["ETag"]
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert "max-age" in response.headers["Cache-Control"]
+    for if_none_match in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        cached = client.get(url, headers={"If-None-Match": if_none_match})
+        assert cached.status_code == 304, if_none_match
+        assert cached.content == b""
+        assert cached.headers["ETag"] == etag
+    assert client.get(url, headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_entity_tag_changes_with_the_data(client, data_files):
+    """A reload with other data gives another entity tag."""
+    etag = client.get("/station/all").headers["ETag"]
+    _, stations_path = data_files
+    with open(stations_path, "w", encoding="utf-8") as file:
+        json.dump({"stations": STATIONS[1:]}, file)
+    assert client.post("/admin/reload", headers={"X-Admin-Token": ADMIN_TOKEN}).status_code \
+        == 200
+    response = client.get("/station/all", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert len(response.json()) == len(STATIONS) - 1
+
+
+@pytest.mark.parametrize("accept_encoding, encoding", [
+    ("gzip", "gzip"),
+    ("deflate, gzip;q=0.5", "gzip"),
+    ("gzip;q=0", None),
+    ("identity", None),
+    ("GZIP", "gzip"),
+    ("gzip;q=abc", None),
+    ("", None)
+])
+def test_gzip_negotiation(client, accept_encoding, encoding):
+    """The body is compressed with gzip only when the client accepts it."""
+    plain = client.get("/route/all", headers={"Accept-Encoding": "identity"}).content
+    response = client.get("/route/all", headers={"Accept-Encoding": accept_encoding})
+    assert response.headers.get("Content-Encoding") == encoding
+    assert response.headers["Vary"] == "Accept-Encoding"
+    # The test client decodes gzip bodies itself.
+    assert response.content == plain
+    assert json.loads(plain) == client.get("/route/all", params={"limit": 1000}).json()
+
+
+def test_gzip_body(client):
+    """The compressed body holds the plain one."""
+    plain = client.get("/station/all", headers={"Accept-Encoding": "identity"}).content
+    with client.stream("GET", "/station/all", headers={"Accept-Encoding": "gzip"}) as response:
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert gzip.decompress(b"".join(response.iter_raw())) == plain
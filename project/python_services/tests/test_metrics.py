@@ -0,0 +1,162 @@
+"""This module checks the instrumentation of the API: the Server-Timing
+header of travel searches, the Prometheus exposition of /metrics and the
+behaviour when METRICS_ENABLED is 0.
+
+Author: Juan Esteban Bedoya <jebedoyal@udistrital.edu.co>
+
+This file is part of SmartCommute project.
+
+SmartCommute is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+SmartCommute is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
+"""
+
+import re
+from typing import Dict
+import pytest
+from controllers import dependencies # pylint: disable=import-error
+from services.metrics import Counter, Gauge, Histogram # pylint: disable=import-error
+
+SEARCH = {"origin": "Station 19", "destination": "Station 14",
+          "departure": "2026-10-19T08:00:00"}
+SERVER_TIMING = re.compile(r"^([a-z_]+);dur=(\d+\.\d{3})$")
+
+def server_timing(header: str) -> Dict[str, float]:
+    """
+    Parses a Server-Timing header.
+
+    Args:
+        header (str): The header value.
+
+    Returns:
+        Dict[str, float]: The milliseconds of each metric, in header order.
+    """
+    stages = {}
+    for metric in header.split(", "):
+        match = SERVER_TIMING.match(metric)
+        assert match, metric
+        stages[match.group(1)] = float(match.group(2))
+    return stages
+
+
+def samples(text: str, name: str) -> Dict[str, float]:
+    """
+    Collects the samples of a metric from an exposition.
+
+    Args:
+        text (str): The exposition.
+        name (str): The sample name, such as a histogram name plus "_count".
+
+    Returns:
+        Dict[str, float]: The value of each label set, keyed by its labels.
+    """
+    values = {}
+    for line in text.splitlines():
+        if line.startswith(name + "{") or line.startswith(name + " "):
+            labels, value = line[len(name):].rsplit(" ", 1)
+            values[labels] = float(value)
+    return values
+
+
+@pytest.mark.parametrize("optimization", ["min_stations", "min_transfers",
+                                          "multi_transfer", "min_time"])
+def test_searches_send_server_timing(client, optimization):
+    """Every strategy reports its stages and the total in Server-Timing."""
+    response = client.get("/route/find", params={**SEARCH, "optimization": optimization})
+    assert response.status_code == 200
+    stages = server_timing(response.headers["Server-Timing"])
+    assert "total" in stages
+    assert len(stages) > 1
+    assert all(milliseconds >= 0 for milliseconds in stages.values())
+
+
+def test_failed_searches_send_server_timing(client):
+    """A search that finds no route still reports where its time went."""
+    response = client.get("/route/find", params={"origin": "Nowhere",
+                                                  "destination": "Station 14"})
+    assert response.status_code == 404
+    assert "total" in server_timing(response.headers["Server-Timing"])
+
+
+def test_metrics_exposition(client):
+    """/metrics describes every metric and counts requests per endpoint template."""
+    for _ in range(3):
+        client.get("/route/find", params=SEARCH)
+    client.get("/station/by_name/Station 19")
+    client.get("/station/by_name/Station 14")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    for name, kind in (("smartcommute_http_request_duration_seconds", "histogram"),
+                       ("smartcommute_search_stage_duration_seconds", "histogram"),
+                       ("smartcommute_search_candidates_total", "counter"),
+                       ("smartcommute_data_version", "gauge")):
+        assert f"# HELP {name} " in text
+        assert f"# TYPE {name} {kind}" in text
+
+    counts = samples(text, "smartcommute_http_request_duration_seconds_count")
+    assert counts['{method="GET",endpoint="/route/find",status="200"}'] == 3
+    assert counts['{method="GET",endpoint="/station/by_name/{name}",status="200"}'] == 2
+    buckets = samples(text, "smartcommute_http_request_duration_seconds_bucket")
+    route_find = [value for labels, value in buckets.items()
+                  if 'endpoint="/route/find"' in labels]
+    assert route_find == sorted(route_find)
+    assert route_find[-1] == 3
+    assert '{method="GET",endpoint="/route/find",status="200",le="+Inf"}' in buckets
+
+    stages = samples(text, "smartcommute_search_stage_duration_seconds_count")
+    assert stages['{optimization="min_stations",stage="total"}'] == 3
+
+
+def test_disabled_metrics(client, monkeypatch):
+    """With METRICS_ENABLED at 0, searches send no Server-Timing and /metrics is gone."""
+    monkeypatch.setenv("METRICS_ENABLED", "0")
+    dependencies.get_metrics.cache_clear()
+    response = client.get("/route/find", params=SEARCH)
+    assert response.status_code == 200
+    assert "Server-Timing" not in response.headers
+    assert client.get("/metrics").status_code == 404
+
+
+def test_histogram_buckets_are_cumulative():
+    """Observations count in their bucket and every larger one, plus +Inf."""
+    histogram = Histogram("latency_seconds", "Latency.", ("endpoint",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value, "/a")
+    histogram.observe(0.2, 'say "hi"\n')
+    assert histogram.samples() == [
+        'latency_seconds_bucket{endpoint="/a",le="0.1"} 2',
+        'latency_seconds_bucket{endpoint="/a",le="1.0"} 3',
+        'latency_seconds_bucket{endpoint="/a",le="+Inf"} 4',
+        'latency_seconds_sum{endpoint="/a"} 2.65',
+        'latency_seconds_count{endpoint="/a"} 4',
+        'latency_seconds_bucket{endpoint="say \\"hi\\"\\n",le="0.1"} 0',
+        'latency_seconds_bucket{endpoint="say \\"hi\\"\\n",le="1.0"} 1',
+        'latency_seconds_bucket{endpoint="say \\"hi\\"\\n",le="+Inf"} 1',
+        'latency_seconds_sum{endpoint="say \\"hi\\"\\n"} 0.2',
+        'latency_seconds_count{endpoint="say \\"hi\\"\\n"} 1'
+    ]
+
+
+def test_counters_and_gauges():
+    """Counters add up per label set and gauges keep the last value."""
+    counter = Counter("requests_total", "Requests.", ("outcome",))
+    counter.inc("success")
+    counter.inc("success", amount=2)
+    counter.inc("failure")
+    assert counter.samples() == ['requests_total{outcome="success"} 3',
+                                 'requests_total{outcome="failure"} 1']
+    gauge = Gauge("version", "Version.")
+    gauge.set(4)
+    gauge.set(2)
+    assert gauge.samples() == ["version 2"]
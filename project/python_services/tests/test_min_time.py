@@ -0,0 +1,211 @@
+"""This module checks the earliest-arrival search against a brute-force
+search over every trip.
+
+Author: Juan Esteban Bedoya <jebedoyal@udistrital.edu.co>
+
+This file is part of SmartCommute project.
+
+SmartCommute is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+SmartCommute is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
+"""
+
+import os
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+import pytest
+from repositories.route import RouteRepository # pylint: disable=import-error
+from repositories.station import StationRepository # pylint: disable=import-error
+from services.travel.compact_network import CompactNetwork # pylint: disable=import-error
+from services.travel.earliest_arrival import ( # pylint: disable=import-error
+    EarliestArrivalRouter, MIN_TRANSFER_SECONDS, TimedJourney
+)
+from services.travel.timetable import Timetable # pylint: disable=import-error
+from services.travel_finder import TravelFinder # pylint: disable=import-error
+from tests.conftest import DATA_DIR
+
+# pylint: disable=redefined-outer-name
+
+def offsets(network: CompactNetwork, timetable: Timetable, route: int,
+            reverse: bool) -> List[int]:
+    """
+    Lists the seconds from the start of a trip to each stop of a route.
+
+    Args:
+        network (CompactNetwork): The network.
+        timetable (Timetable): Its timetable.
+        route (int): The route ID.
+        reverse (bool): Whether the trips leave the last stop.
+
+    Returns:
+        List[int]: The seconds to each stop, in stop order.
+    """
+    first = network.stop_offsets[route]
+    times = list(timetable.stop_times[first:first + network.route_length(route)])
+    return [times[-1] - time for time in times] if reverse else times
+
+
+# pylint: disable-next=too-many-arguments,too-many-positional-arguments,too-many-locals
+def brute_force(
+    network: CompactNetwork,
+    timetable: Timetable,
+    origin: int,
+    destination: int,
+    weekday: int,
+    start: int,
+    max_transfers: int
+) -> List[Tuple[int, int]]:
+    """
+    Finds the earliest arrival with each number of transfers by boarding the
+    first trip of every route from every station reached with fewer rides.
+
+    Args:
+        network (CompactNetwork): The network.
+        timetable (Timetable): Its timetable.
+        origin (int): The origin station ID.
+        destination (int): The destination station ID.
+        weekday (int): The weekday of the departure.
+        start (int): The departure, in seconds after midnight.
+        max_transfers (int): The maximum number of transfers.
+
+    Returns:
+        List[Tuple[int, int]]: The Pareto-optimal (transfers, arrival) pairs.
+    """
+    labels: Dict[int, int] = {origin: start}
+    pareto: List[Tuple[int, int]] = []
+    for transfers in range(max_transfers + 1): # pylint: disable=too-many-nested-blocks
+        improved = dict(labels)
+        for route in range(len(network.route_names)):
+            stops = network.route_stops(route).tolist()
+            for reverse in (False, True) if network.bidirectional[route] else (False,):
+                times = offsets(network, timetable, route, reverse)
+                for board, station in enumerate(stops):
+                    if station not in labels:
+                        continue
+                    ready = labels[station] + (0 if station == origin else MIN_TRANSFER_SECONDS)
+                    trip = timetable.next_departure(route, weekday, ready - times[board])
+                    if trip is None:
+                        continue
+                    after = range(board - 1, -1, -1) if reverse else range(board + 1, len(stops))
+                    for alight in after:
+                        arrival = trip + times[alight]
+                        if arrival < improved.get(stops[alight], float("inf")):
+                            improved[stops[alight]] = arrival
+        labels = improved
+        if destination in labels and destination != origin \
+                and (not pareto or labels[destination] < pareto[-1][1]):
+            pareto.append((transfers, labels[destination]))
+    return pareto
+
+
+# pylint: disable-next=too-many-arguments,too-many-positional-arguments,too-many-locals
+def check_legs(network: CompactNetwork, timetable: Timetable, journey: TimedJourney,
+               origin: int, destination: int, weekday: int, start: int):
+    """
+    Checks that every leg rides a trip of its route that can be caught after
+    the previous leg and the transfer time.
+
+    Args:
+        network (CompactNetwork): The network.
+        timetable (Timetable): Its timetable.
+        journey (TimedJourney): The journey to check.
+        origin (int): The origin station ID.
+        destination (int): The destination station ID.
+        weekday (int): The weekday of the departure.
+        start (int): The departure, in seconds after midnight.
+    """
+    assert len(journey.legs) == journey.transfers + 1
+    station, ready = origin, start
+    for leg in journey.legs:
+        assert leg.board == station
+        assert leg.departure >= ready
+        stops = network.route_stops(leg.route).tolist()
+        rides = []
+        for reverse in (False, True) if network.bidirectional[leg.route] else (False,):
+            times = offsets(network, timetable, leg.route, reverse)
+            for board, alight in ((board, alight) for board in range(len(stops))
+                                  for alight in range(len(stops))):
+                if stops[board] == leg.board and stops[alight] == leg.alight \
+                        and (alight < board if reverse else alight > board) \
+                        and abs(alight - board) == leg.stations:
+                    trip = leg.departure - times[board]
+                    rides.append(timetable.next_departure(leg.route, weekday, trip) == trip
+                                 and leg.arrival == trip + times[alight])
+        assert any(rides), leg
+        station, ready = leg.alight, leg.arrival + MIN_TRANSFER_SECONDS
+    assert station == destination
+    assert journey.legs[-1].arrival == journey.arrival
+
+
+def test_search_finds_the_earliest_arrivals(network_snapshot):
+    """Every journey rides real trips and the arrivals match the brute force."""
+    network = network_snapshot.network
+    timetable = network_snapshot.timetable
+    router = EarliestArrivalRouter()
+    rng = random.Random(5)
+    found = 0
+    for _ in range(250):
+        origin, destination = rng.sample(range(network.listed_stations), 2)
+        weekday = rng.randrange(7)
+        start = rng.randrange(24 * 3600)
+        max_transfers = rng.randrange(4)
+        journeys = router.search(network, timetable, origin, destination, weekday, start,
+                                 max_transfers)
+        for journey in journeys:
+            check_legs(network, timetable, journey, origin, destination, weekday, start)
+        assert [(journey.transfers, journey.arrival) for journey in journeys] \
+            == brute_force(network, timetable, origin, destination, weekday, start,
+                           max_transfers), (origin, destination, weekday, start)
+        found += bool(journeys)
+    assert found > 150
+
+
+@pytest.fixture(scope="module")
+def finder() -> TravelFinder:
+    """
+    Builds a travel finder over the sample data files.
+
+    Returns:
+        TravelFinder: The travel finder.
+    """
+    return TravelFinder(RouteRepository(os.path.join(DATA_DIR, "routes.json"), 0),
+                        StationRepository(os.path.join(DATA_DIR, "stations.json"), 0))
+
+
+@pytest.mark.parametrize("departure", [
+    datetime(2026, 10, 19, 8, 0), datetime(2026, 10, 19, 23, 30),
+    datetime(2026, 10, 24, 12, 17, 45)
+])
+def test_min_time_result(finder, departure):
+    """The result lists the waits and times of every segment, earliest last."""
+    result = finder.find_routes("Station 19", "Station 14", "min_time", departure=departure)
+    options = result["routes"]
+    assert options
+    arrivals = [datetime.fromisoformat(option["arrival_time"]) for option in options]
+    assert arrivals == sorted(arrivals, reverse=True)
+    assert [option["transfers"] for option in options] \
+        == sorted(option["transfers"] for option in options)
+    for option in options:
+        segments = option["details"]["segments"]
+        assert len(segments) == option["transfers"] + 1
+        assert option["route"] == " + ".join(segment["route"] for segment in segments)
+        assert option["stations_traveled"] \
+            == sum(segment["intermediate_stations"] for segment in segments)
+        ready = departure.replace(second=0)
+        for index, segment in enumerate(segments):
+            leaves = datetime.fromisoformat(segment["departure_time"])
+            assert leaves >= ready + timedelta(seconds=MIN_TRANSFER_SECONDS if index else 0)
+            ready = datetime.fromisoformat(segment["arrival_time"])
+        assert ready == datetime.fromisoformat(option["arrival_time"])
+        assert option["travel_minutes"] == (ready - departure.replace(second=0)) \
+            / timedelta(minutes=1)
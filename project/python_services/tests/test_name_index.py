@@ -0,0 +1,147 @@
+"""This module checks the search of stations and routes by name.
+
+Author: Juan Esteban Bedoya <jebedoyal@udistrital.edu.co>
+
+This file is part of SmartCommute project.
+
+SmartCommute is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+SmartCommute is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
+"""
+
+from typing import List
+import pytest
+from repositories.name_index import NameIndex, fold_name # pylint: disable=import-error
+
+# pylint: disable=redefined-outer-name
+
+NAMES = [
+    "Portal Américas", "Américas - Av. Boyacá", "Avenida Jiménez", "Calle 26",
+    "Calle 100", "Héroes", "Ricaurte", "Museo Nacional", "Portal Norte", "Marly",
+    "Calle 19", "Av. Chile"
+]
+
+@pytest.fixture
+def loaded() -> List[int]:
+    """
+    Records the positions the index loads.
+
+    Returns:
+        List[int]: The loaded positions, in load order.
+    """
+    return []
+
+
+@pytest.fixture
+def index(loaded) -> NameIndex[str]:
+    """
+    Builds an index over NAMES that loads each name by position.
+
+    Returns:
+        NameIndex[str]: The index.
+    """
+    def load(position: int) -> str:
+        loaded.append(position)
+        return NAMES[position]
+
+    return NameIndex(NAMES, load)
+
+
+def test_names_are_folded():
+    """Accents, case and repeated whitespace are ignored."""
+    assert fold_name("  Américas -  Av. BOYACÁ ") == "americas - av. boyaca"
+    assert fold_name("Ñ") == "n"
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("Calle 26", ["Calle 26"]),
+    # Exact, then name prefix, shorter names first.
+    ("calle", ["Calle 19", "Calle 26", "Calle 100"]),
+    # Name prefix before word prefix.
+    ("americas", ["Américas - Av. Boyacá", "Portal Américas"]),
+    # Word prefix before any other substring.
+    ("1", ["Calle 19", "Calle 100"]),
+    ("nal", ["Museo Nacional"]),
+    ("HÉROES", ["Héroes"]),
+    ("jimenez", ["Avenida Jiménez"]),
+    ("  portal   NORTE ", ["Portal Norte"]),
+    ("portal nrte", []),
+    ("calle 26 sur", [])
+])
+def test_substring_ranking(index, query, expected):
+    """Matches are ranked exact, name prefix, word prefix, then other substrings."""
+    assert index.search(query, 10) == expected
+
+
+def test_prefix_mode_drops_inner_substrings(index):
+    """Prefix searches only return names or words starting with the query."""
+    assert index.search("nal", 10, "prefix") == []
+    assert index.search("americas", 10, "prefix") == ["Américas - Av. Boyacá", "Portal Américas"]
+    assert index.search("ch", 10, "prefix") == ["Av. Chile"]
+
+
+def test_fuzzy_mode_tolerates_typos(index):
+    """Fuzzy searches add names sharing most trigrams, most similar first."""
+    assert index.search("portal nrte", 10, "fuzzy") == ["Portal Norte", "Portal Américas"]
+    assert index.search("portal nrte", 1, "fuzzy") == ["Portal Norte"]
+    # Substring matches come first and are not repeated.
+    assert index.search("portal", 10, "fuzzy") == ["Portal Norte", "Portal Américas"]
+    # Queries shorter than FUZZY_MIN_LENGTH are not matched fuzzily.
+    assert index.search("mrl", 10, "fuzzy") == []
+
+
+def test_limit(index, loaded):
+    """At most `limit` items are returned, and only those are loaded."""
+    assert len(index.search("a", 3)) == 3
+    assert len(loaded) == 3
+    assert index.search("a", 0) == []
+    assert len(index.search("a", 100)) == len([name for name in NAMES if "a" in fold_name(name)])
+
+
+@pytest.mark.parametrize("query", ["", "   ", "\t", "w", "qx"])
+def test_empty_and_unmatched_queries(index, loaded, query):
+    """Empty queries and queries found in no name return nothing."""
+    assert index.search(query, 10) == []
+    assert index.search(query, 10, "fuzzy") == []
+    assert not loaded
+
+
+def test_route_by_name(client):
+    """The route endpoint returns whole routes, best match first."""
+    response = client.get("/route/by_name/f23", params={"match": "prefix"})
+    assert response.status_code == 200
+    routes = response.json()
+    assert [route["name"] for route in routes] == ["Route F23"]
+    assert set(routes[0]) == {"id", "name", "schedule", "stations", "run_times"}
+    names = [route["name"] for route in client.get("/route/by_name/ROUTE",
+                                                   params={"limit": 3}).json()]
+    assert names == ["Route 1", "Route 2", "Route 3"]
+
+
+def test_station_by_name(client):
+    """The station endpoint ranks the exact match first and honours the limit."""
+    response = client.get("/station/by_name/station 1", params={"limit": 4})
+    assert response.status_code == 200
+    assert [station["name"] for station in response.json()] \
+        == ["Station 10", "Station 11", "Station 12", "Station 13"]
+    stations = client.get("/station/by_name/STATIÓN 07").json()
+    assert [station["name"] for station in stations] == ["Station 07"]
+    assert stations[0]["id"] == "S07"
+    assert client.get("/station/by_name/%20").json() == []
+    assert client.get("/station/by_name/statoin 07", params={"match": "fuzzy"}).json()
+
+
+@pytest.mark.parametrize("path", ["/route/by_name/a", "/station/by_name/a"])
+@pytest.mark.parametrize("params", [{"limit": 0}, {"limit": 101}, {"match": "exact"}])
+def test_by_name_parameters_are_checked(client, path, params):
+    """The limit and the match mode are validated."""
+    assert client.get(path, params=params).status_code == 422
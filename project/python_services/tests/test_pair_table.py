@@ -0,0 +1,202 @@
+"""This module checks the table of precomputed journeys of every station
+pair against the live search.
+
+Author: Juan Esteban Bedoya <jebedoyal@udistrital.edu.co>
+
+This file is part of SmartCommute project.
+
+SmartCommute is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+SmartCommute is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
+"""
+
+import os
+from datetime import datetime, timedelta
+from itertools import permutations
+from typing import List
+import pytest
+from repositories.route import RouteRepository # pylint: disable=import-error
+from repositories.station import StationRepository # pylint: disable=import-error
+from services.travel import pair_table # pylint: disable=import-error
+from services.travel.data_preparer import DataPreparer # pylint: disable=import-error
+from services.travel.pair_table import PairTable # pylint: disable=import-error
+from services.travel.route_processor import RouteProcessor # pylint: disable=import-error
+from services.travel_finder import TravelFinder # pylint: disable=import-error
+from tests.conftest import remove_stop
+
+# pylint: disable=redefined-outer-name
+
+# Every three hours of a week, Monday 2026-10-19 first.
+DEPARTURES = [datetime(2026, 10, 19, 0, 17) + timedelta(hours=hour)
+              for hour in range(0, 7 * 24, 3)]
+STATIONS = ["Station 02", "Station 05", "Station 11", "Station 14", "Station 16",
+            "Station 19", "Station 22", "Station 24"]
+
+def search_all(finder: TravelFinder, departures: List[datetime], limit: int = 5) -> list:
+    """
+    Runs the strategies the table serves between the sample stations.
+
+    Args:
+        finder (TravelFinder): The travel finder.
+        departures (List[datetime]): The departures to search at.
+        limit (int): The number of routes returned.
+
+    Returns:
+        list: The results, in search order.
+    """
+    return [
+        finder.find_routes(origin, destination, optimization, departure=departure, limit=limit)
+        for origin, destination in permutations(STATIONS, 2)
+        for optimization in ("min_stations", "min_transfers")
+        for departure in departures
+    ]
+
+
+def table_finder(data_files, path: str, windows: int = 8, max_stations: int = 200) -> TravelFinder:
+    """
+    Builds a travel finder with a pair table and waits until the table is
+    attached.
+
+    Args:
+        data_files (Tuple[str, str]): The paths of the data files.
+        path (str): The path of the table file.
+        windows (int): The number of schedule windows precomputed.
+        max_stations (int): The most listed stations a table is built for.
+
+    Returns:
+        TravelFinder: The travel finder.
+    """
+    finder = TravelFinder(RouteRepository(data_files[0], 0), StationRepository(data_files[1], 0),
+                          pair_table_path=path, pair_table_windows=windows,
+                          pair_table_max_stations=max_stations)
+    if finder.pair_table_build is not None:
+        finder.pair_table_build.join()
+    return finder
+
+
+@pytest.fixture
+def live(data_files) -> TravelFinder:
+    """
+    Builds a travel finder without a pair table.
+
+    Returns:
+        TravelFinder: The travel finder.
+    """
+    return TravelFinder(RouteRepository(data_files[0], 0), StationRepository(data_files[1], 0))
+
+
+def test_table_holds_the_live_journeys(live, tmp_path):
+    """Every pair and window of the table holds what RouteProcessor finds."""
+    snapshot = live.snapshots.current()
+    path = str(tmp_path / "pairs.table")
+    PairTable.build(snapshot, path, 8)
+    table = PairTable(path)
+    network = snapshot.network
+    windows = snapshot.schedules.windows()
+    assert len(table.windows) == min(8, len(windows))
+    assert table.stations == network.listed_stations
+    processor = RouteProcessor()
+    for mask in table.windows:
+        for origin in range(network.listed_stations):
+            for destination in range(network.listed_stations):
+                assert table.lookup(mask, origin, destination) == (
+                    processor.process_direct_routes(origin, destination, network, mask),
+                    processor.process_transfers(origin, destination, network, mask)
+                )
+
+
+def test_lookup_outside_the_table(live, tmp_path):
+    """Windows and stations the table does not hold are not found."""
+    snapshot = live.snapshots.current()
+    path = str(tmp_path / "pairs.table")
+    PairTable.build(snapshot, path, 1)
+    table = PairTable(path)
+    (mask,) = table.windows
+    other = next(window for window in snapshot.schedules.windows() if window != mask)
+    assert table.lookup(other, 0, 1) is None
+    assert table.lookup(mask, table.stations, 0) is None
+    assert table.lookup(mask, 0, table.stations) is None
+    assert table.lookup(mask, 0, 1) is not None
+
+
+@pytest.mark.parametrize("windows", [1, 8])
+def test_finder_results_match_the_live_search(live, data_files, tmp_path, windows):
+    """Results are the live ones, with pairs in the table or searched live."""
+    finder = table_finder(data_files, str(tmp_path / "pairs.table"), windows)
+    assert finder.snapshots.current().pairs is not None
+    assert search_all(finder, DEPARTURES) == search_all(live, DEPARTURES)
+    # Larger limits than the table keeps are searched live.
+    assert search_all(finder, DEPARTURES[::4], 9) == search_all(live, DEPARTURES[::4], 9)
+
+
+def test_table_answers_without_searching(live, data_files, tmp_path, monkeypatch):
+    """Pairs in the table are answered by a lookup, without any route search."""
+    finder = table_finder(data_files, str(tmp_path / "pairs.table"))
+    table = finder.snapshots.current().pairs
+    departures = [departure for departure in DEPARTURES
+                  if finder.snapshots.current().schedules.active_routes(departure)
+                  in table.windows]
+    assert departures
+    expected = search_all(live, departures)
+
+    def search(*_, **__):
+        raise AssertionError("The pair was searched live.")
+
+    monkeypatch.setattr(RouteProcessor, "process_direct_routes", search)
+    monkeypatch.setattr(RouteProcessor, "process_transfers", search)
+    assert search_all(finder, departures) == expected
+
+
+def test_table_of_other_data_is_rebuilt(data_files, tmp_path):
+    """A table is only used for the data it was built from."""
+    path = str(tmp_path / "pairs.table")
+    finder = table_finder(data_files, path)
+    fingerprint = PairTable(path).fingerprint
+    # Route 2 no longer reaches Station 14.
+    remove_stop(data_files[0], 1, "Station 14")
+    snapshot = DataPreparer(RouteRepository(data_files[0], 0),
+                            StationRepository(data_files[1], 0)).build_snapshot()
+    assert PairTable.load(snapshot, path, 8) is None
+    # Fewer windows than asked for do not match either.
+    assert PairTable.load(finder.snapshots.current(), path, 9) is not None
+    assert PairTable.load(finder.snapshots.current(), path, 2) is None
+
+    finder.reload(RouteRepository(data_files[0], 0), StationRepository(data_files[1], 0))
+    finder.pair_table_build.join()
+    assert PairTable(path).fingerprint != fingerprint
+    live = TravelFinder(RouteRepository(data_files[0], 0), StationRepository(data_files[1], 0))
+    assert finder.snapshots.current().pairs is not None
+    assert search_all(finder, DEPARTURES[::2]) == search_all(live, DEPARTURES[::2])
+
+
+def test_large_networks_are_refused(live, data_files, tmp_path):
+    """No table is built above `max_stations`, and searches run live."""
+    path = str(tmp_path / "pairs.table")
+    with pytest.raises(ValueError, match="more than the 5"):
+        PairTable.build(live.snapshots.current(), path, 8, max_stations=5)
+    finder = table_finder(data_files, path, max_stations=5)
+    assert finder.snapshots.current().pairs is None
+    assert not os.path.exists(path)
+    assert search_all(finder, DEPARTURES[::4]) == search_all(live, DEPARTURES[::4])
+
+
+def test_other_files_are_not_loaded(live, tmp_path, monkeypatch):
+    """Files that are not a table of this version are ignored."""
+    snapshot = live.snapshots.current()
+    path = str(tmp_path / "pairs.table")
+    with open(path, "wb") as file:
+        file.write(b"not a table" * 10)
+    assert PairTable.load(snapshot, path, 8) is None
+    assert PairTable.load(snapshot, str(tmp_path / "missing.table"), 8) is None
+    PairTable.build(snapshot, path, 8)
+    monkeypatch.setattr(pair_table, "FORMAT_VERSION", pair_table.FORMAT_VERSION + 1)
+    assert PairTable.load(snapshot, path, 8) is None
@@ -0,0 +1,95 @@
+"""This module checks the "min_stations" and "min_transfers" results
+against the ones of the original travel planner.
+
+The expected results in data/parity.json were produced by the planner
+before it was moved to the compact network, on the sample data files at
+the departure times of the keys. That planner broke ties between journeys
+of equal cost in set iteration order, which changes between processes, so
+for each result the file keeps the cost of every journey returned and the
+routes of every journey costing less than the last one.
+
+Author: Juan Esteban Bedoya <jebedoyal@udistrital.edu.co>
+
+This file is part of SmartCommute project.
+
+SmartCommute is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+SmartCommute is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
+"""
+
+import json
+import os
+from datetime import datetime
+import pytest
+from repositories.route import RouteRepository # pylint: disable=import-error
+from repositories.station import StationRepository # pylint: disable=import-error
+from services.travel_finder import TravelFinder # pylint: disable=import-error
+from tests.conftest import DATA_DIR
+
+# pylint: disable=redefined-outer-name
+
+with open(os.path.join(DATA_DIR, "parity.json"), encoding="utf-8") as expected_file:
+    EXPECTED = json.load(expected_file)
+
+
+def summarize(result: dict) -> dict:
+    """
+    Reduces a result to the parts the original planner fixed.
+
+    Args:
+        result (dict): A result of `TravelFinder.find_routes`.
+
+    Returns:
+        dict: The error, or the cost of every journey and the routes of the
+            journeys cheaper than the last one.
+    """
+    if "error" in result:
+        return {"error": result["error"]}
+    costs = [[option["transfers"], option["stations_traveled"]] for option in result["routes"]]
+    return {
+        "costs": costs,
+        "routes": sorted(
+            option["route"] for option, cost in zip(result["routes"], costs) if cost != costs[-1]
+        )
+    }
+
+
+@pytest.fixture(scope="module")
+def finder() -> TravelFinder:
+    """
+    Builds a travel finder over the sample data files.
+
+    Returns:
+        TravelFinder: The travel finder.
+    """
+    return TravelFinder(RouteRepository(os.path.join(DATA_DIR, "routes.json"), 0),
+                        StationRepository(os.path.join(DATA_DIR, "stations.json"), 0))
+
+
+@pytest.mark.parametrize("key", sorted(EXPECTED))
+def test_results_match_the_original_planner(finder, key):
+    """The costs and routes of every sampled pair are unchanged."""
+    moment, optimization = key.split()
+    departure = datetime.fromisoformat(moment)
+    for pair, expected in EXPECTED[key].items():
+        origin, destination = pair.split("|")
+        result = finder.find_routes(origin, destination, optimization, departure=departure)
+        assert summarize(result) == expected, pair
+
+
+def test_results_are_deterministic(finder):
+    """Ties are broken the same way in every search."""
+    departure = datetime(2026, 10, 19, 8, 0)
+    for pair in EXPECTED["2026-10-19T08:00 min_stations"]:
+        origin, destination = pair.split("|")
+        first = finder.find_routes(origin, destination, departure=departure)
+        assert finder.find_routes(origin, destination, departure=departure) == first
@@ -0,0 +1,160 @@
+"""This module checks the round-based multi-transfer search against an
+exhaustive search.
+
+Author: Juan Esteban Bedoya <jebedoyal@udistrital.edu.co>
+
+This file is part of SmartCommute project.
+
+SmartCommute is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+SmartCommute is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
+"""
+
+import random
+from typing import Callable, Dict, List, Tuple
+import pytest
+from services.travel.compact_network import CompactNetwork # pylint: disable=import-error
+from services.travel.raptor import RaptorRouter # pylint: disable=import-error
+
+# pylint: disable=redefined-outer-name
+
+def exhaustive_pareto( # pylint: disable=too-many-locals
+    network: CompactNetwork,
+    origin: int,
+    destination: int,
+    is_active: Callable[[int], bool],
+    max_transfers: int
+) -> List[Tuple[int, int]]:
+    """
+    Finds the fewest stations traveled with each number of transfers by
+    trying every ride from every station reached in the previous round.
+
+    Args:
+        network (CompactNetwork): The network to search.
+        origin (int): The origin station ID.
+        destination (int): The destination station ID.
+        is_active (Callable[[int], bool]): Tells whether a route can be used.
+        max_transfers (int): The maximum number of transfers.
+
+    Returns:
+        List[Tuple[int, int]]: The Pareto-optimal (transfers, stations) pairs.
+    """
+    labels: Dict[int, int] = {origin: 0}
+    pareto: List[Tuple[int, int]] = []
+    for transfers in range(max_transfers + 1):
+        improved = dict(labels)
+        for route in range(len(network.route_names)):
+            if not is_active(route):
+                continue
+            stops = network.route_stops(route).tolist()
+            for board, station in enumerate(stops):
+                if station not in labels or route not in network.routes_at(station):
+                    continue
+                for alight, target in enumerate(stops):
+                    if alight == board or alight < board and not network.bidirectional[route]:
+                        continue
+                    stations = labels[station] + abs(alight - board)
+                    if stations < improved.get(target, float("inf")):
+                        improved[target] = stations
+        labels = improved
+        if destination in labels and (not pareto or labels[destination] < pareto[-1][1]):
+            pareto.append((transfers, labels[destination]))
+    return pareto
+
+
+def check_legs(network: CompactNetwork, journey, origin: int, destination: int):
+    """
+    Checks that the legs of a journey ride their routes from the origin to
+    the destination and add up to its stations and transfers.
+
+    Args:
+        network (CompactNetwork): The network searched.
+        journey (Journey): The journey to check.
+        origin (int): The origin station ID.
+        destination (int): The destination station ID.
+    """
+    assert len(journey.legs) == journey.transfers + 1
+    assert sum(leg.stations for leg in journey.legs) == journey.stations
+    station = origin
+    for leg in journey.legs:
+        assert leg.board == station
+        stops = network.route_stops(leg.route).tolist()
+        assert leg.board in stops and leg.alight in stops
+        station = leg.alight
+    assert station == destination
+
+
+@pytest.fixture(scope="module")
+def queries(network_snapshot) -> List[Tuple[int, int, int]]:
+    """
+    Draws the origin, destination and maximum transfers of the searches,
+    and adds the stations at the ends of each route.
+
+    Returns:
+        List[Tuple[int, int, int]]: The queries.
+    """
+    rng = random.Random(1)
+    network = network_snapshot.network
+    listed = network.listed_stations
+    drawn = [(*rng.sample(range(listed), 2), rng.randrange(4)) for _ in range(300)]
+    # Stations next to each other and at both ends of a route, which the
+    # backward round marks or leaves out by one stop.
+    for route in range(len(network.route_names)):
+        stops = network.route_stops(route).tolist()
+        for origin, destination in ((stops[0], stops[1]), (stops[1], stops[0]),
+                                    (stops[0], stops[-1]), (stops[-1], stops[0])):
+            if origin != destination and max(origin, destination) < listed:
+                drawn.append((origin, destination, 0))
+    return drawn
+
+
+@pytest.mark.parametrize("meet_in_the_middle", [True, False])
+def test_search_finds_the_pareto_set(network_snapshot, queries, meet_in_the_middle):
+    """Every journey is valid and the costs match the exhaustive search."""
+    network = network_snapshot.network
+    router = RaptorRouter(meet_in_the_middle)
+    inactive = set(random.Random(2).sample(range(len(network.route_names)), 5))
+    for is_active in (lambda route: True, lambda route: route not in inactive):
+        for origin, destination, max_transfers in queries:
+            journeys = router.search(network, origin, destination, is_active, max_transfers)
+            for journey in journeys:
+                check_legs(network, journey, origin, destination)
+                assert all(is_active(leg.route) for leg in journey.legs)
+            assert [(journey.transfers, journey.stations) for journey in journeys] \
+                == exhaustive_pareto(network, origin, destination, is_active, max_transfers)
+
+
+def test_meet_in_the_middle_finds_the_same_journeys(network_snapshot, queries):
+    """Marking the stations near the destination first changes no result."""
+    network = network_snapshot.network
+    pruned = RaptorRouter()
+    full = RaptorRouter(meet_in_the_middle=False)
+    for origin, destination, max_transfers in queries:
+        for transfers in range(max_transfers, max_transfers + 3):
+            assert pruned.search(network, origin, destination, lambda route: True, transfers) \
+                == full.search(network, origin, destination, lambda route: True, transfers)
+
+
+def test_unreachable_destination(network_snapshot):
+    """No journey is found when no route runs."""
+    assert not RaptorRouter().search(network_snapshot.network, 0, 1, lambda route: False, 3)
+
+
+def test_reach_matches_search(network_snapshot):
+    """The stations reached from an origin have the Pareto sets of searches."""
+    network = network_snapshot.network
+    router = RaptorRouter(meet_in_the_middle=False)
+    reached = router.reach(network, 0, lambda route: True, 2)
+    for station in range(1, network.listed_stations):
+        journeys = router.search(network, 0, station, lambda route: True, 2)
+        assert [(reach.transfers, reach.stations) for reach in reached.get(station, [])] \
+            == [(journey.transfers, journey.stations) for journey in journeys]
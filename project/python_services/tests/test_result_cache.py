@@ -0,0 +1,146 @@
+"""This module checks the result cache and the keys the travel finder
+stores its results under.
+
+Author: Juan Esteban Bedoya <jebedoyal@udistrital.edu.co>
+
+This file is part of SmartCommute project.
+
+SmartCommute is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+SmartCommute is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
+"""
+
+from datetime import datetime
+from typing import Hashable, List
+import pytest
+from repositories.route import RouteRepository # pylint: disable=import-error
+from repositories.station import StationRepository # pylint: disable=import-error
+from services.travel import result_cache # pylint: disable=import-error
+from services.travel.result_cache import LRUResultCache # pylint: disable=import-error
+from services.travel_finder import TravelFinder # pylint: disable=import-error
+from tests.conftest import remove_stop
+
+# pylint: disable=redefined-outer-name
+
+# F23 and K16 only run from 10:00 to 14:00, the other weekday routes from
+# 05:00 to 22:00.
+MORNING = datetime(2026, 10, 19, 8, 0)
+LATER_MORNING = datetime(2026, 10, 19, 9, 30)
+MIDDAY = datetime(2026, 10, 19, 11, 0)
+
+class RecordingCache(LRUResultCache):
+    """An in-process cache that remembers the keys results are stored under."""
+
+    def __init__(self):
+        super().__init__(100, 0)
+        self.keys: List[Hashable] = []
+
+    def set(self, key: Hashable, result: dict):
+        self.keys.append(key)
+        super().set(key, result)
+
+
+@pytest.fixture
+def finder(data_files) -> TravelFinder:
+    """
+    Builds a travel finder with a recording cache over copies of the sample
+    data files.
+
+    Returns:
+        TravelFinder: The travel finder.
+    """
+    routes_path, stations_path = data_files
+    return TravelFinder(RouteRepository(routes_path, 0), StationRepository(stations_path, 0),
+                        RecordingCache())
+
+
+def test_least_recently_used_results_are_evicted():
+    """The cache keeps the results read or written last."""
+    cache = LRUResultCache(2, 0)
+    cache.set("a", {"a": 1})
+    cache.set("b", {"b": 2})
+    assert cache.get("a") == {"a": 1}
+    cache.set("c", {"c": 3})
+    assert cache.get("b") is None
+    assert cache.get("a") == {"a": 1}
+    assert cache.get("c") == {"c": 3}
+    stats = cache.stats()
+    assert (stats["size"], stats["hits"], stats["misses"], stats["evictions"]) == (2, 3, 1, 1)
+    assert stats["hit_ratio"] == 0.75
+    cache.clear()
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_results_expire(monkeypatch):
+    """A result is no longer found after its time to live."""
+    now = [1000.0]
+    monkeypatch.setattr(result_cache.time, "monotonic", lambda: now[0])
+    cache = LRUResultCache(10, 30)
+    cache.set("a", {"a": 1})
+    now[0] += 29
+    assert cache.get("a") == {"a": 1}
+    now[0] += 1
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_departures_with_the_same_routes_running_share_the_result(finder):
+    """The key holds the running routes instead of the departure time."""
+    first = finder.find_routes("Station 19", "Station 14", departure=MORNING)
+    assert finder.find_routes("Station 19", "Station 14", departure=LATER_MORNING) is first
+    assert finder.result_cache.keys == [finder.result_cache.keys[0]]
+    finder.find_routes("Station 19", "Station 14", departure=MIDDAY)
+    assert len(finder.result_cache.keys) == 2
+    assert finder.result_cache.stats()["hits"] == 1
+
+
+def test_search_options_are_part_of_the_key(finder):
+    """Results differing in any search option are stored apart."""
+    searches = [
+        {"optimization": "min_stations"},
+        {"optimization": "min_transfers"},
+        {"optimization": "min_stations", "limit": 2},
+        {"optimization": "multi_transfer", "max_transfers": 1},
+        {"optimization": "multi_transfer", "max_transfers": 2},
+        {"optimization": "min_time"},
+        {"optimization": "min_time", "departure": LATER_MORNING}
+    ]
+    for search in searches:
+        finder.find_routes("Station 19", "Station 14", **{"departure": MORNING, **search})
+    keys = finder.result_cache.keys
+    assert len(set(keys)) == len(searches)
+    # Options a strategy does not use do not split its entries.
+    finder.find_routes("Station 19", "Station 14", "min_stations", max_transfers=1,
+                       departure=MORNING)
+    finder.find_routes("Station 19", "Station 14", "multi_transfer", max_transfers=1,
+                       departure=MORNING, limit=2)
+    assert finder.result_cache.keys == keys
+    # The departure minute is kept for time-dependent strategies only.
+    finder.find_routes("Station 19", "Station 14", "min_time",
+                       departure=MORNING.replace(second=40))
+    assert finder.result_cache.keys == keys
+
+
+def test_reload_invalidates_the_cache(finder, data_files):
+    """Results of the previous data are neither kept nor found after a reload."""
+    routes_path, stations_path = data_files
+    before = finder.find_routes("Station 19", "Station 14", departure=MORNING)
+    version = finder.snapshots.current().version
+    # Route 2 no longer reaches Station 14.
+    remove_stop(routes_path, 1, "Station 14")
+    finder.reload(RouteRepository(routes_path, 0), StationRepository(stations_path, 0))
+    assert finder.snapshots.current().version != version
+    assert finder.result_cache.stats()["size"] == 0
+    after = finder.find_routes("Station 19", "Station 14", departure=MORNING)
+    assert after != before
+    assert finder.result_cache.keys[0] != finder.result_cache.keys[1]
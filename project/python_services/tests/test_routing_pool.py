@@ -0,0 +1,138 @@
+"""This module checks the worker processes running travel searches: their
+start-up, their reload after the data changes and the bound on pending
+searches.
+
+Author: Juan Esteban Bedoya <jebedoyal@udistrital.edu.co>
+
+This file is part of SmartCommute project.
+
+SmartCommute is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+SmartCommute is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
+"""
+
+import asyncio
+from datetime import datetime
+from typing import Iterator
+import pytest
+from controllers.dependencies import get_routing_pool # pylint: disable=import-error
+from main import app # pylint: disable=import-error
+from repositories.route import RouteRepository # pylint: disable=import-error
+from repositories.station import StationRepository # pylint: disable=import-error
+from services.routing_pool import PoolSaturatedError, RoutingPool # pylint: disable=import-error
+from services.travel_finder import TravelFinder # pylint: disable=import-error
+from tests.conftest import remove_stop
+
+# pylint: disable=redefined-outer-name
+
+SEARCH = ("Station 19", "Station 14", "min_stations", 3, datetime(2026, 10, 19, 8, 0), 5)
+
+def search_here(routes_path: str, stations_path: str) -> dict:
+    """
+    Runs the search in this process, on the current contents of the files.
+
+    Args:
+        routes_path (str): The path of the routes file.
+        stations_path (str): The path of the stations file.
+
+    Returns:
+        dict: The search result.
+    """
+    finder = TravelFinder(RouteRepository(routes_path, 0), StationRepository(stations_path, 0))
+    return finder.find_routes(*SEARCH)
+
+
+@pytest.fixture
+def pool(data_files, monkeypatch) -> Iterator[RoutingPool]:
+    """
+    Starts two workers over copies of the sample data files.
+
+    Yields:
+        RoutingPool: The started pool.
+    """
+    routes_path, stations_path = data_files
+    monkeypatch.setenv("PATH_ROUTES_DATA", routes_path)
+    monkeypatch.setenv("PATH_STATIONS_DATA", stations_path)
+    for name in ("PAIR_TABLE_PATH", "SNAPSHOT_PATH", "STREAM_MIN_BYTES"):
+        monkeypatch.delenv(name, raising=False)
+    routing_pool = RoutingPool(2, 4)
+    asyncio.run(routing_pool.start())
+    try:
+        yield routing_pool
+    finally:
+        routing_pool.shutdown()
+
+
+def test_workers_search_the_data_they_loaded(pool, data_files):
+    """Started workers answer as a travel finder of the web process does."""
+    assert asyncio.run(pool.find_routes(*SEARCH)) == search_here(*data_files)
+    assert pool.stats()["data_generation"] == 0
+
+
+def test_reload_replaces_the_workers(pool, data_files):
+    """After a reload, searches run on new workers already loaded with the new data."""
+    before = asyncio.run(pool.find_routes(*SEARCH))
+    previous = pool.executor
+    # Route 2 no longer reaches Station 14.
+    remove_stop(data_files[0], 1, "Station 14")
+    pool.invalidate()
+    assert pool.executor is not previous
+    assert pool.stats()["data_generation"] == 1
+    after = asyncio.run(pool.find_routes(*SEARCH))
+    assert after == search_here(*data_files)
+    assert after != before
+    with pytest.raises(RuntimeError):
+        previous.submit(print)
+
+
+def test_failed_reload_keeps_the_workers(pool, data_files):
+    """When the new workers cannot load the data, the current ones keep serving it."""
+    before = asyncio.run(pool.find_routes(*SEARCH))
+    previous = pool.executor
+    with open(data_files[0], "w", encoding="utf-8") as routes_file:
+        routes_file.write('{"routes": [{"id": "1"}]}')
+    pool.invalidate()
+    assert pool.executor is previous
+    stats = pool.stats()
+    assert (stats["data_generation"], stats["reload_failures_total"]) == (0, 1)
+    assert asyncio.run(pool.find_routes(*SEARCH)) == before
+
+
+def test_saturated_pool_rejects_searches(pool):
+    """Searches beyond `max_pending` are rejected instead of queued."""
+    pool.max_pending = 1
+
+    async def search_twice():
+        return await asyncio.gather(pool.find_routes(*SEARCH), pool.find_routes(*SEARCH),
+                                    return_exceptions=True)
+
+    first, second = asyncio.run(search_twice())
+    assert "routes" in first
+    assert isinstance(second, PoolSaturatedError)
+    stats = pool.stats()
+    assert (stats["pending"], stats["rejected_total"]) == (0, 1)
+
+
+def test_saturated_pool_answers_503(client):
+    """The search endpoint answers 503 with Retry-After while the pool is full."""
+    saturated = RoutingPool(1, 1)
+    saturated.pending = 1
+    app.dependency_overrides[get_routing_pool] = lambda: saturated
+    try:
+        response = client.get("/route/find", params={"origin": "Station 19",
+                                                      "destination": "Station 14"})
+    finally:
+        del app.dependency_overrides[get_routing_pool]
+        saturated.shutdown()
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert saturated.stats()["rejected_total"] == 1
@@ -0,0 +1,167 @@
+"""This module checks how route schedules are parsed and which routes
+are running at a given moment.
+
+Author: Juan Esteban Bedoya <jebedoyal@udistrital.edu.co>
+
+This file is part of SmartCommute project.
+
+SmartCommute is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+SmartCommute is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
+"""
+
+from datetime import datetime
+import pytest
+from repositories.route import validate_route # pylint: disable=import-error
+from services.travel.schedule import ( # pylint: disable=import-error
+    MINUTES_PER_DAY, ScheduleIndex, parse_departures, parse_headway, parse_minutes,
+    parse_schedule
+)
+
+# 2026-10-19 is a Monday.
+MONDAY = datetime(2026, 10, 19)
+
+def at(day: int, time: str) -> datetime:
+    """
+    Builds a moment of the week starting on MONDAY.
+
+    Args:
+        day (int): The weekday, 0 being Monday.
+        time (str): The "HH:MM" time.
+
+    Returns:
+        datetime: The moment.
+    """
+    hours, minutes = time.split(":")
+    return MONDAY.replace(day=MONDAY.day + day, hour=int(hours), minute=int(minutes))
+
+
+@pytest.mark.parametrize("value, minutes", [
+    ("00:00", 0), ("05:30", 330), (" 7:05 ", 425), ("05:30:15", 330), ("23:59", 1439),
+    ("24:00", MINUTES_PER_DAY), ("24:01", None), ("5", None), ("aa:bb", None), ("", None),
+    (None, None)
+])
+def test_parse_minutes(value, minutes):
+    """Times are minutes after midnight, up to 24:00."""
+    assert parse_minutes(value) == minutes
+
+
+def test_several_ranges_per_day():
+    """Every entry of a day is kept, not only the last one."""
+    schedule = [
+        {"day": "Monday", "start_time": "05:00", "end_time": "09:00"},
+        {"day": "monday ", "start_time": "16:00", "end_time": "20:00"},
+        {"day": "Tuesday", "start_time": "06:00", "end_time": "07:00"}
+    ]
+    assert parse_schedule(schedule) == {0: [(300, 540), (960, 1200)], 1: [(360, 420)]}
+
+
+def test_range_crossing_midnight():
+    """The part after midnight belongs to the next day, Sunday to Monday."""
+    schedule = [{"day": "Sunday", "start_time": "22:00", "end_time": "04:00"}]
+    assert parse_schedule(schedule) == {6: [(1320, MINUTES_PER_DAY - 1)], 0: [(0, 240)]}
+
+
+def test_range_ending_at_midnight():
+    """A range ending at 24:00 runs until the end of the day."""
+    schedule = [{"day": "Friday", "start_time": "18:00", "end_time": "24:00"}]
+    assert parse_schedule(schedule) == {4: [(1080, MINUTES_PER_DAY)]}
+
+
+def test_invalid_entries_are_ignored():
+    """Entries with an unknown day or unparsable times are skipped."""
+    schedule = [
+        {"day": "Someday", "start_time": "05:00", "end_time": "09:00"},
+        {"day": "Monday", "start_time": "5 am", "end_time": "09:00"},
+        {"day": "Monday", "start_time": "05:00"},
+        {"start_time": "05:00", "end_time": "09:00"}
+    ]
+    assert not parse_schedule(schedule)
+    assert not parse_departures(schedule)
+
+
+@pytest.mark.parametrize("value, minutes", [
+    (10, 10), ("15", 15), (" 20 ", 20), (1440, 1440), (0, None), (1441, None), (-5, None),
+    ("-5", None), (2.5, None), ("ten", None), (True, None), (None, None)
+])
+def test_parse_headway(value, minutes):
+    """Headways are whole minutes, given as numbers or numeric strings."""
+    assert parse_headway(value) == minutes
+
+
+def test_departures():
+    """Trips leave every headway, after midnight on the next day."""
+    schedule = [
+        {"day": "Monday", "start_time": "05:00", "end_time": "05:30", "headway": 15},
+        {"day": "Monday", "start_time": "05:20", "end_time": "05:40", "headway": "20"},
+        {"day": "Tuesday", "start_time": "06:00", "end_time": "06:25"},
+        {"day": "Sunday", "start_time": "23:00", "end_time": "24:00", "headway": 30},
+        {"day": "Saturday", "start_time": "23:50", "end_time": "00:10", "headway": 10}
+    ]
+    assert parse_departures(schedule) == {
+        0: [0, 300, 315, 320, 330, 340],
+        1: [360, 370, 380],
+        5: [1430],
+        6: [0, 10, 1380, 1410]
+    }
+
+
+def test_schedule_entries_are_validated():
+    """Routes with a headway that is not a whole number of minutes are rejected."""
+    route = {"id": "B10", "name": "Route B10", "stations": ["A", "B"], "schedule": [
+        {"day": "Monday", "start_time": "05:00", "end_time": "09:00", "headway": "5"}
+    ]}
+    assert validate_route(route).schedule[0].headway == 5
+    route["schedule"][0]["headway"] = "often"
+    with pytest.raises(ValueError, match="B10"):
+        validate_route(route)
+
+
+def test_active_routes():
+    """Routes run within any of their ranges, across midnight and up to 24:00."""
+    index = ScheduleIndex(4, {
+        0: parse_schedule([
+            {"day": "Monday", "start_time": "05:00", "end_time": "09:00"},
+            {"day": "Monday", "start_time": "16:00", "end_time": "20:00"}
+        ]),
+        1: parse_schedule([{"day": "Sunday", "start_time": "22:00", "end_time": "04:00"}]),
+        2: parse_schedule([{"day": "Friday", "start_time": "18:00", "end_time": "24:00"}])
+    })
+    running = {
+        at(0, "04:59"): b"\x00\x00\x00\x00",
+        at(0, "05:00"): b"\x01\x00\x00\x00",
+        at(0, "12:00"): b"\x00\x00\x00\x00",
+        at(0, "20:00"): b"\x01\x00\x00\x00",
+        at(0, "20:01"): b"\x00\x00\x00\x00",
+        at(4, "23:59"): b"\x00\x00\x01\x00",
+        at(5, "00:00"): b"\x00\x00\x00\x00",
+        at(6, "21:59"): b"\x00\x00\x00\x00",
+        at(6, "23:30"): b"\x00\x01\x00\x00",
+        at(0, "04:00"): b"\x00\x01\x00\x00",
+        at(0, "04:01"): b"\x00\x00\x00\x00"
+    }
+    for moment, mask in running.items():
+        assert index.active_routes(moment) == mask, moment
+        # The second time the mask comes from the cache.
+        assert index.active_routes(moment) == mask, moment
+
+
+def test_windows_cover_the_week():
+    """The schedule windows split every minute of the week."""
+    index = ScheduleIndex(2, {
+        0: parse_schedule([{"day": "Monday", "start_time": "05:00", "end_time": "09:00"}]),
+        1: parse_schedule([{"day": "Sunday", "start_time": "22:00", "end_time": "04:00"}])
+    })
+    windows = index.windows()
+    assert sum(windows.values()) == 7 * MINUTES_PER_DAY
+    assert windows[b"\x01\x00"] == 241
+    assert windows[b"\x00\x01"] == 120 + 241
@@ -0,0 +1,121 @@
+"""This module checks the bounded top-k selection of candidate routes and
+the `limit` parameter that sets k for travel searches.
+
+Author: Juan Esteban Bedoya <jebedoyal@udistrital.edu.co>
+
+This file is part of SmartCommute project.
+
+SmartCommute is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+SmartCommute is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
+"""
+
+import random
+from typing import Iterator, List, Tuple
+import pytest
+from services.travel.selection import DEFAULT_LIMIT, MAX_LIMIT, select_top # pylint: disable=import-error
+
+DEPARTURE = "2026-10-19T08:00:00"
+# Pairs of the sample data with more candidate routes than the default limit.
+SEARCHES = [("Station 22", "Station 14", "min_stations"),
+            ("Station 03", "Station 12", "min_transfers")]
+
+def counted(items: List[Tuple[int, int]], consumed: List[int]) -> Iterator[Tuple[int, int]]:
+    """
+    Produces items lazily, counting how many were taken.
+
+    Args:
+        items (List[Tuple[int, int]]): The items to produce.
+        consumed (List[int]): Holds the count of items taken.
+
+    Yields:
+        Tuple[int, int]: Each item, in order.
+    """
+    for item in items:
+        consumed[0] += 1
+        yield item
+
+
+def search(client, origin: str, destination: str, optimization: str, **params) -> List[dict]:
+    """
+    Runs a search through /route/find.
+
+    Returns:
+        List[dict]: The routes found.
+    """
+    response = client.get("/route/find", params={
+        "origin": origin, "destination": destination, "optimization": optimization,
+        "departure": DEPARTURE, **params
+    })
+    assert response.status_code == 200
+    return response.json()["routes"]
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("limit", [1, 3, 20])
+def test_selection_equals_sorting(seed, limit):
+    """The selected items are those `sorted(...)[:limit]` returns, in its order."""
+    rng = random.Random(seed)
+    items = [(rng.randrange(10), position) for position in range(200)]
+    consumed = [0]
+    selected = select_top(counted(items, consumed), limit, key=lambda item: item[0])
+    assert selected == sorted(items, key=lambda item: item[0])[:limit]
+    assert consumed == [len(items)]
+
+
+def test_ties_keep_their_order():
+    """Items with equal keys are returned in the order they were produced."""
+    items = [("b", 1), ("a", 0), ("c", 1), ("d", 0), ("e", 1), ("f", 0)]
+    assert select_top(iter(items), 4, key=lambda item: item[1]) == [
+        ("a", 0), ("d", 0), ("f", 0), ("b", 1)
+    ]
+
+
+def test_limit_beyond_the_candidates():
+    """A limit larger than the number of items returns all of them, sorted."""
+    assert select_top(iter([3, 1, 2]), 10, key=lambda item: item) == [1, 2, 3]
+    assert not select_top(iter([]), 5, key=lambda item: item)
+
+
+def test_non_positive_limit():
+    """A limit of 0 or less selects nothing."""
+    assert not select_top(iter([1, 2]), 0, key=lambda item: item)
+    assert not select_top(iter([1, 2]), -1, key=lambda item: item)
+
+
+@pytest.mark.parametrize("origin, destination, optimization", SEARCHES)
+def test_limit_parameter_sets_k(client, origin, destination, optimization):
+    """Each limit returns the first routes of a larger one, and the default is 5."""
+    everything = search(client, origin, destination, optimization, limit=MAX_LIMIT)
+    assert len(everything) > DEFAULT_LIMIT
+    assert search(client, origin, destination, optimization) == everything[:DEFAULT_LIMIT]
+    for limit in (1, 2, len(everything) - 1):
+        assert search(client, origin, destination, optimization,
+                      limit=limit) == everything[:limit]
+
+
+@pytest.mark.parametrize("origin, destination, optimization", SEARCHES)
+def test_limit_parameter_beyond_the_candidates(client, origin, destination, optimization):
+    """A limit above the number of candidate routes returns every one of them."""
+    everything = search(client, origin, destination, optimization, limit=MAX_LIMIT)
+    assert len(everything) < MAX_LIMIT
+    assert search(client, origin, destination, optimization,
+                  limit=len(everything) + 1) == everything
+
+
+@pytest.mark.parametrize("limit", [0, MAX_LIMIT + 1])
+def test_limit_parameter_bounds(client, limit):
+    """Limits outside 1 to MAX_LIMIT answer 422."""
+    response = client.get("/route/find", params={
+        "origin": "Station 22", "destination": "Station 14", "limit": limit
+    })
+    assert response.status_code == 422
@@ -0,0 +1,70 @@
+"""This module checks the one-transfer join through the transfer hubs
+against the plain scan of every stop reachable from the origin.
+
+Author: Juan Esteban Bedoya <jebedoyal@udistrital.edu.co>
+
+This file is part of SmartCommute project.
+
+SmartCommute is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+SmartCommute is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with SmartCommute. If not, see <https://www.gnu.org/licenses/>. 
+"""
+
+import random
+from typing import List, Tuple
+import pytest
+from services.travel import route_processor # pylint: disable=import-error
+from services.travel.route_processor import RouteProcessor, TransferCandidate # pylint: disable=import-error
+from benchmarks.transfer_scan import scan_transfers
+
+def summarize(candidates: List[TransferCandidate]) -> Tuple[list, list]:
+    """
+    Reduces a list of journeys to the parts that do not depend on how ties
+    are broken.
+
+    Args:
+        candidates (List[TransferCandidate]): The journeys, best first.
+
+    Returns:
+        Tuple[list, list]: The score of every journey, and the journeys
+            scoring less than the last one.
+    """
+    scores = [candidate.score for candidate in candidates]
+    return scores, sorted(candidate for candidate in candidates if candidate.score != scores[-1])
+
+
+@pytest.mark.parametrize("join", ["python", "numpy"])
+def test_hub_join_matches_the_plain_scan(network_snapshot, monkeypatch, join):
+    """Both joins find the journeys of the plain scan, with and without masks."""
+    if join == "python":
+        monkeypatch.setattr(route_processor, "np", None)
+    else:
+        pytest.importorskip("numpy")
+        monkeypatch.setattr(route_processor, "VECTORIZE_MIN_PAIRS", 0)
+    network = network_snapshot.network
+    routes = len(network.route_names)
+    rng = random.Random(4)
+    masks = [bytes([1]) * routes] + [
+        bytes(rng.random() < 0.7 for _ in range(routes)) for _ in range(5)
+    ]
+    processor = RouteProcessor()
+    for active_routes in masks:
+        for _ in range(150):
+            origin, destination = rng.sample(range(network.listed_stations), 2)
+            limit = rng.choice([1, 5, 20])
+            joined = processor.process_transfers(origin, destination, network, active_routes,
+                                                 limit)
+            scanned = scan_transfers(origin, destination, network, active_routes, limit)
+            assert summarize(joined) == summarize(scanned), (origin, destination)
+            for candidate in joined:
+                assert active_routes[candidate.first_route]
+                assert active_routes[candidate.second_route]